@@ -8,13 +8,21 @@ import dots_logic
 _yellow = '#FDFF5F'
 _orange = '#FF943C'
 
+_PAD = 0.1      #fraction of the canvas left empty around the board
+_SPAN = 0.8     #fraction of the canvas the board spans
+_RADIUS = 0.015 #largest half width of a dot, as a fraction of the canvas
+_RADIUS_SHARE = 0.2 #largest half width of a dot, as a fraction of the space between dots
+
 class DotGUI:
     '''GUI class for a single dot'''
 
+    __slots__ = ('_tl', '_br', '_row', '_col', '_tl_x', '_tl_y', '_br_x', '_br_y')
+
     def __init__(self, row: int, col: int) -> None:
         self._tl, self._br = None, None
         self._row = row
         self._col = col
+        self._tl_x = self._tl_y = self._br_x = self._br_y = 0.0
         
 
     def row(self) -> int:
@@ -41,24 +49,29 @@ class DotGUI:
         return self._br
 
     
-    def draw(self, canvas: tk.Canvas, points: [point.Point]) -> None:
-        '''Draws a dot onto a canvas, given its points'''
-        
+    def place(self, points: [point.Point]) -> None:
+        '''Sets the dot's bounding box points without drawing it'''
+
         self._tl, self._br = points
         self._tl_x, self._tl_y = self._tl.frac()
         self._br_x, self._br_y = self._br.frac()
 
-        width = canvas.winfo_width()
-        height = canvas.winfo_height()
-        point_pixels = []
-        for point in points:
-            point_pixels.append(point.pixel(width, height))
-
-        canvas.create_rectangle(point_pixels[0][0],
-                           point_pixels[0][1],
-                           point_pixels[1][0],
-                           point_pixels[1][1],
-                           fill = 'black')
+
+    def draw(self, canvas: tk.Canvas, points: [point.Point] = None, view: 'Viewport' = None) -> int:
+        '''Draws a dot onto a canvas, at the given points or where it was placed,
+        and returns the canvas item'''
+        
+        if points is not None:
+            self.place(points)
+        if view is None:
+            view = Viewport(canvas.winfo_width(), canvas.winfo_height())
+        point_pixels = [view.pixel(self._tl), view.pixel(self._br)]
+
+        return canvas.create_rectangle(point_pixels[0][0],
+                                       point_pixels[0][1],
+                                       point_pixels[1][0],
+                                       point_pixels[1][1],
+                                       fill = 'black')
         
 
     def center(self) -> point.Point:
@@ -68,27 +81,90 @@ class DotGUI:
 
 
 
+class Viewport:
+    '''Maps fractional board coordinates to canvas pixels, showing the part of the
+    board from an origin, in fractional coordinates, magnified by a zoom factor'''
+
+    __slots__ = ('_width', '_height', '_zoom', '_origin_x', '_origin_y')
+
+    def __init__(self, width: float, height: float, zoom: float = 1.0,
+                 origin_x: float = 0.0, origin_y: float = 0.0) -> None:
+        self._width = width
+        self._height = height
+        self._zoom = zoom
+        self._origin_x = origin_x
+        self._origin_y = origin_y
+
+
+    def pixel(self, point: point.Point) -> (float, float):
+        '''Returns where a point is on the canvas'''
+
+        frac_x, frac_y = point.frac()
+        return ((frac_x - self._origin_x) * self._zoom * self._width,
+                (frac_y - self._origin_y) * self._zoom * self._height)
+
+
+    def point_at(self, x: float, y: float) -> point.Point:
+        '''Returns the point under a pixel on the canvas'''
+
+        return point.from_frac(x / (self._zoom * self._width) + self._origin_x,
+                               y / (self._zoom * self._height) + self._origin_y)
+
+
+    def cell_size(self, total_row: int, total_col: int) -> float:
+        '''Returns the smaller of the width and height of a box, in pixels'''
+
+        return _SPAN * self._zoom * min(self._width / total_col, self._height / total_row)
+
+
+    def visible_dots(self, total_row: int, total_col: int) -> (int):
+        '''Returns the first and last rows and columns of dots (row_1, row_2, col_1, col_2)
+        that are at least partly on the canvas'''
+
+        radius = dot_radius(total_row, total_col)
+        x = _SPAN / total_col
+        y = _SPAN / total_row
+        span = 1 / self._zoom
+        col_1 = int((self._origin_x - _PAD - radius) // x)
+        col_2 = int((self._origin_x + span - _PAD + radius) // x) + 1
+        row_1 = int((self._origin_y - _PAD - radius) // y)
+        row_2 = int((self._origin_y + span - _PAD + radius) // y) + 1
+        #zoomed in on the margin around the board, the range closes on the nearest row or column
+        row_1 = min(max(row_1, 0), total_row)
+        col_1 = min(max(col_1, 0), total_col)
+        return (row_1, min(max(row_2, row_1), total_row), col_1, min(max(col_2, col_1), total_col))
+
+
+
+def dot_radius(total_row: int, total_col: int) -> float:
+    '''Returns half the width of the dots on a board, as a fraction of the canvas,
+    shrinking on large boards so neighbouring dots stay apart'''
+
+    return min(_RADIUS, _RADIUS_SHARE * _SPAN / max(total_row, total_col))
+
+
 def create_dot_points(row: int, col: int, total_row: int, total_col: int) -> (point.Point):
     '''Given a dot's position in a board, returns bounding box points for the dot'''
     
-    x = (.8 / total_col)
-    y = (.8 / total_row)
-    pad = 0.1
-    radius = 0.015
+    x = (_SPAN / total_col)
+    y = (_SPAN / total_row)
+    pad = _PAD
+    radius = dot_radius(total_row, total_col)
 
     return (point.from_frac( (pad + (x*col) - radius), (pad + (y*row) - radius)),
            point.from_frac( (pad + (x*col) + radius), (pad + (y*row) + radius)))
 
 
-def connect_dots(canvas, dot_1: DotGUI, dot_2: DotGUI):
-    '''Given a canvas and two dots, draws a line between the two dots'''
+def connect_dots(canvas, dot_1: DotGUI, dot_2: DotGUI, view: Viewport = None) -> int:
+    '''Given a canvas and two dots, draws a line between the two dots and returns the canvas item'''
     
-    width, height = canvas.winfo_width(), canvas.winfo_height()
+    if view is None:
+        view = Viewport(canvas.winfo_width(), canvas.winfo_height())
     dot_1, dot_2 = orient_dots((dot_1, dot_2))
 
-    tl = dot_1.tl().pixel(width, height)
-    br = dot_2.br().pixel(width, height)
-    canvas.create_rectangle(tl[0], tl[1], br[0], br[1], fill = 'black')
+    tl = view.pixel(dot_1.tl())
+    br = view.pixel(dot_2.br())
+    return canvas.create_rectangle(tl[0], tl[1], br[0], br[1], fill = 'black')
 
 
 def translate_color(color: int) -> str:
@@ -114,6 +190,36 @@ def contains_point(point, dot_1: DotGUI, dot_2: DotGUI): #doesn't check valid mo
         point_y > dot1._tl_y and point_y < dot2._br_y)
 
 
+def find_edge(point, total_row: int, total_col: int) -> (int): #doesn't check valid move
+    '''Returns the two dots (row_1, col_1, row_2, col_2) of the edge under a point, or None
+
+    Works straight from the grid layout of create_dot_points, so it takes the same
+    time on every board size. An edge covers the same area as in contains_point.'''
+
+    point_x, point_y = point.frac()
+    x = _SPAN / total_col
+    y = _SPAN / total_row
+    radius = dot_radius(total_row, total_col)
+    col_place = (point_x - _PAD) / x
+    row_place = (point_y - _PAD) / y
+
+    #horizontal edges: close to a row of dots, between two columns
+    row = round(row_place)
+    col = min(max(int(col_place // 1), 0), total_col - 1)
+    if (0 <= row <= total_row and abs(point_y - (_PAD + y * row)) < radius
+            and _PAD + x * col - radius < point_x < _PAD + x * (col + 1) + radius):
+        return row, col, row, col + 1
+
+    #vertical edges: close to a column of dots, between two rows
+    col = round(col_place)
+    row = min(max(int(row_place // 1), 0), total_row - 1)
+    if (0 <= col <= total_col and abs(point_x - (_PAD + x * col)) < radius
+            and _PAD + y * row - radius < point_y < _PAD + y * (row + 1) + radius):
+        return row, col, row + 1, col
+
+    return None
+
+
 def orient_dots(dots: (DotGUI)) -> (DotGUI):
     '''Correctly orients the two dots in order from top left to bottom right'''
     
@@ -0,0 +1,425 @@
+#Computer opponent using an alpha-beta search over the bitboard engine
+
+import random
+import time
+import dots_book
+import dots_chains
+import dots_engine
+import dots_logic
+import dots_solver
+import dots_symmetry
+
+_EXACT = 0
+_LOWER = 1
+_UPPER = 2
+
+_INFINITY = 1 << 20
+_CHECK_INTERVAL = 15 #nodes between deadline checks, minus one
+_DEADLINE_MARGIN = 0.01 #seconds kept back for the last gap between deadline checks and unwinding:
+                        #on 5x5 the slowest 0.1% of gaps take 2 ms and single nodes up to 10 ms
+_SYMMETRY_EDGE_LIMIT = 2000 #larger boards are hashed without symmetry, whose tables take longer
+                            #to build than a move and whose positions rarely meet in a search
+_MAX_PLIES = 64 #captures extend the search without using up depth, so it also stops this many
+                #moves below the root, bounding the recursion and the undos after a timeout
+_LARGE_MOVE_COUNT = 2000 #with more legal moves, sorting them costs more than searching a node, so
+                         #they are searched in the engine's order and the deadline checked at every node
+
+
+class _Timeout(Exception):
+    pass
+
+
+
+class SearchInfo:
+    '''Statistics about the most recent search'''
+
+    def __init__(self, nodes: int, seconds: float, depth: int, value: int) -> None:
+        self._nodes = nodes
+        self._seconds = seconds
+        self._depth = depth
+        self._value = value
+
+
+    def nodes(self) -> int:
+        '''Returns how many positions were searched'''
+        return self._nodes
+
+
+    def seconds(self) -> float:
+        '''Returns how long the search took'''
+        return self._seconds
+
+
+    def depth(self) -> int:
+        '''Returns the deepest fully completed iteration'''
+        return self._depth
+
+
+    def value(self) -> int:
+        '''Returns the expected box margin for the player to move'''
+        return self._value
+
+
+    def nodes_per_second(self) -> float:
+        '''Returns the search speed'''
+        if self._seconds <= 0:
+            return 0.0
+        return self._nodes / self._seconds
+
+
+
+class TranspositionTable:
+    '''Fixed size hash table of searched positions, preferring deeper and newer entries'''
+
+    def __init__(self, size_bits: int = 16) -> None:
+        self._mask = (1 << size_bits) - 1
+        self._slots = [None] * (1 << size_bits)
+        self._generation = 0
+
+
+    def size_bits(self) -> int:
+        '''Returns the base two logarithm of the number of slots'''
+
+        return self._mask.bit_length()
+
+
+    def new_search(self) -> None:
+        '''Marks all existing entries as belonging to an older search'''
+
+        self._generation += 1
+
+
+    def lookup(self, key: int) -> tuple:
+        '''Returns (depth, value, flag, move) for a position, or None'''
+
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+        return None
+
+
+    def store(self, key: int, depth: int, value: int, flag: int, move: int) -> None:
+        '''Stores a position unless the slot holds a deeper entry from the current search'''
+
+        index = key & self._mask
+        entry = self._slots[index]
+        if (entry is None or entry[0] == key or entry[5] != self._generation
+                or entry[1] <= depth):
+            self._slots[index] = (key, depth, value, flag, move, self._generation)
+
+
+
+class AlphaBetaPlayer:
+    '''Negamax player with iterative deepening, move ordering and a transposition table'''
+
+    def __init__(self, time_limit: float = 0.2, max_depth: int = 64,
+                 table_bits: int = 16, seed: int = 0,
+                 solved: [dots_solver.SolvedTable] = (),
+                 books: [dots_book.OpeningBook] = ()) -> None:
+        self._time_limit = time_limit
+        self._solved = list(solved) #perfect play for small boards, used instead of searching
+        self._books = list(books) #searched replies for early positions, used instead of searching
+        self._max_depth = max_depth
+        self._table = TranspositionTable(table_bits)
+        self._seed = seed
+        self._shape = None
+        self._hasher = None
+        self._rules_key = 0
+        self._engine = None #search copy of the last position searched, kept to follow the game
+        self._analyzer = None
+        self._info = SearchInfo(0, 0.0, 0, 0)
+
+
+    def choose_move(self, board: dots_logic.Board) -> (int):
+        '''Returns the move to make as (row_1, col_1, row_2, col_2)'''
+
+        engine = board.engine()
+        edge = self.choose_edge(engine, board.rules())
+        return engine.edge_dots(edge)
+
+
+    def choose_edge(self, engine: dots_engine.Engine, rules: str = '>') -> int:
+        '''Searches a copy of the engine until the deadline and returns the best edge'''
+
+        start = time.perf_counter()
+        for table in self._solved:
+            if table.matches(engine, rules):
+                values = table.move_values(engine.edge_mask())
+                best_move = max(values, key = values.get)
+                self._info = SearchInfo(len(values), time.perf_counter() - start,
+                                        len(values), values[best_move])
+                return best_move
+
+        book_edge, book_value = dots_book.book_move(self._books, engine, rules)
+        if book_edge >= 0:
+            self._info = SearchInfo(1, time.perf_counter() - start, 0, book_value)
+            return book_edge
+
+        self._deadline = start + self._time_limit - _DEADLINE_MARGIN
+        self._sign = -1 if rules == '<' else 1
+        self._nodes = 0
+        self._check_mask = _CHECK_INTERVAL
+        if engine.count_moves() > _LARGE_MOVE_COUNT:
+            self._check_mask = 0
+        self._follow(engine, rules)
+        self._table.new_search()
+        self._root_moves = self._engine.move_count()
+
+        moves = self._ordered_moves(-1)
+        best_move = moves[0]
+        best_value = 0
+        depth = 0
+        if self._analyzer is not None and self._analyzer.endgame_move(rules) >= 0:
+            best_move = self._analyzer.endgame_move(rules)
+        elif len(moves) > 1:
+            try:
+                for depth in range(1, self._max_depth + 1):
+                    best_value, best_move = self._search_root(depth, best_move)
+                    if depth >= len(moves):
+                        break
+            except _Timeout:
+                depth -= 1
+                while self._engine.move_count() > self._root_moves:
+                    self._undo()
+
+        self._info = SearchInfo(self._nodes, time.perf_counter() - start,
+                                depth, best_value)
+        return best_move
+
+
+    def last_search(self) -> SearchInfo:
+        '''Returns statistics about the most recent search'''
+
+        return self._info
+
+
+    def _follow(self, engine: dots_engine.Engine, rules: str) -> None:
+        '''Brings the search engine, its hashes and its chain analysis to the engine's position
+
+        When the game has only gone forward since the last search, just the new edges are
+        played, since building the analysis and hashes scans the whole board, which on the
+        largest boards takes longer than a move may.'''
+
+        if self._hasher is None or self._shape != (engine.rows(), engine.cols()):
+            self._shape = (engine.rows(), engine.cols())
+            self._hasher = dots_symmetry.SymmetryHasher(engine.rows(), engine.cols(), self._seed,
+                                                        engine.edge_count() <= _SYMMETRY_EDGE_LIMIT)
+            self._rules_key = random.Random(self._seed).getrandbits(64) | 1
+            self._table = TranspositionTable(self._table.size_bits())
+            self._engine = None
+
+        if self._engine is not None and (self._analyzer is None) == (rules == '<'):
+            history = engine.history()
+            searched = self._engine.history()
+            if history[:len(searched)] == searched:
+                for edge in history[len(searched):]:
+                    self._play(edge)
+                if (self._engine.edge_mask() == engine.edge_mask() and self._engine.turn() == engine.turn()
+                        and self._engine.score() == engine.score()):
+                    return
+
+        self._engine = engine.copy()
+        self._analyzer = None
+        if rules != '<':
+            self._analyzer = dots_chains.ChainAnalyzer(self._engine)
+        self._hasher.reset(self._engine)
+
+
+    def _search_root(self, depth: int, first: int) -> (int):
+        '''Searches every root move to a given depth, returning (value, move)'''
+
+        alpha = -_INFINITY
+        best_move = first
+        for edge in self._ordered_moves(first):
+            if time.perf_counter() > self._deadline:
+                raise _Timeout()
+            gained = self._play(edge)
+            if gained:
+                value = gained * self._sign + self._search(depth, alpha - gained * self._sign,
+                                                           _INFINITY)
+            else:
+                value = -self._search(depth - 1, -_INFINITY, -alpha)
+            self._undo()
+
+            if value > alpha:
+                alpha = value
+                best_move = edge
+
+        key, symmetry = self._table_key()
+        self._table.store(key, depth, alpha, _EXACT, self._hasher.to_canonical(best_move, symmetry))
+        return alpha, best_move
+
+
+    def _table_key(self) -> (int, int):
+        '''Returns the transposition table key of the search position, shared by its
+        symmetric images, and the symmetry mapping the position onto its canonical form'''
+
+        key, symmetry = self._hasher.canonical()
+        if self._sign < 0:
+            key ^= self._rules_key
+        return key, symmetry
+
+
+    def _search(self, depth: int, alpha: int, beta: int) -> int:
+        '''Returns the value of the remaining game for the player to move'''
+
+        engine = self._engine
+        self._nodes += 1
+        if self._nodes & self._check_mask == 0 and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        if engine.is_game_over():
+            return 0
+        analyzer = self._analyzer
+        if (analyzer is not None and analyzer.is_loony_endgame() and analyzer.is_simple()
+                and not analyzer.capturable()):
+            return -analyzer.endgame_value()
+        if depth <= 0 or engine.move_count() - self._root_moves > _MAX_PLIES:
+            return self._evaluate()
+
+        original_alpha = alpha
+        hash_move = -1
+        key, symmetry = self._table_key()
+        entry = self._table.lookup(key)
+        if entry is not None:
+            entry_depth, value, flag, hash_move = entry
+            if hash_move >= 0:
+                hash_move = self._hasher.from_canonical(hash_move, symmetry)
+            if entry_depth >= depth:
+                if flag == _EXACT:
+                    return value
+                if flag == _LOWER and value > alpha:
+                    alpha = value
+                elif flag == _UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        best_value = -_INFINITY
+        best_move = -1
+        for edge in self._ordered_moves(hash_move):
+            gained = self._play(edge)
+            if gained:
+                gained *= self._sign
+                value = gained + self._search(depth, alpha - gained, beta - gained)
+            else:
+                value = -self._search(depth - 1, -beta, -alpha)
+            self._undo()
+
+            if value > best_value:
+                best_value = value
+                best_move = edge
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best_value <= original_alpha:
+            flag = _UPPER
+        elif best_value >= beta:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        if best_move >= 0:
+            best_move = self._hasher.to_canonical(best_move, symmetry)
+        self._table.store(key, depth, best_value, flag, best_move)
+        return best_value
+
+
+    def _play(self, edge: int) -> int:
+        '''Plays an edge on the search engine, keeping the chain analysis in step'''
+
+        gained = self._engine.play(edge)
+        self._hasher.update(edge)
+        if self._analyzer is not None:
+            self._analyzer.update(edge)
+        return gained
+
+
+    def _undo(self) -> None:
+        '''Takes back the last edge on the search engine, keeping the chain analysis in step'''
+
+        edge = self._engine.undo()
+        self._hasher.update(edge)
+        if self._analyzer is not None:
+            self._analyzer.update(edge)
+
+
+    def _evaluate(self) -> int:
+        '''Estimates a position at the search horizon by the boxes ready to be taken'''
+
+        engine = self._engine
+        capturable = 0
+        for edge in engine.moves_of(dots_engine.CAPTURE): #every box with three sides is next to one
+            for box in engine.edge_boxes(edge):
+                if engine.box_sides(box) == 3:
+                    capturable += 1
+        return capturable * self._sign
+
+
+    def _ordered_moves(self, first: int) -> [int]:
+        '''Returns the undrawn edges: captures, then safe moves, then moves giving away boxes'''
+
+        engine = self._engine
+        if engine.count_moves() > _LARGE_MOVE_COUNT:
+            moves = (engine.move_array(dots_engine.CAPTURE) + engine.move_array(dots_engine.SAFE)
+                     + engine.move_array(dots_engine.SACRIFICE))
+        else:
+            moves = []
+            for kind in (dots_engine.CAPTURE, dots_engine.SAFE, dots_engine.SACRIFICE):
+                moves += sorted(engine.moves_of(kind))
+        if first >= 0 and not engine.has_edge(first):
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+
+
+
+
+class RandomPlayer:
+    '''Player that draws any undrawn edge at random'''
+
+    def __init__(self, seed: int = None) -> None:
+        self._random = random.Random(seed)
+
+
+    def choose_move(self, board: dots_logic.Board) -> (int):
+        '''Returns the move to make as (row_1, col_1, row_2, col_2)'''
+
+        engine = board.engine()
+        return engine.edge_dots(self.choose_edge(engine, board.rules()))
+
+
+    def choose_edge(self, engine: dots_engine.Engine, rules: str = '>') -> int:
+        '''Returns a random undrawn edge'''
+
+        return engine.random_move(self._random)
+
+
+
+class GreedyPlayer:
+    '''Player that takes boxes when it can and otherwise avoids giving them away'''
+
+    def __init__(self, seed: int = None) -> None:
+        self._random = random.Random(seed)
+
+
+    def choose_move(self, board: dots_logic.Board) -> (int):
+        '''Returns the move to make as (row_1, col_1, row_2, col_2)'''
+
+        engine = board.engine()
+        return engine.edge_dots(self.choose_edge(engine, board.rules()))
+
+
+    def choose_edge(self, engine: dots_engine.Engine, rules: str = '>') -> int:
+        '''Returns a capture, else a safe edge, else any edge,
+        with captures tried last under the least filled rules'''
+
+        if rules == '<':
+            order = (dots_engine.SAFE, dots_engine.SACRIFICE, dots_engine.CAPTURE)
+        else:
+            order = (dots_engine.CAPTURE, dots_engine.SAFE, dots_engine.SACRIFICE)
+        for kind in order:
+            if engine.count_moves(kind):
+                return engine.random_move(self._random, kind)
@@ -1,146 +1,408 @@
 #GUI implementation of the game. Run this file to start application.
 
 
+import collections
+import sys
+import time
 import tkinter as tk
+import tkinter.filedialog
+import tkinter.messagebox
+import dots_ai
+import dots_book
 import dots_logic
 import dots_option_select
-import point
+import dots_profile
 import dot
 
 
 _DEFAULT_FONT = ('Verdana', 16)
+_PREVIEW_COLOR = '#7F7F7F'
+_FRAME_HISTORY = 120 #number of recent frame times kept
+_SAVE_FILE_TYPES = [('Dots and Boxes game', '*.dots'), ('Text', '*.txt')]
+_MAX_VISIBLE_CELLS = 50 #most boxes shown across, so a redraw never draws a whole huge board
+_ZOOM_STEP = 1.25
 
 class BoardGUI:
     '''GUI for the game board itself'''
     
-    def __init__(self, window: tk.Tk, board: dots_logic.Board) -> None:
+    def __init__(self, window: tk.Tk, board: dots_logic.Board, canvas: tk.Canvas = None) -> None:
+        '''Draws on a new canvas in the window, or on the given canvas, which the caller places'''
+
         self._window = window
         self._board = board
-        self._canvas = tk.Canvas(
-            master = self._window,
-            height = 400,
-            width = 400,
-            background = '#C4F3FF')
+        if canvas is None:
+            canvas = tk.Canvas(
+                master = self._window,
+                height = 400,
+                width = 400,
+                background = '#C4F3FF')
         
-        self._canvas.grid(row = 1, column = 0,
-                          sticky = tk.N + tk.W + tk.S + tk.E)
+            canvas.grid(row = 1, column = 0,
+                        sticky = tk.N + tk.W + tk.S + tk.E)
 
-        self._window.rowconfigure(1, weight = 1)
-        self._window.columnconfigure(0, weight = 1)
+            self._window.rowconfigure(1, weight = 1)
+            self._window.columnconfigure(0, weight = 1)
+        self._canvas = canvas
 
         
         self._rows = self._board.rows()
         self._cols = self._board.cols()
 
+        #canvas items are kept between draws, so a move only touches what it changed
+        self._dots = []
+        self._width = 0
+        self._height = 0
+        self._shown_moves = []   #edges on the canvas, in the order they were played
+        self._edge_items = {}    #edge -> canvas item
+        self._box_items = {}     #box -> canvas item
+        self._preview_item = None
+        self._preview_edge = -1
+        self._frame_times = collections.deque(maxlen = _FRAME_HISTORY)
+
+        #only the part of the board inside the viewport has canvas items
+        self._zoom = 1.0
+        self._origin_x = 0.0
+        self._origin_y = 0.0
+        self._viewport = None
+        self._visible = (0, 0, 0, 0) #first and last rows and columns of dots on the canvas
+        self._clamp_view()
+
+
+    def _place_dots(self) -> None:
+        '''Works out where every dot on the board goes, without drawing any'''
 
-    def _draw_dots(self) -> None:
-        '''Draws all the dots on the board'''
-        
         self._dots = []
-        self._width = self._canvas.winfo_width()
-        self._height = self._canvas.winfo_height()
 
         for i in range(self._rows + 1):
             self._dots.append([])
             for j in range(self._cols + 1):
                 Dot = dot.DotGUI(i,j)
                 self._dots[i].append(Dot)
-                Dot.draw(self._canvas,
-                         dot.create_dot_points(i, j, self._rows, self._cols))
+                Dot.place(dot.create_dot_points(i, j, self._rows, self._cols))
 
 
-    def _draw_outlines(self) -> None:
-        '''Draws all the outlines on the board'''
+    def _draw_dots(self) -> None:
+        '''Draws the dots inside the viewport'''
         
-        width, height = self._canvas.winfo_width(), self._canvas.winfo_height()
+        row_1, row_2, col_1, col_2 = self._visible
+        for i in range(row_1, row_2 + 1):
+            for Dot in self._dots[i][col_1:col_2 + 1]:
+                Dot.draw(self._canvas, view = self._viewport)
 
-        avg = width + height / 2
-        thickness = avg * .005
-        radius = 0.015 #make sure this matches the radius in dot.py in create_dot_points
 
-        for row in range(self._rows + 1):
-            x_start = self._dots[0][0].tl().frac()[0]
-            x_end = self._dots[0][self._cols].br().frac()[0]
-            
-            top_y = self._dots[row][0].tl().frac()[1]
-            bot_y = self._dots[row][0].br().frac()[1]
+    def _draw_outlines(self) -> None:
+        '''Draws the outlines of the rows and columns inside the viewport'''
+        
+        view = self._viewport
+        thickness = self._outline_width()
+        row_1, row_2, col_1, col_2 = self._visible
 
-            x_start, x_end = x_start * width, x_end * width
-            top_y, bot_y = top_y * height, bot_y * height
+        for row in range(row_1, row_2 + 1):
+            x_start, top_y = view.pixel(self._dots[row][col_1].tl())
+            x_end, bot_y = view.pixel(self._dots[row][col_2].br())
             
-            self._canvas.create_line(x_start, top_y, x_end, top_y, width = thickness)
-            self._canvas.create_line(x_start, bot_y, x_end, bot_y, width = thickness)
+            self._canvas.create_line(x_start, top_y, x_end, top_y, width = thickness, tags = 'outline')
+            self._canvas.create_line(x_start, bot_y, x_end, bot_y, width = thickness, tags = 'outline')
             
-        for col in range(self._cols + 1):
-            y_start = self._dots[0][0].tl().frac()[1]
-            y_end = self._dots[self._rows][0].br().frac()[1]
+        for col in range(col_1, col_2 + 1):
+            right_x, y_start = view.pixel(self._dots[row_1][col].tl())
+            left_x, y_end = view.pixel(self._dots[row_2][col].br())
 
-            right_x = self._dots[0][col].tl().frac()[0]
-            left_x = self._dots[0][col].br().frac()[0]
+            self._canvas.create_line(right_x, y_start, right_x, y_end, width = thickness, tags = 'outline')
+            self._canvas.create_line(left_x, y_start, left_x, y_end, width = thickness, tags = 'outline')
+        
 
-            y_start, y_end = y_start * height, y_end * height
-            right_x, left_x = right_x * width, left_x * width
+    def _is_visible(self, row_1: int, col_1: int, row_2: int, col_2: int) -> bool:
+        '''Checks whether anything between two dots, given top left first, is inside the viewport'''
 
-            self._canvas.create_line(right_x, y_start, right_x, y_end, width = thickness)
-            self._canvas.create_line(left_x, y_start, left_x, y_end, width = thickness)
-        
+        first_row, last_row, first_col, last_col = self._visible
+        return row_2 >= first_row and row_1 <= last_row and col_2 >= first_col and col_1 <= last_col
 
-    def _draw_connections(self) -> None:
-        '''Draws all the moves made on the board'''
-        
-        for row in self._board.boxes():
-            for box in row:
-                dots = box.return_connected_dots()
-                for pair in dots:
-                    dot_0 = self._dots[pair[0].row()][pair[0].col()]
-                    dot_1 = self._dots[pair[1].row()][pair[1].col()]
-                    
-                    dot.connect_dots(self._canvas, dot_0, dot_1)
 
+    def _draw_connection(self, edge: int) -> None:
+        '''Draws one move made on the board, if it is inside the viewport'''
 
-    def _draw_filled_boxes(self) -> None:
-        '''Fills in the boxes, if completed'''
+        row_1, col_1, row_2, col_2 = self._board.engine().edge_dots(edge)
+        if self._is_visible(row_1, col_1, row_2, col_2):
+            self._edge_items[edge] = dot.connect_dots(self._canvas,
+                                                      self._dots[row_1][col_1],
+                                                      self._dots[row_2][col_2],
+                                                      self._viewport)
 
-        self._width = self._canvas.winfo_width()
-        self._height = self._canvas.winfo_height()
 
-        for row in range(self._board.rows()):
-            for col in range(self._board.cols()):
-                box = self._board.boxes()[row][col]
-                if box.completed():
-                    points = (self._dots[row][col].center(), self._dots[row+1][col+1].center())
-                    point_pixels = []
-                    
-                    for point in points:
-                        point_pixels.append(point.pixel(self._width, self._height))
+    def _draw_filled_box(self, box_number: int) -> None:
+        '''Fills in a box if it is completed, or clears it if it is not'''
+
+        row, col = divmod(box_number, self._cols)
+        if not self._is_visible(row, col, row + 1, col + 1):
+            return
+        box = self._board.boxes()[row][col]
+        item = self._box_items.get(box_number)
+        if not box.completed():
+            if item is not None:
+                self._canvas.delete(item)
+                del self._box_items[box_number]
+            return
+
+        color = dot.translate_color(box.color())
+        if item is not None:
+            self._canvas.itemconfigure(item, fill = color)
+            return
+
+        points = (self._dots[row][col].center(), self._dots[row+1][col+1].center())
+        point_pixels = []
+        for point in points:
+            point_pixels.append(self._viewport.pixel(point))
 
-                    self._canvas.create_rectangle(point_pixels[0][0],
-                                            point_pixels[0][1],
-                                            point_pixels[1][0],
-                                            point_pixels[1][1],
-                                            fill = dot.translate_color(box.color()))
+        item = self._canvas.create_rectangle(point_pixels[0][0],
+                                             point_pixels[0][1],
+                                             point_pixels[1][0],
+                                             point_pixels[1][1],
+                                             fill = color)
+        self._canvas.tag_lower(item) #boxes sit underneath the dots and lines
+        self._box_items[box_number] = item
 
 
     def _draw_board(self) -> None:
-        '''Draws the entire board'''
+        '''Draws the part of the board inside the viewport from scratch, at the canvas's current size'''
         
         self._canvas.delete(tk.ALL)
-        self._draw_filled_boxes()
+        self._width = self._canvas.winfo_width()
+        self._height = self._canvas.winfo_height()
+        self._edge_items = {}
+        self._box_items = {}
+        self._preview_item = None
+        self._preview_edge = -1
+        if len(self._dots) != self._rows + 1 or len(self._dots[0]) != self._cols + 1:
+            self._place_dots()
+        self._viewport = dot.Viewport(self._width, self._height, self._zoom,
+                                      self._origin_x, self._origin_y)
+        self._visible = self._viewport.visible_dots(self._rows, self._cols)
         self._draw_dots()
         self._draw_outlines()
-        self._draw_connections()
+        self._draw_position()
+
+
+    def _draw_position(self) -> None:
+        '''Draws every edge and completed box inside the viewport, whether played in
+        the move history or already on the board, such as in a loaded game'''
+
+        engine = self._board.engine()
+        row_1, row_2, col_1, col_2 = self._visible
+        for row in range(row_1, row_2 + 1):
+            for col in range(col_1, col_2 + 1):
+                if col < self._cols:
+                    edge = engine.edge_between(row, col, row, col + 1)
+                    if engine.has_edge(edge):
+                        self._draw_connection(edge)
+                if row < self._rows:
+                    edge = engine.edge_between(row, col, row + 1, col)
+                    if engine.has_edge(edge):
+                        self._draw_connection(edge)
+                    if col < self._cols:
+                        self._draw_filled_box(row * self._cols + col)
+        self._shown_moves = engine.history()
+
+
+    def set_board(self, board: dots_logic.Board) -> None:
+        '''Shows a different board, such as a loaded game'''
+
+        self._board = board
+        self._rows = board.rows()
+        self._cols = board.cols()
+        self._zoom = 1.0
+        self._origin_x = self._origin_y = 0.0
+        self._clamp_view()
+        self._draw_board()
+
+
+    def update_moves(self) -> None:
+        '''Brings the canvas up to date with the board, adding and removing only
+        the edges played or taken back since the last update and the boxes around them'''
+
+        if not self._dots:
+            return
+
+        start = time.perf_counter()
+        engine = self._board.engine()
+        history = engine.history()
+        shown = self._shown_moves
+        common = min(len(history), len(shown))
+        while history[:common] != shown[:common]:
+            common -= 1
+
+        changed_boxes = set()
+        for edge in shown[common:]:
+            item = self._edge_items.pop(edge, None)
+            if item is not None:
+                self._canvas.delete(item)
+            changed_boxes.update(engine.edge_boxes(edge))
+        for edge in history[common:]:
+            self._draw_connection(edge)
+            changed_boxes.update(engine.edge_boxes(edge))
+
+        for box in changed_boxes:
+            self._draw_filled_box(box)
+        self._shown_moves = history
+        self._frame_times.append(time.perf_counter() - start)
+
+
+    def edge_at(self, x: int, y: int) -> int:
+        '''Returns the edge under a pixel on the canvas, or -1'''
+
+        if self._viewport is None:
+            return -1
+        dots = dot.find_edge(self._viewport.point_at(x, y), self._rows, self._cols)
+        if dots is None:
+            return -1
+        return self._board.engine().edge_between(*dots)
+
+
+    def show_preview(self, edge: int) -> None:
+        '''Highlights an undrawn edge the next move could take, or hides the highlight given -1'''
+
+        if edge >= 0 and self._board.engine().has_edge(edge):
+            edge = -1
+        if edge == self._preview_edge or not self._dots:
+            return
+
+        self._preview_edge = edge
+        if self._preview_item is not None:
+            self._canvas.delete(self._preview_item)
+            self._preview_item = None
+        if edge >= 0:
+            row_1, col_1, row_2, col_2 = self._board.engine().edge_dots(edge)
+            self._preview_item = dot.connect_dots(self._canvas,
+                                                  self._dots[row_1][col_1],
+                                                  self._dots[row_2][col_2],
+                                                  self._viewport)
+            self._canvas.itemconfigure(self._preview_item, fill = _PREVIEW_COLOR,
+                                       outline = _PREVIEW_COLOR)
+
+
+    def resize(self) -> None:
+        '''Fits the existing canvas items to the canvas's current size'''
+
+        start = time.perf_counter()
+        width = self._canvas.winfo_width()
+        height = self._canvas.winfo_height()
+        if not self._dots or self._width <= 1 or self._height <= 1:
+            self._draw_board()
+        elif (width, height) != (self._width, self._height):
+            self._canvas.scale(tk.ALL, 0, 0, width / self._width, height / self._height)
+            self._width = width
+            self._height = height
+            self._viewport = dot.Viewport(width, height, self._zoom, self._origin_x, self._origin_y)
+            self._canvas.itemconfigure('outline', width = self._outline_width())
+        else:
+            return
+        self._frame_times.append(time.perf_counter() - start)
+
+
+    def _outline_width(self) -> float:
+        '''Returns the width of the outlines at the canvas's size and the zoom,
+        kept thin enough not to cover small boxes'''
+
+        return min(_outline_thickness(self._width, self._height),
+                   0.1 * self._viewport.cell_size(self._rows, self._cols))
+
+
+    def _clamp_view(self) -> None:
+        '''Keeps the zoom between showing at most _MAX_VISIBLE_CELLS boxes across and
+        a few boxes across, and keeps the viewport on the board'''
+
+        largest = max(self._rows, self._cols)
+        self._zoom = min(max(self._zoom, largest / _MAX_VISIBLE_CELLS, 1.0), max(largest / 2, 4.0))
+        span = 1 / self._zoom
+        self._origin_x = min(max(self._origin_x, 0.0), 1 - span)
+        self._origin_y = min(max(self._origin_y, 0.0), 1 - span)
+
+
+    def zoom(self) -> float:
+        '''Returns how many times the board is magnified'''
+
+        return self._zoom
+
+
+    def zoom_at(self, factor: float, x: int, y: int) -> None:
+        '''Magnifies the board by a factor, keeping the spot under a pixel in place'''
+
+        if self._viewport is None:
+            return
+        start = time.perf_counter()
+        frac_x, frac_y = self._viewport.point_at(x, y).frac()
+        zoom = self._zoom
+        self._zoom *= factor
+        self._clamp_view()
+        if self._zoom == zoom:
+            return
+        self._origin_x = frac_x - x / (self._zoom * self._width)
+        self._origin_y = frac_y - y / (self._zoom * self._height)
+        self._clamp_view()
+        self._draw_board()
+        self._frame_times.append(time.perf_counter() - start)
+
+
+    def pan(self, dx: int, dy: int) -> None:
+        '''Moves the board by a number of pixels, drawing what comes into view'''
+
+        if self._viewport is None:
+            return
+        start = time.perf_counter()
+        origin = (self._origin_x, self._origin_y)
+        self._origin_x -= dx / (self._zoom * self._width)
+        self._origin_y -= dy / (self._zoom * self._height)
+        self._clamp_view()
+        if (self._origin_x, self._origin_y) == origin:
+            return
+        self._draw_board()
+        self._frame_times.append(time.perf_counter() - start)
+
+
+    def frame_times(self) -> [float]:
+        '''Returns how long recent redraws took, in seconds, oldest first
+
+        Only counts the time spent updating canvas items, not Tk painting them afterwards.'''
+
+        return list(self._frame_times)
+
+
+    def last_frame_time(self) -> float:
+        '''Returns how long the latest redraw took, in seconds'''
+
+        return self._frame_times[-1] if self._frame_times else 0.0
+
+
+    def worst_frame_time(self) -> float:
+        '''Returns the longest of the recent redraws, in seconds'''
+
+        return max(self._frame_times, default = 0.0)
+
+
+
+def _outline_thickness(width: int, height: int) -> float:
+    '''Returns the width of the outlines for a canvas size'''
+
+    avg = width + height / 2
+    return avg * .005
 
 
 
 class DotsApplication:
     '''Will start the entire application. Starts with option screen, then creates board'''
     
-    def __init__(self, board: dots_logic.Board) -> None:
+    def __init__(self, board: dots_logic.Board,
+                 players: {int: dots_ai.AlphaBetaPlayer} = None, window: tk.Tk = None) -> None:
         self._board = board
-        self._root_window = tk.Tk()
+        self._players = players if players is not None else {}
+        self._root_window = window if window is not None else tk.Tk()
         self._root_window.minsize(500,500)
 
         self._button_down = False
+        self._resize_pending = None
+        self._pan_pending = None
+        self._pan_from = (0, 0) #pixel the board was last dragged from
+        self._pan_by = [0, 0]   #drag not yet drawn, in pixels
 
         self._turn = tk.StringVar()
         self._turn.set('')
@@ -151,6 +413,9 @@ class DotsApplication:
         self._yellow_score = tk.StringVar()
         self._yellow_score.set('Yellow: 0')
 
+        self._search_status = tk.StringVar()
+        self._search_status.set('')
+
         label_frame = tk.Frame(
             master = self._root_window)
         label_frame.grid(row = 0, column = 0, padx = 10, pady = 10,
@@ -174,6 +439,40 @@ class DotsApplication:
             font = _DEFAULT_FONT)
         yellow_score_label.grid(row = 0, column = 2, padx = 10, sticky = tk.E + tk.N)
 
+        search_label = tk.Label(
+            master = label_frame,
+            textvariable = self._search_status,
+            font = ('Verdana', 10))
+        search_label.grid(row = 1, column = 1, padx = 10)
+
+        undo_button = tk.Button(
+            master = label_frame,
+            text = 'Undo',
+            font = _DEFAULT_FONT,
+            command = self._on_undo_clicked)
+        undo_button.grid(row = 1, column = 0, padx = 10, pady = 5, sticky = tk.W)
+
+        redo_button = tk.Button(
+            master = label_frame,
+            text = 'Redo',
+            font = _DEFAULT_FONT,
+            command = self._on_redo_clicked)
+        redo_button.grid(row = 1, column = 2, padx = 10, pady = 5, sticky = tk.E)
+
+        save_button = tk.Button(
+            master = label_frame,
+            text = 'Save',
+            font = _DEFAULT_FONT,
+            command = self._on_save_clicked)
+        save_button.grid(row = 2, column = 0, padx = 10, pady = 5, sticky = tk.W)
+
+        load_button = tk.Button(
+            master = label_frame,
+            text = 'Load',
+            font = _DEFAULT_FONT,
+            command = self._on_load_clicked)
+        load_button.grid(row = 2, column = 2, padx = 10, pady = 5, sticky = tk.E)
+
         label_frame.columnconfigure(0, weight = 1)
         label_frame.columnconfigure(1, weight = 1)
         label_frame.columnconfigure(2, weight = 1)
@@ -184,39 +483,176 @@ class DotsApplication:
         self._boardGUI = BoardGUI(self._root_window, self._board)
         self._boardGUI._canvas.bind('<Configure>', self._on_canvas_resized)
         self._boardGUI._canvas.bind('<Button-1>', self._on_line_clicked)
+        self._boardGUI._canvas.bind('<Motion>', self._on_mouse_moved)
+        self._boardGUI._canvas.bind('<Leave>', self._on_mouse_left)
+        self._boardGUI._canvas.bind('<MouseWheel>', self._on_wheel)
+        self._boardGUI._canvas.bind('<Button-4>', self._on_wheel)
+        self._boardGUI._canvas.bind('<Button-5>', self._on_wheel)
+        for button in (2, 3):
+            self._boardGUI._canvas.bind('<ButtonPress-{}>'.format(button), self._on_drag_started)
+            self._boardGUI._canvas.bind('<B{}-Motion>'.format(button), self._on_dragged)
+        self._schedule_computer_move()
     
 
     def _on_canvas_resized(self, event: tk.Event) -> None:
-        '''Re-draws the board when the window is resized'''
+        '''Re-draws the board once Tk is idle, so a burst of resize events costs one redraw'''
+
+        if self._resize_pending is None:
+            self._resize_pending = self._root_window.after_idle(self._on_resize_idle)
+
+
+    def _on_resize_idle(self) -> None:
+        '''Fits the board to the canvas after the latest resize event'''
 
-        self._boardGUI._draw_board()
+        self._resize_pending = None
+        self._boardGUI.resize()
         
 
+    def _on_wheel(self, event: tk.Event) -> None:
+        '''Zooms in or out around the cursor'''
+
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self._boardGUI.zoom_at(_ZOOM_STEP, event.x, event.y)
+        else:
+            self._boardGUI.zoom_at(1 / _ZOOM_STEP, event.x, event.y)
+
+
+    def _on_drag_started(self, event: tk.Event) -> None:
+        '''Starts moving the board with the right or middle mouse button'''
+
+        self._pan_from = (event.x, event.y)
+
+
+    def _on_dragged(self, event: tk.Event) -> None:
+        '''Moves the board with the mouse once Tk is idle, so a burst of motion costs one redraw'''
+
+        self._pan_by[0] += event.x - self._pan_from[0]
+        self._pan_by[1] += event.y - self._pan_from[1]
+        self._pan_from = (event.x, event.y)
+        if self._pan_pending is None:
+            self._pan_pending = self._root_window.after_idle(self._on_pan_idle)
+
+
+    def _on_pan_idle(self) -> None:
+        '''Moves the board by everything dragged since the last redraw'''
+
+        self._pan_pending = None
+        dx, dy = self._pan_by
+        self._pan_by = [0, 0]
+        self._boardGUI.pan(dx, dy)
+
+
     def _on_line_clicked(self, event: tk.Event) -> None:
         '''Determines whether or not a move has been made through clicks on the GUI'''
         
-        click_point = point.from_pixel(event.x, event.y,
-                                       self._boardGUI._canvas.winfo_width(),
-                                       self._boardGUI._canvas.winfo_height())
-
-        for row in range(len(self._board.boxes())):
-            for col in range(len(self._board.boxes()[row])):
-                pairs = self._board.boxes()[row][col].return_possible_pairs()
-                for pair in pairs:
-                    dot_0 = pair[0]
-                    dot_1 = pair[1]
-                    if dot.contains_point(click_point,
-                                          self._boardGUI._dots[dot_0.row()][dot_0.col()],
-                                          self._boardGUI._dots[dot_1.row()][dot_1.col()]):
-                        self._board.make_move(dot_0.row(),
-                                              dot_0.col(),
-                                              dot_1.row(),
-                                              dot_1.col())
-                        self._boardGUI._draw_board()
-
-                        self.update_score()
-                        self.update_turn()
-                        return
+        if self._board.turn() in self._players:
+            return
+
+        edge = self._boardGUI.edge_at(event.x, event.y)
+        if edge >= 0:
+            self._board.make_move(*self._board.engine().edge_dots(edge))
+            self._refresh()
+
+
+    def _on_mouse_moved(self, event: tk.Event) -> None:
+        '''Previews the edge under the cursor when it is a person's turn'''
+
+        if self._board.turn() in self._players or self._board.is_game_over():
+            self._boardGUI.show_preview(-1)
+        else:
+            self._boardGUI.show_preview(self._boardGUI.edge_at(event.x, event.y))
+
+
+    def _on_mouse_left(self, event: tk.Event) -> None:
+        '''Hides the preview when the cursor leaves the board'''
+
+        self._boardGUI.show_preview(-1)
+
+
+    def _schedule_computer_move(self) -> None:
+        '''Lets the computer move after the window has updated, if it is its turn'''
+
+        if not self._board.is_game_over() and self._board.turn() in self._players:
+            self._root_window.after(10, self._on_computer_move)
+
+
+    def _on_computer_move(self) -> None:
+        '''Searches for and makes the computer player's move'''
+
+        player = self._players.get(self._board.turn())
+        if player is None or self._board.is_game_over():
+            return
+
+        self._board.make_move(*player.choose_move(self._board))
+        info = player.last_search()
+        self._search_status.set('Depth {}, {:.0f} nodes/s'.format(info.depth(),
+                                                                  info.nodes_per_second()))
+        self._refresh()
+        
+
+    def _on_undo_clicked(self) -> None:
+        '''Takes back moves until it is a person's turn again'''
+
+        if self._board.undo():
+            while self._board.turn() in self._players and self._board.undo():
+                pass
+            self._refresh()
+
+
+    def _on_redo_clicked(self) -> None:
+        '''Replays moves taken back until it is a person's turn again'''
+
+        if self._board.redo():
+            while self._board.turn() in self._players and self._board.redo():
+                pass
+            self._refresh()
+
+
+    def _on_save_clicked(self) -> None:
+        '''Saves the game to a file, as text if the name ends in .txt'''
+
+        path = tkinter.filedialog.asksaveasfilename(defaultextension = '.dots',
+                                                    filetypes = _SAVE_FILE_TYPES)
+        if not path:
+            return
+        if path.endswith('.txt'):
+            with open(path, 'w') as file:
+                file.write(self._board.to_text())
+        else:
+            with open(path, 'wb') as file:
+                file.write(self._board.to_bytes())
+
+
+    def _on_load_clicked(self) -> None:
+        '''Replaces the game with one saved to a file'''
+
+        path = tkinter.filedialog.askopenfilename(filetypes = _SAVE_FILE_TYPES)
+        if not path:
+            return
+        try:
+            if path.endswith('.txt'):
+                with open(path) as file:
+                    board = dots_logic.Board.from_text(file.read())
+            else:
+                with open(path, 'rb') as file:
+                    board = dots_logic.Board.from_bytes(file.read())
+        except (OSError, ValueError) as error:
+            tkinter.messagebox.showerror('Load', 'Could not load {}: {}'.format(path, error))
+            return
+
+        self._board = board
+        self._boardGUI.set_board(board)
+        self._refresh()
+
+
+    def _refresh(self) -> None:
+        '''Re-draws the board and labels after the board has changed'''
+
+        self._boardGUI.show_preview(-1)
+        self._boardGUI.update_moves()
+        self.update_score()
+        self.update_turn()
+        self._schedule_computer_move()
         
 
     def start(self) -> None:
@@ -228,8 +664,9 @@ class DotsApplication:
     def update_score(self) -> None:
         '''Updates the score label'''
         
-        self._orange_score.set('Orange: {}'.format(self._board.get_score()[0]))
-        self._yellow_score.set('Yellow: {}'.format(self._board.get_score()[1]))
+        orange, yellow = self._board.get_score()
+        self._orange_score.set('Orange: {}'.format(orange))
+        self._yellow_score.set('Yellow: {}'.format(yellow))
         
 
     def update_turn(self) -> None:
@@ -242,28 +679,47 @@ class DotsApplication:
             self._turn.set('Turn: {}'.format(turn))
             
 
-def create_board() -> dots_logic.Board:
-    '''Creates the option menu and uses the inputs to create a dots board'''
-    menu = dots_option_select.OptionMenu()
+def create_game(root: tk.Tk = None) -> (dots_logic.Board, {int: dots_ai.AlphaBetaPlayer}):
+    '''Creates the option menu and uses the inputs to create a dots board and computer players,
+    returning None if the menu was closed without starting a game'''
+    menu = dots_option_select.OptionMenu(root)
     inputs = menu.answers()
-    if len(inputs) != 0:
-        board = dots_logic.Board(inputs[0], inputs[1])
-        board.set_turn(inputs[2])
-        board.set_rules(inputs[3])
-        return board
-    else:
-        raise InputError
+    if len(inputs) == 0:
+        return None
+
+    board = dots_logic.Board(inputs[0], inputs[1])
+    board.set_turn(inputs[2])
+    board.set_rules(inputs[3])
+
+    players = {}
+    books = dots_book.load_books([(inputs[0], inputs[1])])
+    if inputs[4]:
+        players[-1] = dots_ai.AlphaBetaPlayer(inputs[6], books = books)
+    if inputs[5]:
+        players[1] = dots_ai.AlphaBetaPlayer(inputs[6], books = books)
+    return board, players
 
 
 def run_dots() -> None:
-    '''Creates and runs an instance of Dots and Boxes'''
+    '''Creates and runs an instance of Dots and Boxes, asking for the options and then
+    playing in the same window'''
 
+    dots_profile.enable_from_environment()
     try:
-        game_board = create_board()
-        app = DotsApplication(game_board)
-        app.start()
-    except:
-        pass
+        root = tk.Tk()
+    except tk.TclError as error:
+        sys.exit('Cannot open a window: {}'.format(error))
+
+    root.withdraw()
+    game = create_game(root)
+    if game is None:
+        root.destroy()
+        return
+
+    game_board, players = game
+    root.deiconify()
+    app = DotsApplication(game_board, players, root)
+    app.start()
 
 
 
@@ -0,0 +1,165 @@
+#Vectorized engine playing many boards of the same size at once, for rollouts
+
+#Requires NumPy. Uses the same edge and box numbering as dots_engine, and the
+#same rules as dots_logic.Board: completing a box keeps the turn.
+
+import numpy as np
+import dots_engine
+
+
+class BatchEngine:
+    '''Holds many boards of one size as arrays and plays one move on each per step'''
+
+    def __init__(self, count: int, rows: int, cols: int, first: int = -1) -> None:
+        layout = dots_engine.Engine(rows, cols)
+        self._count = count
+        self._rows = rows
+        self._cols = cols
+        self._box_count = rows * cols
+        self._edge_count = layout.edge_count()
+
+        #edge -> its two boxes, with edges on the border padded by an unused box column
+        self._edge_boxes = np.full((self._edge_count, 2), self._box_count, dtype = np.intp)
+        for edge in range(self._edge_count):
+            boxes = layout.edge_boxes(edge)
+            self._edge_boxes[edge, :len(boxes)] = boxes
+
+        self._edges = np.zeros((count, self._edge_count), dtype = bool)
+        self._sides = np.zeros((count, self._box_count + 1), dtype = np.int8)
+        self._owners = np.zeros((count, self._box_count + 1), dtype = np.int8)
+        self._turns = np.full(count, first, dtype = np.int8)
+        self._scores = np.zeros((count, 2), dtype = np.int32) #orange, yellow
+        self._move_counts = np.zeros(count, dtype = np.int32)
+
+
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        '''Plays one edge on every board, skipping boards given -1, and returns the boxes each move completed'''
+
+        moves = np.asarray(moves, dtype = np.intp)
+        completed = np.zeros(self._count, dtype = np.int32)
+        boards = np.nonzero(moves >= 0)[0]
+        if len(boards) == 0:
+            return completed
+
+        edges = moves[boards]
+        if self._edges[boards, edges].any():
+            raise ValueError('Edge already drawn on board {}'.format(
+                boards[self._edges[boards, edges]][0]))
+
+        self._edges[boards, edges] = True
+        self._move_counts[boards] += 1
+
+        rows = boards[:, None]
+        boxes = self._edge_boxes[edges]
+        self._sides[rows, boxes] += 1
+        self._sides[:, self._box_count] = 0
+        done = (self._sides[rows, boxes] == 4) & (boxes < self._box_count)
+
+        turns = self._turns[boards]
+        self._owners[rows, boxes] = np.where(done, turns[:, None], self._owners[rows, boxes])
+        gained = done.sum(axis = 1, dtype = np.int32)
+        completed[boards] = gained
+
+        self._scores[boards, (turns + 1) // 2] += gained
+        self._turns[boards] = np.where(gained > 0, turns, -turns)
+        return completed
+
+
+    def legal_moves(self) -> np.ndarray:
+        '''Returns a (boards, edges) mask of the undrawn edges'''
+
+        return ~self._edges
+
+
+    def capture_moves(self) -> np.ndarray:
+        '''Returns a (boards, edges) mask of the undrawn edges that complete a box'''
+
+        three = self._sides[:, self._edge_boxes] == 3
+        return three.any(axis = 2) & ~self._edges
+
+
+    def random_moves(self, generator: np.random.Generator) -> np.ndarray:
+        '''Picks a uniformly random undrawn edge on every board, or -1 where the game is over'''
+
+        weights = generator.random((self._count, self._edge_count))
+        weights[self._edges] = -1.0
+        moves = weights.argmax(axis = 1)
+        moves[self.is_game_over()] = -1
+        return moves
+
+
+    def playout(self, generator: np.random.Generator) -> np.ndarray:
+        '''Plays random moves on every board until all games are over and returns the scores'''
+
+        while not self.is_game_over().all():
+            self.step(self.random_moves(generator))
+        return self.scores()
+
+
+    def is_game_over(self) -> np.ndarray:
+        '''Returns which boards have every box completed'''
+
+        return self._scores.sum(axis = 1) == self._box_count
+
+
+    def scores(self) -> np.ndarray:
+        '''Returns the scores of every board as a (boards, 2) array of (orange, yellow)'''
+
+        return self._scores
+
+
+    def turns(self) -> np.ndarray:
+        '''Returns the color to move on every board'''
+
+        return self._turns
+
+
+    def owners(self) -> np.ndarray:
+        '''Returns the color that completed each box, as a (boards, boxes) array'''
+
+        return self._owners[:, :self._box_count]
+
+
+    def sides(self) -> np.ndarray:
+        '''Returns how many sides of each box are drawn, as a (boards, boxes) array'''
+
+        return self._sides[:, :self._box_count]
+
+
+    def edges(self) -> np.ndarray:
+        '''Returns the (boards, edges) mask of drawn edges'''
+
+        return self._edges
+
+
+    def move_counts(self) -> np.ndarray:
+        '''Returns how many moves have been played on every board'''
+
+        return self._move_counts
+
+
+    def bitmasks(self, board: int) -> (int):
+        '''Returns the drawn edges of one board as (horizontal, vertical) bitmasks, as in dots_engine'''
+
+        split = (self._rows + 1) * self._cols
+        packed = np.packbits(self._edges[board], bitorder = 'little').tobytes()
+        mask = int.from_bytes(packed, 'little')
+        return mask & ((1 << split) - 1), mask >> split
+
+
+    def count(self) -> int:
+        '''Returns the number of boards'''
+
+        return self._count
+
+
+    def rows(self) -> int:
+        '''Returns the number of rows on each board, in boxes'''
+
+        return self._rows
+
+
+    def cols(self) -> int:
+        '''Returns the number of columns on each board, in boxes'''
+
+        return self._cols
@@ -0,0 +1,453 @@
+#Reproducible headless benchmarks of the engine, the AI and the board drawing code
+
+#Every benchmark uses fixed seeds, runs several times and keeps the median, so two
+#runs on the same machine are comparable. Results are saved as JSON:
+#  {"created": ..., "python": ..., "platform": ..., "settings": {...},
+#   "results": {"name": {"value": ..., "unit": ..., "higher_is_better": true}, ...}}
+#and --compare reports how a newer file differs from an older one, exiting with
+#status 1 when anything got worse by more than the threshold.
+#The drawing benchmarks run BoardGUI on a mocked canvas, so they measure the Python
+#side of a redraw but not Tk painting it, and need no display.
+
+import argparse
+import datetime
+import json
+import platform
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import dots_ai
+import dots_engine
+import dots_logic
+
+_DEFAULT_SIZES = [5, 10, 20, 50]
+_CANVAS_SIZE = 800
+_SEED = 2024
+_SAMPLE_SECONDS = 0.05 #shortest time one sample of a benchmark runs for
+_GROUPS = ['make_move', 'random_games', 'score', 'ai', 'draw', 'click', 'startup']
+_LAUNCHES = 10 #process starts timed per startup sample
+
+
+
+class _MockCanvas:
+    '''Stands in for a tk.Canvas, keeping items in a dictionary'''
+
+    def __init__(self, width: int, height: int) -> None:
+        self._width = width
+        self._height = height
+        self._items = {} #item -> [coordinates, options]
+        self._next_item = 1
+
+
+    def winfo_width(self) -> int:
+        return self._width
+
+
+    def winfo_height(self) -> int:
+        return self._height
+
+
+    def _create(self, coordinates: tuple, options: dict) -> int:
+        item = self._next_item
+        self._next_item += 1
+        self._items[item] = [list(coordinates), options]
+        return item
+
+
+    def create_line(self, *coordinates, **options) -> int:
+        return self._create(coordinates, options)
+
+
+    def create_rectangle(self, *coordinates, **options) -> int:
+        return self._create(coordinates, options)
+
+
+    def create_oval(self, *coordinates, **options) -> int:
+        return self._create(coordinates, options)
+
+
+    def _find(self, tag) -> [int]:
+        if tag == 'all':
+            return list(self._items)
+        if tag in self._items:
+            return [tag]
+        return [item for item, (coordinates, options) in self._items.items()
+                if options.get('tags') == tag]
+
+
+    def delete(self, tag) -> None:
+        for item in self._find(tag):
+            del self._items[item]
+
+
+    def itemconfigure(self, tag, **options) -> None:
+        for item in self._find(tag):
+            self._items[item][1].update(options)
+
+
+    def tag_lower(self, item) -> None:
+        pass
+
+
+    def coords(self, item, *coordinates) -> None:
+        self._items[item][0] = list(coordinates)
+
+
+    def scale(self, tag, x: float, y: float, x_scale: float, y_scale: float) -> None:
+        for item in self._find(tag):
+            coordinates = self._items[item][0]
+            for index in range(0, len(coordinates), 2):
+                coordinates[index] = x + (coordinates[index] - x) * x_scale
+                coordinates[index + 1] = y + (coordinates[index + 1] - y) * y_scale
+
+
+
+class _MockVariable:
+    '''Stands in for a tk.StringVar'''
+
+    def __init__(self) -> None:
+        self._value = ''
+
+
+    def set(self, value: str) -> None:
+        self._value = value
+
+
+    def get(self) -> str:
+        return self._value
+
+
+
+class _ClickEvent:
+    '''The parts of a tk.Event the click handler reads'''
+
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+
+def _result(value: float, unit: str, higher_is_better: bool) -> dict:
+    '''Returns one measurement as stored in the results file'''
+
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def _median_time(function, repeats: int) -> float:
+    '''Returns the median number of seconds a call to function takes over several samples,
+    after one warm-up call, calling it often enough that each sample is long enough to time'''
+
+    start = time.perf_counter()
+    function()
+    loops = max(1, int(_SAMPLE_SECONDS / max(time.perf_counter() - start, 1e-9)))
+
+    times = []
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        for loop in range(loops):
+            function()
+        times.append((time.perf_counter() - start) / loops)
+    return statistics.median(times)
+
+
+def _random_game(rows: int, cols: int, seed: int, moves: int = None) -> [int]:
+    '''Returns the edges of a seeded random game, or of its first moves'''
+
+    engine = dots_engine.Engine(rows, cols)
+    generator = random.Random(seed)
+    edges = list(range(engine.edge_count()))
+    generator.shuffle(edges)
+    return edges if moves is None else edges[:moves]
+
+
+def _new_board(rows: int, cols: int, edges: [int] = ()) -> dots_logic.Board:
+    '''Returns a board with Orange to move first and some edges already played'''
+
+    board = dots_logic.Board(rows, cols)
+    board.set_turn(-1)
+    board.set_rules('>')
+    engine = board.engine()
+    for edge in edges:
+        board.make_move(*engine.edge_dots(edge))
+    return board
+
+
+def _games_for(rows: int, cols: int, moves: int) -> int:
+    '''Returns how many games of a size make up about the given number of moves'''
+
+    return max(1, moves // dots_engine.Engine(rows, cols).edge_count())
+
+
+def bench_make_move(sizes: [int], repeats: int) -> dict:
+    '''Moves per second through Board.make_move, not counting choosing them'''
+
+    results = {}
+    for size in sizes:
+        games = [_random_game(size, size, _SEED + game) for game in range(_games_for(size, size, 20000))]
+        engine = dots_engine.Engine(size, size)
+        game_dots = [[engine.edge_dots(edge) for edge in edges] for edges in games]
+
+        def play_games() -> None:
+            for dots in game_dots:
+                board = _new_board(size, size)
+                for move in dots:
+                    board.make_move(*move)
+
+        moves = sum(len(dots) for dots in game_dots)
+        seconds = _median_time(play_games, repeats)
+        results['make_move.{0}x{0}'.format(size)] = _result(moves / seconds, 'moves/s', True)
+    return results
+
+
+def bench_random_games(sizes: [int], repeats: int) -> dict:
+    '''Complete random games per second on a Board, choosing every move as a player would'''
+
+    results = {}
+    for size in sizes:
+        games = _games_for(size, size, 20000)
+
+        def play_games() -> None:
+            generator = random.Random(_SEED)
+            for game in range(games):
+                board = _new_board(size, size)
+                engine = board.engine()
+                while not board.is_game_over():
+                    board.make_move(*engine.edge_dots(engine.random_move(generator)))
+
+        seconds = _median_time(play_games, repeats)
+        results['random_games.{0}x{0}'.format(size)] = _result(games / seconds, 'games/s', True)
+    return results
+
+
+def bench_score(sizes: [int], repeats: int) -> dict:
+    '''Cost of Board.get_score and Board.is_game_over on a half played board'''
+
+    results = {}
+    calls = 10000
+    for size in sizes:
+        edges = _random_game(size, size, _SEED)
+        board = _new_board(size, size, edges[:len(edges) // 2])
+
+        def score() -> None:
+            for call in range(calls):
+                board.get_score()
+
+        def game_over() -> None:
+            for call in range(calls):
+                board.is_game_over()
+
+        results['get_score.{0}x{0}'.format(size)] = _result(
+            _median_time(score, repeats) / calls * 1e9, 'ns/call', False)
+        results['is_game_over.{0}x{0}'.format(size)] = _result(
+            _median_time(game_over, repeats) / calls * 1e9, 'ns/call', False)
+    return results
+
+
+def bench_ai(repeats: int, depth: int = 4) -> dict:
+    '''Alpha-beta nodes per second searching seeded 5x5 openings to a fixed depth'''
+
+    positions = [_random_game(5, 5, _SEED + position, 20) for position in range(4)]
+    rates = []
+    for repeat in range(repeats):
+        nodes = 0
+        seconds = 0.0
+        for edges in positions:
+            player = dots_ai.AlphaBetaPlayer(time_limit = 3600.0, max_depth = depth)
+            player.choose_move(_new_board(5, 5, edges))
+            nodes += player.last_search().nodes()
+            seconds += player.last_search().seconds()
+        rates.append(nodes / seconds)
+    return {'alphabeta_nps.5x5': _result(statistics.median(rates), 'nodes/s', True)}
+
+
+def bench_startup(repeats: int) -> dict:
+    '''Milliseconds to start a Python process that imports the logic, the AI, or runs the
+    command line, next to starting one that imports nothing'''
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    commands = {
+        'startup.python': [sys.executable, '-c', 'pass'],
+        'startup.import_dots_logic': [sys.executable, '-c', 'import dots_logic'],
+        'startup.import_dots_ai': [sys.executable, '-c', 'import dots_ai'],
+        'startup.cli_help': [sys.executable, 'dots_cli.py', '--help'],
+    }
+    results = {}
+    for name, command in commands.items():
+        def launch() -> None:
+            for launch in range(_LAUNCHES):
+                subprocess.run(command, cwd = directory, stdout = subprocess.DEVNULL, check = True)
+
+        seconds = _median_time(launch, repeats) / _LAUNCHES
+        results[name] = _result(seconds * 1000, 'ms', False)
+    return results
+
+
+def _headless_application(board: dots_logic.Board):
+    '''Returns a DotsApplication whose board is drawn on a mocked canvas, without a window'''
+
+    import dots_application_gui
+
+    class HeadlessApplication(dots_application_gui.DotsApplication):
+        def __init__(self) -> None:
+            self._board = board
+            self._players = {}
+            self._root_window = None
+            self._resize_pending = None
+            self._turn = _MockVariable()
+            self._orange_score = _MockVariable()
+            self._yellow_score = _MockVariable()
+            self._search_status = _MockVariable()
+            self._boardGUI = dots_application_gui.BoardGUI(
+                None, board, _MockCanvas(_CANVAS_SIZE, _CANVAS_SIZE))
+
+    return HeadlessApplication()
+
+
+def bench_draw(sizes: [int], repeats: int) -> dict:
+    '''Milliseconds for BoardGUI._draw_board to redraw a half played board from scratch'''
+
+    results = {}
+    for size in sizes:
+        edges = _random_game(size, size, _SEED)
+        board_gui = _headless_application(_new_board(size, size, edges[:len(edges) // 2]))._boardGUI
+        seconds = _median_time(board_gui._draw_board, repeats)
+        results['draw_board.{0}x{0}'.format(size)] = _result(seconds * 1000, 'ms', False)
+    return results
+
+
+def bench_click(sizes: [int], repeats: int) -> dict:
+    '''Milliseconds DotsApplication._on_line_clicked takes per click, clicking the middle
+    of each edge of a seeded random game in turn'''
+
+    results = {}
+    for size in sizes:
+        edges = _random_game(size, size, _SEED)
+        times = []
+        for repeat in range(repeats):
+            application = _headless_application(_new_board(size, size))
+            board_gui = application._boardGUI
+            board_gui.resize()
+            engine = application._board.engine()
+            clicks = []
+            for edge in edges:
+                row_1, col_1, row_2, col_2 = engine.edge_dots(edge)
+                x_1, y_1 = board_gui._dots[row_1][col_1].center().pixel(_CANVAS_SIZE, _CANVAS_SIZE)
+                x_2, y_2 = board_gui._dots[row_2][col_2].center().pixel(_CANVAS_SIZE, _CANVAS_SIZE)
+                clicks.append(_ClickEvent((x_1 + x_2) // 2, (y_1 + y_2) // 2))
+
+            for event in clicks:
+                start = time.perf_counter()
+                application._on_line_clicked(event)
+                times.append(time.perf_counter() - start)
+            if engine.move_count() != len(edges):
+                raise RuntimeError('clicks on a {0}x{0} board missed their edges'.format(size))
+
+        times.sort()
+        results['click.{0}x{0}'.format(size)] = _result(statistics.median(times) * 1000, 'ms', False)
+        results['click_p99.{0}x{0}'.format(size)] = _result(
+            times[min(len(times) - 1, int(0.99 * len(times)))] * 1000, 'ms', False)
+    return results
+
+
+def run(sizes: [int] = None, repeats: int = 5, groups: [str] = None, report = print) -> dict:
+    '''Runs the chosen benchmark groups and returns the results file's contents'''
+
+    sizes = sizes if sizes is not None else _DEFAULT_SIZES
+    groups = groups if groups is not None else _GROUPS
+    results = {}
+    for group in groups:
+        start = time.perf_counter()
+        if group == 'make_move':
+            results.update(bench_make_move(sizes, repeats))
+        elif group == 'random_games':
+            results.update(bench_random_games(sizes, repeats))
+        elif group == 'score':
+            results.update(bench_score(sizes, repeats))
+        elif group == 'ai':
+            results.update(bench_ai(repeats))
+        elif group == 'draw':
+            results.update(bench_draw(sizes, repeats))
+        elif group == 'click':
+            results.update(bench_click([size for size in sizes if size <= 20], repeats))
+        elif group == 'startup':
+            results.update(bench_startup(repeats))
+        else:
+            raise ValueError('Unknown benchmark group {!r}, expected one of {}'.format(
+                group, ', '.join(_GROUPS)))
+        report('{} done in {:.1f} s'.format(group, time.perf_counter() - start))
+
+    return {'created': datetime.datetime.now().isoformat(timespec = 'seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {'sizes': sizes, 'repeats': repeats, 'groups': groups},
+            'results': results}
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1) -> [str]:
+    '''Returns the names of results that got worse by more than threshold, a fraction,
+    printing how every result shared by both runs changed'''
+
+    regressions = []
+    print('{:<28} {:>14} {:>14} {:>9}'.format('benchmark', 'old', 'new', 'change'))
+    for name, result in new['results'].items():
+        if name not in old['results']:
+            continue
+        before = old['results'][name]['value']
+        after = result['value']
+        change = (after - before) / before if before else 0.0
+        worse = -change if result['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('{:<28} {:>14.4g} {:>14.4g} {:>+8.1%} {}{}'.format(name, before, after, change,
+                                                                 result['unit'], flag))
+    return regressions
+
+
+def _print_results(results: dict) -> None:
+    '''Prints one run's results as a table'''
+
+    for name, result in results['results'].items():
+        print('{:<28} {:>14.4g} {}'.format(name, result['value'], result['unit']))
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs the benchmarks or compares two results files from the command line'''
+
+    parser = argparse.ArgumentParser(description = 'Benchmarks the engine, AI and drawing code')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = _DEFAULT_SIZES,
+                        help = 'square board sizes; clicks are only timed up to 20x20')
+    parser.add_argument('--repeats', type = int, default = 5)
+    parser.add_argument('--only', nargs = '+', choices = _GROUPS, help = 'benchmark groups to run')
+    parser.add_argument('--output', help = 'JSON file to save the results to')
+    parser.add_argument('--compare', nargs = 2, metavar = ('OLD', 'NEW'),
+                        help = 'compare two results files instead of running')
+    parser.add_argument('--threshold', type = float, default = 0.1,
+                        help = 'fraction a result may get worse by before it counts as a regression')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            old = json.load(file)
+        with open(args.compare[1]) as file:
+            new = json.load(file)
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print('{} regression(s) beyond {:.0%}'.format(len(regressions), args.threshold))
+            sys.exit(1)
+        return
+
+    results = run(args.sizes, args.repeats, args.only)
+    _print_results(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent = 2)
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,260 @@
+#Opening books: searched replies for every early position of a board size and rule
+
+#A book covers every position reachable in its first few moves, counting
+#positions that are symmetric images of each other once. Each is keyed by its
+#canonical symmetric Zobrist hash (dots_symmetry with a fixed seed) and stores the
+#best edge, in the orientation of the canonical image, and its search value.
+#The file is a 16 byte header (b'DBXO', version, rules, rows, cols, moves covered,
+#position count) followed by the sorted keys as little-endian uint64, then the edges
+#as uint16 and the values as int16 in the same order. Lookups memory-map the file
+#and binary search the keys, so opening a book reads nothing but the header.
+
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+import dots_engine
+import dots_symmetry
+
+_MAGIC = b'DBXO'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBcBBB3xI')
+_SEED = 0 #hash seed every book is built and read with
+_DEFAULT_MOVES = {3: 4, 5: 3, 7: 2} #moves covered by default, by the larger side of the board
+
+_open_books = {} #path -> book, shared by every player in the process
+
+
+def default_path(rows: int, cols: int, rules: str) -> str:
+    '''Returns where a book is stored unless told otherwise'''
+
+    name = 'most' if rules == '>' else 'least'
+    return os.path.join('book', '{}x{}_{}.dbo'.format(rows, cols, name))
+
+
+def _drawn_count(engine: dots_engine.Engine) -> int:
+    '''Returns how many edges are drawn'''
+
+    return bin(engine.edge_mask()).count('1')
+
+
+
+class OpeningBook:
+    '''Read-only, memory-mapped book for one board size and rule'''
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise ValueError('{} is not an opening book'.format(path))
+        magic, version, rules, rows, cols, moves, count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('{} is not an opening book'.format(path))
+        if len(self._map) != _HEADER.size + 12 * count:
+            raise ValueError('{} is incomplete'.format(path))
+
+        self._rows = rows
+        self._cols = cols
+        self._rules = rules.decode('ascii')
+        self._moves = moves
+        self._count = count
+        view = memoryview(self._map)
+        keys_end = _HEADER.size + 8 * count
+        edges_end = keys_end + 2 * count
+        if sys.byteorder == 'little':
+            self._keys = view[_HEADER.size:keys_end].cast('Q')
+            self._edges = view[keys_end:edges_end].cast('H')
+            self._values = view[edges_end:].cast('h')
+        else: #copy and swap, since the file is little-endian
+            self._keys = array.array('Q', view[_HEADER.size:keys_end])
+            self._edges = array.array('H', view[keys_end:edges_end])
+            self._values = array.array('h', view[edges_end:])
+            for values in (self._keys, self._edges, self._values):
+                values.byteswap()
+        self._hasher = dots_symmetry.SymmetryHasher(rows, cols, _SEED)
+
+
+    def matches(self, engine: dots_engine.Engine, rules: str) -> bool:
+        '''Checks whether the book covers an engine's position under the rules given'''
+
+        return ((engine.rows(), engine.cols(), rules) == (self._rows, self._cols, self._rules)
+                and _drawn_count(engine) <= self._moves)
+
+
+    def lookup(self, engine: dots_engine.Engine) -> (int, int):
+        '''Returns the book edge and its value for the engine's position, or (-1, 0)
+        if the position is not in the book'''
+
+        hasher = self._hasher
+        hasher.reset(engine)
+        key, symmetry = hasher.canonical()
+        index = bisect.bisect_left(self._keys, key)
+        if index == self._count or self._keys[index] != key:
+            return -1, 0
+        return hasher.from_canonical(self._edges[index], symmetry), self._values[index]
+
+
+    def moves(self) -> int:
+        '''Returns how many moves into the game the book reaches'''
+
+        return self._moves
+
+
+    def __len__(self) -> int:
+        return self._count
+
+
+    def close(self) -> None:
+        '''Releases the memory map'''
+
+        self._keys = self._edges = self._values = None
+        self._map.close()
+        self._file.close()
+
+
+
+def load_books(sizes: [(int, int)] = None) -> [OpeningBook]:
+    '''Returns the books found at their default paths, for the sizes given or every
+    default size, opening each only once per process'''
+
+    if sizes is None:
+        sizes = [(size, size) for size in sorted(_DEFAULT_MOVES)]
+    books = []
+    for rows, cols in sizes:
+        for rules in ('>', '<'):
+            path = default_path(rows, cols, rules)
+            if path not in _open_books and os.path.exists(path):
+                _open_books[path] = OpeningBook(path)
+            if path in _open_books:
+                books.append(_open_books[path])
+    return books
+
+
+def book_move(books: [OpeningBook], engine: dots_engine.Engine, rules: str) -> (int, int):
+    '''Returns the edge and value the first book covering the position gives, or (-1, 0)'''
+
+    for book in books:
+        if book.matches(engine, rules):
+            edge, value = book.lookup(engine)
+            if edge >= 0 and not engine.has_edge(edge):
+                return edge, value
+    return -1, 0
+
+
+def _positions(rows: int, cols: int, moves: int) -> {int: [int]}:
+    '''Returns one sequence of edges reaching each position with up to the given number
+    of edges drawn, keyed by the position's canonical hash'''
+
+    empty = dots_engine.Engine(rows, cols)
+    hasher = dots_symmetry.SymmetryHasher(rows, cols, _SEED)
+    positions = {hasher.canonical_hash(): []}
+    layer = [[]]
+    for move in range(moves):
+        next_layer = []
+        for edges in layer:
+            hasher.reset(empty)
+            for edge in edges:
+                hasher.update(edge)
+            for edge in range(empty.edge_count()):
+                if edge in edges:
+                    continue
+                hasher.update(edge)
+                key = hasher.canonical_hash()
+                hasher.update(edge) #drawing an edge again takes it back out of the hashes
+                if key not in positions:
+                    positions[key] = edges + [edge]
+                    next_layer.append(edges + [edge])
+        layer = next_layer
+    return positions
+
+
+def _search_position(task: tuple) -> (int, int, int):
+    '''Searches one position in a worker, returning (key, canonical edge, value)'''
+
+    import dots_ai #the AI imports this module to read books
+
+    rows, cols, rules, edges, time_limit, max_depth = task
+    engine = dots_engine.Engine(rows, cols)
+    for edge in edges:
+        engine.play(edge)
+    player = dots_ai.AlphaBetaPlayer(time_limit, max_depth)
+    edge = player.choose_edge(engine, rules)
+
+    hasher = dots_symmetry.SymmetryHasher(rows, cols, _SEED)
+    hasher.reset(engine)
+    key, symmetry = hasher.canonical()
+    return key, hasher.to_canonical(edge, symmetry), player.last_search().value()
+
+
+def build(rows: int, cols: int, rules: str, moves: int = None, path: str = None,
+          time_limit: float = 0.1, max_depth: int = 64, processes: int = None,
+          report = print) -> str:
+    '''Searches every position up to the given number of moves and writes the book,
+    returning its path'''
+
+    import multiprocessing
+
+    if moves is None:
+        moves = _DEFAULT_MOVES.get(max(rows, cols), 2)
+    if path is None:
+        path = default_path(rows, cols, rules)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok = True)
+
+    start = time.perf_counter()
+    positions = _positions(rows, cols, moves)
+    report('{}x{} {}: {} positions up to {} moves'.format(rows, cols, rules, len(positions), moves))
+    tasks = [(rows, cols, rules, edges, time_limit, max_depth) for edges in positions.values()]
+    entries = []
+    with multiprocessing.Pool(processes) as pool:
+        for entry in pool.imap_unordered(_search_position, tasks, chunksize = 8):
+            entries.append(entry)
+            if len(entries) % 1000 == 0:
+                report('  {} / {} searched'.format(len(entries), len(tasks)))
+    entries.sort()
+
+    keys = array.array('Q', [key for key, edge, value in entries])
+    edges = array.array('H', [edge for key, edge, value in entries])
+    values = array.array('h', [value for key, edge, value in entries])
+    if sys.byteorder != 'little':
+        for column in (keys, edges, values):
+            column.byteswap()
+    partial_path = path + '.partial'
+    with open(partial_path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, rules.encode('ascii'), rows, cols, moves, len(entries)))
+        keys.tofile(file)
+        edges.tofile(file)
+        values.tofile(file)
+    os.replace(partial_path, path)
+    report('{}x{} {}: wrote {} in {:.1f}s'.format(rows, cols, rules, path, time.perf_counter() - start))
+    return path
+
+
+def main(argv: [str] = None) -> None:
+    '''Builds books from the command line'''
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Builds opening books by searching early positions')
+    parser.add_argument('sizes', type = int, nargs = '*', default = sorted(_DEFAULT_MOVES),
+                        help = 'square board sizes')
+    parser.add_argument('--rules', choices = ['>', '<', 'both'], default = 'both')
+    parser.add_argument('--moves', type = int, default = None,
+                        help = 'moves into the game to cover; by default 4 on 3x3, 3 on 5x5 and 2 on 7x7')
+    parser.add_argument('--time', type = float, default = 0.1, help = 'seconds searched per position')
+    parser.add_argument('--processes', type = int, default = None)
+    args = parser.parse_args(argv)
+
+    rules = ['>', '<'] if args.rules == 'both' else [args.rules]
+    for size in args.sizes:
+        for rule in rules:
+            build(size, size, rule, args.moves, time_limit = args.time, processes = args.processes)
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,421 @@
+#Chain and loop analysis for solving Dots and Boxes endgames
+
+#A chain is a run of boxes with exactly two sides drawn, joined through their
+#undrawn sides, and a loop is a chain that closes on itself. Once no safe
+#moves are left every move opens one of them, and the endgame is decided by
+#whether the player taking the boxes keeps control by declining the last two
+#boxes of a chain (or four of a loop), known as double dealing.
+
+import dots_engine
+
+CHAIN = 'chain'
+LOOP = 'loop'
+
+_EXACT_LIMIT = 10 #most components valued by trying every opening order
+
+
+class ChainAnalyzer:
+    '''Keeps the chains, loops and safe moves of an engine up to date move by move'''
+
+    def __init__(self, engine: dots_engine.Engine) -> None:
+        self._engine = engine
+        self._box_count = engine.rows() * engine.cols()
+        self._component_of = [-1] * self._box_count
+        self._components = {}
+        self._next_id = 0
+        self._capturable = set()
+        self._safe = bytearray(engine.edge_count())
+        self._safe_count = 0
+        self._junction_count = 0
+        self._values = {}
+
+        for edge in range(engine.edge_count()):
+            self._update_safe(edge)
+        for box in range(self._box_count):
+            sides = engine.box_sides(box)
+            if sides < 2:
+                self._junction_count += 1
+            if sides == 3:
+                self._capturable.add(box)
+            elif sides == 2 and self._component_of[box] < 0:
+                self._trace(box)
+
+
+    def update(self, edge: int) -> None:
+        '''Updates the analysis after an edge has been played or undone on the engine'''
+
+        engine = self._engine
+        drawn = engine.has_edge(edge)
+        touched = set()
+        for box in engine.edge_boxes(edge):
+            touched.add(box)
+            if engine.box_sides(box) == (2 if drawn else 1):
+                self._junction_count += -1 if drawn else 1
+            if engine.box_sides(box) == 3:
+                self._capturable.add(box)
+            else:
+                self._capturable.discard(box)
+
+            for side in engine.box_edges(box):
+                self._update_safe(side)
+                for neighbour in engine.edge_boxes(side):
+                    touched.add(neighbour)
+
+        freed = set(touched)
+        for box in touched:
+            component = self._component_of[box]
+            if component >= 0 and component in self._components:
+                for member in self._components.pop(component)[1]:
+                    self._component_of[member] = -1
+                    freed.add(member)
+
+        for box in freed:
+            if self._component_of[box] < 0 and engine.box_sides(box) == 2:
+                self._trace(box)
+
+
+    def components(self) -> [(str, (int))]:
+        '''Returns every chain and loop as (kind, boxes in order)'''
+
+        return list(self._components.values())
+
+
+    def component_of(self, box: int) -> (str, (int)):
+        '''Returns the chain or loop a box belongs to, or None'''
+
+        component = self._component_of[box]
+        if component < 0:
+            return None
+        return self._components[component]
+
+
+    def long_chain_count(self) -> int:
+        '''Returns the number of chains of three or more boxes'''
+
+        count = 0
+        for kind, boxes in self._components.values():
+            if kind == CHAIN and len(boxes) >= 3:
+                count += 1
+        return count
+
+
+    def loop_count(self) -> int:
+        '''Returns the number of loops'''
+
+        count = 0
+        for kind, boxes in self._components.values():
+            if kind == LOOP:
+                count += 1
+        return count
+
+
+    def safe_count(self) -> int:
+        '''Returns the number of undrawn edges that do not give away a third side'''
+
+        return self._safe_count
+
+
+    def capturable(self) -> {int}:
+        '''Returns the boxes that have three sides drawn'''
+
+        return self._capturable
+
+
+    def is_loony_endgame(self) -> bool:
+        '''Checks whether every remaining move opens a chain or a loop'''
+
+        return self._safe_count == 0 and not self._engine.is_game_over()
+
+
+    def is_simple(self) -> bool:
+        '''Checks whether every chain and loop is independent of the others,
+        with no box of fewer than two sides joining them'''
+
+        return self._junction_count == 0
+
+
+    def long_chain_rule(self) -> int:
+        '''Returns the color the long chain rule currently favours
+
+        The player who moved first wants the number of dots plus the number of
+        long chains to be even, and the other player wants it to be odd.'''
+
+        engine = self._engine
+        first = engine.first_turn()
+        dots = (engine.rows() + 1) * (engine.cols() + 1)
+        if (dots + self.long_chain_count()) % 2 == 0:
+            return first
+        return -first
+
+
+    def controlled_value(self) -> int:
+        '''Returns the box margin for a player who keeps control through every chain and loop'''
+
+        total = 0
+        chains = 0
+        loops = 0
+        for kind, boxes in self._components.values():
+            total += len(boxes)
+            if kind == LOOP:
+                loops += 1
+            else:
+                chains += 1
+        if chains == 0 and loops == 0:
+            return 0
+        return total - 4 * chains - 8 * loops + (4 if chains else 8)
+
+
+    def endgame_value(self) -> int:
+        '''Returns the box margin for the player not to move when the player to move must open a chain or loop'''
+
+        return self._value(_component_key(self._components.values()))
+
+
+    def endgame_move(self, rules: str = '>') -> int:
+        '''Returns the best move by the endgame rules, or -1 if safe moves remain
+        or chains meet at boxes with fewer than two sides, where the rules do not hold'''
+
+        if rules != '>' or not self.is_loony_endgame() or not self.is_simple():
+            return -1
+        if self._capturable:
+            return self._capture_move()
+        return self._opening_move()
+
+
+    def _capture_move(self) -> int:
+        '''Takes a box, or declines the last boxes of an opened chain or loop when keeping control pays'''
+
+        engine = self._engine
+        regions = {}
+        for box in sorted(self._capturable):
+            region, kind, component = self._opened_region(box)
+            take = _undrawn_edges(engine, box)[0]
+            if component < 0:
+                return take
+            regions[component] = (region, kind, take)
+
+        rest = [self._components[other] for other in self._components if other not in regions]
+        rest_value = self._value(_component_key(rest))
+        if len(regions) > 1:
+            #every region but the last is taken whole before declining could pay, so the one
+            #kept for last is where declining gains the most, and the move takes from another
+            gains = {component: _decline_gain(kind, len(region), rest_value)
+                     for component, (region, kind, take) in regions.items()}
+            last = max(sorted(gains), key = gains.get)
+            return regions[min(component for component in regions if component != last)][2]
+
+        component, (region, kind, take) = regions.popitem()
+        if kind == CHAIN and len(region) == 2:
+            if rest_value > 2:
+                for edge in _undrawn_edges(engine, region[1]):
+                    if edge != take:
+                        return edge
+        elif kind == LOOP and len(region) == 4:
+            if rest_value > 4:
+                return _shared_edge(engine, region[1], region[2])
+        return take
+
+
+    def _opening_move(self) -> int:
+        '''Opens the chain or loop that leaves the opponent the least'''
+
+        engine = self._engine
+        components = list(self._components.items())
+        best_edge = -1
+        best_value = None
+        for component, (kind, boxes) in components:
+            rest = [other for key, other in components if key != component]
+            value = _controller_value(kind, len(boxes), self._value(_component_key(rest)))
+            if best_value is None or value < best_value:
+                best_value = value
+                if kind == LOOP or len(boxes) == 2:
+                    best_edge = _shared_edge(engine, boxes[0], boxes[1])
+                else:
+                    best_edge = _end_edge(engine, boxes)
+        return best_edge
+
+
+    def _opened_region(self, box: int) -> ([int], str, int):
+        '''Returns the boxes that can be taken one after another from a capturable box,
+        whether they came from a chain or a loop, and the component they came from'''
+
+        engine = self._engine
+        edge = _undrawn_edges(engine, box)[0]
+        neighbour = _across(engine, box, edge)
+        if neighbour < 0:
+            return [box], CHAIN, -1
+        if engine.box_sides(neighbour) == 3:
+            return [box, neighbour], CHAIN, -1
+        if engine.box_sides(neighbour) != 2:
+            return [box], CHAIN, -1
+
+        component = self._component_of[neighbour]
+        kind, boxes = self._components[component]
+        if boxes[0] != neighbour:
+            boxes = tuple(reversed(boxes))
+        region = [box] + list(boxes)
+
+        for edge in _undrawn_edges(engine, boxes[-1]):
+            end = _across(engine, boxes[-1], edge)
+            if end >= 0 and end != box and end in self._capturable:
+                return region + [end], LOOP, component
+        return region, CHAIN, component
+
+
+    def _trace(self, start: int) -> None:
+        '''Records the chain or loop through a box with two sides drawn'''
+
+        path = self._walk(start, {start})
+        kind = CHAIN
+        if len(path) >= 4 and start in self._two_sided_neighbours(path[-1]):
+            kind = LOOP
+        else:
+            path = list(reversed(self._walk(start, set(path))[1:])) + path
+
+        component = self._next_id
+        self._next_id += 1
+        self._components[component] = (kind, tuple(path))
+        for box in path:
+            self._component_of[box] = component
+
+
+    def _walk(self, start: int, seen: {int}) -> [int]:
+        '''Follows boxes with two sides drawn from a box until the run ends, returning the path'''
+
+        path = [start]
+        box = start
+        while True:
+            step = -1
+            for neighbour in self._two_sided_neighbours(box):
+                if neighbour not in seen:
+                    step = neighbour
+                    break
+            if step < 0:
+                return path
+            seen.add(step)
+            path.append(step)
+            box = step
+
+
+    def _two_sided_neighbours(self, box: int) -> [int]:
+        '''Returns the boxes with two sides drawn joined to a box through its undrawn sides'''
+
+        engine = self._engine
+        neighbours = []
+        for edge in _undrawn_edges(engine, box):
+            neighbour = _across(engine, box, edge)
+            if neighbour >= 0 and engine.box_sides(neighbour) == 2:
+                neighbours.append(neighbour)
+        return neighbours
+
+
+    def _update_safe(self, edge: int) -> None:
+        '''Recomputes whether an edge is a safe move and keeps the count in step'''
+
+        engine = self._engine
+        safe = 0
+        if not engine.has_edge(edge):
+            safe = 1
+            for box in engine.edge_boxes(edge):
+                if engine.box_sides(box) >= 2:
+                    safe = 0
+        self._safe_count += safe - self._safe[edge]
+        self._safe[edge] = safe
+
+
+    def _value(self, key: tuple) -> int:
+        '''Returns the margin for the player in control when the other player opens next'''
+
+        if not key:
+            return 0
+        if key in self._values:
+            return self._values[key]
+
+        if len(key) > _EXACT_LIMIT:
+            value = 0
+            for kind, size in reversed(key):
+                value = _controller_value(kind, size, value)
+            return value
+
+        best = None
+        for index in range(len(key)):
+            if index > 0 and key[index] == key[index - 1]:
+                continue
+            kind, size = key[index]
+            value = _controller_value(kind, size, self._value(key[:index] + key[index + 1:]))
+            if best is None or value < best:
+                best = value
+        self._values[key] = best
+        return best
+
+
+
+def _controller_value(kind: str, size: int, rest: int) -> int:
+    '''Returns the controller's margin once a component is opened, choosing to take
+    every box or to double deal and keep control for the rest'''
+
+    if kind == LOOP:
+        return max(size - rest, size - 8 + rest)
+    if size >= 3:
+        return max(size - rest, size - 4 + rest)
+    return size - rest
+
+
+def _decline_gain(kind: str, size: int, rest: int) -> int:
+    '''Returns how much more a player taking an opened region gets by declining its last
+    boxes to keep control for the rest than by taking them all, or 0 if it would not pay'''
+
+    if kind == LOOP and size >= 4:
+        return max(2 * rest - 8, 0)
+    if kind == CHAIN and size >= 2:
+        return max(2 * rest - 4, 0)
+    return 0
+
+
+def _component_key(components) -> tuple:
+    '''Returns the components as a sorted tuple of (kind, size), short chains first'''
+
+    key = []
+    for kind, boxes in components:
+        key.append((0 if kind == CHAIN and len(boxes) < 3 else 1 if kind == LOOP else 2,
+                    len(boxes), kind))
+    key.sort()
+    return tuple((kind, size) for order, size, kind in key)
+
+
+def _undrawn_edges(engine: dots_engine.Engine, box: int) -> [int]:
+    '''Returns the undrawn sides of a box'''
+
+    edges = []
+    for edge in engine.box_edges(box):
+        if not engine.has_edge(edge):
+            edges.append(edge)
+    return edges
+
+
+def _across(engine: dots_engine.Engine, box: int, edge: int) -> int:
+    '''Returns the box on the other side of an edge, or -1 for the edge of the board'''
+
+    for other in engine.edge_boxes(edge):
+        if other != box:
+            return other
+    return -1
+
+
+def _shared_edge(engine: dots_engine.Engine, box_1: int, box_2: int) -> int:
+    '''Returns the edge two neighbouring boxes share'''
+
+    for edge in engine.box_edges(box_1):
+        if box_2 in engine.edge_boxes(edge):
+            return edge
+    return -1
+
+
+def _end_edge(engine: dots_engine.Engine, boxes: (int)) -> int:
+    '''Returns an undrawn edge leading out of the end of a chain'''
+
+    inner = set(boxes)
+    for edge in _undrawn_edges(engine, boxes[0]):
+        if _across(engine, boxes[0], edge) not in inner:
+            return edge
+    return _undrawn_edges(engine, boxes[0])[0]
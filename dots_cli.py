@@ -0,0 +1,131 @@
+#Command line entry point. Only the gui command imports tkinter, and every command
+#imports just the modules it needs, since worker processes pay for each import.
+
+#  python dots_cli.py play --orange human --yellow alphabeta --rows 3 --cols 3
+#  python dots_cli.py simulate alphabeta greedy --games 100
+#  python dots_cli.py solve 3 3
+#  python dots_cli.py bench --output bench.json
+#  python dots_cli.py book 3 5 --time 0.1
+#  python dots_cli.py tournament random greedy alphabeta --sizes 3x3
+#  python dots_cli.py gui
+
+import argparse
+import importlib
+import sys
+import dots_logic
+
+#commands handled by another module's main, which parses the rest of the arguments
+_DELEGATED = {
+    'simulate': ('dots_simulate', 'plays many games between two strategies'),
+    'solve': ('dots_solver', 'solves every position of a small board'),
+    'bench': ('dots_bench', 'runs the benchmarks or compares two results'),
+    'book': ('dots_book', 'builds opening books for the computer players'),
+    'tournament': ('dots_tournament', 'plays a round robin between strategies with Elo ratings'),
+}
+_PLAYERS = ['human', 'random', 'greedy', 'alphabeta', 'mcts']
+_COLORS = {'orange': -1, 'yellow': 1}
+_COLOR_NAMES = {-1: 'Orange', 1: 'Yellow'}
+
+
+def _read_move(board: dots_logic.Board, prompt: str):
+    '''Asks until a legal move, 'undo' or 'quit' is typed, returning the move's four
+    coordinates, 'undo', or None to stop playing'''
+
+    while True:
+        try:
+            line = input(prompt).strip().lower()
+        except EOFError:
+            return None
+        if line in ('q', 'quit', 'exit'):
+            return None
+        if line in ('u', 'undo'):
+            return 'undo'
+        try:
+            move = tuple(int(value) for value in line.replace(',', ' ').split())
+        except ValueError:
+            move = ()
+        if len(move) == 4 and board.is_valid_move(*move):
+            engine = board.engine()
+            if not engine.has_edge(engine.edge_between(*move)):
+                return move
+        print('Type a move as "row col row col" for two neighbouring dots, undo, or quit')
+
+
+def play(rows: int, cols: int, rules: str, first: int, players: {int: str},
+         time_limit: float, seed: int = None) -> dots_logic.Board:
+    '''Plays one game in the terminal, asking people for their moves, and returns the board'''
+
+    board = dots_logic.Board(rows, cols)
+    board.set_turn(first)
+    board.set_rules(rules)
+    computers = {}
+    if any(name != 'human' for name in players.values()):
+        import dots_simulate #only computer players need the strategies and their imports
+        for color, name in players.items():
+            if name != 'human':
+                computers[color] = dots_simulate.create_player(name, seed, time_limit)
+
+    while not board.is_game_over():
+        print(board.to_text())
+        turn = board.turn()
+        if turn in computers:
+            move = computers[turn].choose_move(board)
+            print('{} plays {} {} {} {}'.format(_COLOR_NAMES[turn], *move))
+        else:
+            move = _read_move(board, '{} to move: '.format(_COLOR_NAMES[turn]))
+            if move is None:
+                return board
+            if move == 'undo':
+                #take back the computer's moves too, so it is a person's turn again
+                while board.undo() and board.turn() in computers:
+                    pass
+                continue
+        board.make_move(*move)
+
+    print(board.to_text())
+    orange, yellow = board.get_score()
+    print('Orange {} Yellow {}, winner: {}'.format(orange, yellow, board.find_winner()))
+    return board
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs one command from the command line'''
+
+    parser = argparse.ArgumentParser(description = 'Dots and Boxes')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    play_parser = commands.add_parser('play', help = 'plays a game in the terminal')
+    play_parser.add_argument('--rows', type = int, default = 3)
+    play_parser.add_argument('--cols', type = int, default = 3)
+    play_parser.add_argument('--rules', choices = ['>', '<'], default = '>')
+    play_parser.add_argument('--first', choices = sorted(_COLORS), default = 'orange')
+    play_parser.add_argument('--orange', choices = _PLAYERS, default = 'human')
+    play_parser.add_argument('--yellow', choices = _PLAYERS, default = 'alphabeta')
+    play_parser.add_argument('--time', type = float, default = 0.5,
+                             help = 'seconds each computer move may take')
+    play_parser.add_argument('--seed', type = int, default = None)
+
+    for name, (module, description) in _DELEGATED.items():
+        commands.add_parser(name, help = description, add_help = False)
+    commands.add_parser('gui', help = 'opens the game window')
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command in _DELEGATED:
+        importlib.import_module(_DELEGATED[args.command][0]).main(rest)
+        return
+    if rest:
+        parser.error('unrecognized arguments: {}'.format(' '.join(rest)))
+
+    import dots_profile
+    dots_profile.enable_from_environment()
+    if args.command == 'play':
+        play(args.rows, args.cols, args.rules, _COLORS[args.first],
+             {-1: args.orange, 1: args.yellow}, args.time, args.seed)
+    elif args.command == 'gui':
+        import dots_application_gui
+        dots_application_gui.run_dots()
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,173 @@
+#Client for dots_server.py, and a small player that connects to it from the command line
+
+import argparse
+import asyncio
+import json
+import sys
+import dots_engine
+import dots_server
+import dots_simulate
+
+
+
+class GameClient:
+    '''One connection to a game server, mirroring its game on a local engine'''
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._engine = None
+        self._game = None
+        self._color = 0
+        self._rules = '>'
+        self._result = None
+
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = 8765) -> 'GameClient':
+        '''Opens a connection to a server'''
+
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+
+    async def send(self, message: dict) -> None:
+        '''Sends one message to the server'''
+
+        self._writer.write(dots_server.encode(message))
+        await self._writer.drain()
+
+
+    async def receive(self) -> dict:
+        '''Waits for the next message from the server and applies it to the local engine'''
+
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError('server closed the connection')
+        message = json.loads(line)
+
+        kind = message['type']
+        if kind == 'joined':
+            self._game = message['game']
+            self._color = message['color']
+            self._rules = message['rules']
+            self._engine = dots_engine.Engine(message['rows'], message['cols'])
+            self._engine.set_turn(-1)
+        elif kind == 'state':
+            self._engine = dots_engine.Engine(self._engine.rows(), self._engine.cols())
+            self._engine.set_turn(-1)
+            for edge in message['edges']:
+                self._engine.play(edge)
+        elif kind == 'update':
+            self._engine.play(message['edge'])
+        elif kind == 'game_over':
+            self._result = message['winner']
+        return message
+
+
+    async def join(self, rows: int = 5, cols: int = 5, rules: str = '>', game: str = None) -> dict:
+        '''Joins a game and returns the server's answer'''
+
+        message = {'type': 'join', 'rows': rows, 'cols': cols, 'rules': rules}
+        if game is not None:
+            message['game'] = game
+        await self.send(message)
+        return await self.receive()
+
+
+    async def move(self, edge: int) -> None:
+        '''Sends a move, without waiting for the server to confirm it'''
+
+        await self.send({'type': 'move', 'edge': edge})
+
+
+    def engine(self) -> dots_engine.Engine:
+        '''Returns the local copy of the game'''
+
+        return self._engine
+
+
+    def color(self) -> int:
+        '''Returns the color this client plays'''
+
+        return self._color
+
+
+    def rules(self) -> str:
+        '''Returns the rules of the game joined'''
+
+        return self._rules
+
+
+    def is_my_turn(self) -> bool:
+        '''Checks whether the server is waiting for this client's move'''
+
+        return (self._result is None and self._engine is not None
+                and not self._engine.is_game_over() and self._engine.turn() == self._color)
+
+
+    def result(self) -> int:
+        '''Returns the winner once the game is over (-1, 1 or 0), otherwise None'''
+
+        return self._result
+
+
+    async def close(self) -> None:
+        '''Closes the connection'''
+
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+
+async def play(client: GameClient, player) -> int:
+    '''Plays a joined game to the end with a strategy from dots_simulate, returning the winner'''
+
+    started = False
+    while client.result() is None:
+        message = await client.receive()
+        if message['type'] == 'state':
+            started = True
+        elif message['type'] == 'error':
+            print('error:', message['message'], file = sys.stderr)
+        if started and message['type'] in ('state', 'update') and client.is_my_turn():
+            await client.move(player.choose_edge(client.engine(), client.rules()))
+    return client.result()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    '''Connects, plays one game and prints the result'''
+
+    client = await GameClient.connect(args.host, args.port)
+    joined = await client.join(args.rows, args.cols, args.rules, args.game)
+    print('joined {} as {}'.format(joined['game'], 'Orange' if joined['color'] == -1 else 'Yellow'))
+    winner = await play(client, dots_simulate.create_player(args.player, args.seed, args.time))
+    orange, yellow = client.engine().score()
+    print('Orange {} - Yellow {}, {}'.format(orange, yellow,
+          'draw' if winner == 0 else 'won' if winner == client.color() else 'lost'))
+    await client.close()
+
+
+def main(argv: [str] = None) -> None:
+    '''Plays one game on a server from the command line'''
+
+    parser = argparse.ArgumentParser(description = 'Plays a game on a dots_server.py server')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--rows', type = int, default = 5)
+    parser.add_argument('--cols', type = int, default = 5)
+    parser.add_argument('--rules', choices = ['>', '<'], default = '>')
+    parser.add_argument('--game', default = None, help = 'name of a game to join')
+    parser.add_argument('--player', choices = sorted(dots_simulate.STRATEGIES), default = 'greedy')
+    parser.add_argument('--seed', type = int, default = None)
+    parser.add_argument('--time', type = float, default = 0.2,
+                        help = 'seconds per move for searching strategies')
+    asyncio.run(_run(parser.parse_args(argv)))
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
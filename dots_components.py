@@ -1,12 +1,23 @@
 #Logical classes for dots and boxes
 
+#a dot records its connections as bits, one per neighbouring dot
+_LINK_BITS = {(-1, 0): 1, (1, 0): 2, (0, -1): 4, (0, 1): 8}
+_LINK_OFFSETS = ((1, (-1, 0)), (2, (1, 0)), (4, (0, -1)), (8, (0, 1)))
+
+#a box records its drawn sides as bits
+_SIDE_BITS = {'N': 1, 'S': 2, 'E': 4, 'W': 8}
+_ALL_SIDES = 15
+
+
 class Dot:
     '''Dot object for the logic'''
+
+    __slots__ = ('_row', '_col', '_links')
     
     def __init__(self, row: int, col: int) -> None:
         self._row = row
         self._col = col
-        self._connections = []
+        self._links = 0 #bits of _LINK_BITS
         
 
     def row(self) -> None:
@@ -21,15 +32,33 @@ class Dot:
 
     def connections(self) -> [(int)]:
         '''Returns the coordinates of dots that the current dot is connected to'''
-        return self._connections
+        connections = []
+        for bit, (row, col) in _LINK_OFFSETS:
+            if self._links & bit:
+                connections.append((self._row + row, self._col + col))
+        return connections
+
+
 
+def _link_bit(dot_1: Dot, dot_2: Dot) -> int:
+    '''Returns the bit dot_1 uses for its connection to dot_2'''
+    offset = (dot_2.row() - dot_1.row(), dot_2.col() - dot_1.col())
+    if offset not in _LINK_BITS:
+        raise ValueError('Dots ({}, {}) and ({}, {}) are not neighbours'.format(
+            dot_1.row(), dot_1.col(), dot_2.row(), dot_2.col()))
+    return _LINK_BITS[offset]
 
 
 def make_connection(dot_1: Dot, dot_2: Dot) -> None:
     '''Makes a connection between two dots'''
-    if not is_connected(dot_1, dot_2):
-        dot_1._connections.append((dot_2.row(), dot_2.col()))
-        dot_2._connections.append((dot_1.row(), dot_1.col()))
+    dot_1._links |= _link_bit(dot_1, dot_2)
+    dot_2._links |= _link_bit(dot_2, dot_1)
+
+
+def remove_connection(dot_1: Dot, dot_2: Dot) -> None:
+    '''Removes the connection between two dots'''
+    dot_1._links &= ~_link_bit(dot_1, dot_2)
+    dot_2._links &= ~_link_bit(dot_2, dot_1)
 
 
 def translate_direction(direction: str) -> [int]:
@@ -48,18 +77,20 @@ def translate_direction(direction: str) -> [int]:
 
 def is_connected(dot_1: Dot, dot_2: Dot) -> bool:
     '''Checks whether or not two dots are connected'''
-    coords_1 = dot_1.row(), dot_1.col()
-    return coords_1 in dot_2.connections()
+    offset = (dot_1.row() - dot_2.row(), dot_1.col() - dot_2.col())
+    return dot_2._links & _LINK_BITS.get(offset, 0) != 0
 
 
 
 #order of dots = tl, tr, bl, br
 class Box:
     '''Box object for the logic'''
+
+    __slots__ = ('_dots', '_sides', '_row', '_col', '_completed', '_color')
     
     def __init__(self, dots: [Dot]):
-        self._dots = dots
-        self._sides = [] #n s e w
+        self._dots = tuple(dots)
+        self._sides = 0 #bits of _SIDE_BITS
         self._row = None
         self._col = None
 
@@ -71,17 +102,32 @@ class Box:
     def check_sides(self):
         '''Checks what sides of the box are completed'''
         
-        sides = []
+        sides = 0
         if is_connected(self._dots[0], self._dots[1]):
-            sides.append('N')
+            sides |= _SIDE_BITS['N']
         if is_connected(self._dots[0], self._dots[2]):
-            sides.append('W')
+            sides |= _SIDE_BITS['W']
         if is_connected(self._dots[1], self._dots[3]):
-            sides.append('E')
+            sides |= _SIDE_BITS['E']
         if is_connected(self._dots[2], self._dots[3]):
-            sides.append('S')
+            sides |= _SIDE_BITS['S']
         
-        self._sides = set(sides)
+        self._sides = sides
+        
+
+    def add_side(self, side: str) -> None:
+        '''Records a newly drawn side and updates the completion status'''
+
+        self._sides |= _SIDE_BITS[side]
+        self._completed = (self._sides == _ALL_SIDES)
+        
+
+    def remove_side(self, side: str) -> None:
+        '''Removes a drawn side, clearing the completion status and color'''
+
+        self._sides &= ~_SIDE_BITS[side]
+        self._completed = False
+        self._color = 0
         
 
     def determine_location(self) -> None:
@@ -133,13 +179,13 @@ class Box:
         
         connected_dots = []
         self.check_sides()
-        if 'N' in self._sides:
+        if self._sides & _SIDE_BITS['N']:
             connected_dots.append((self._dots[0], self._dots[1]))
-        if 'W' in self._sides:
+        if self._sides & _SIDE_BITS['W']:
             connected_dots.append((self._dots[0], self._dots[2]))
-        if 'E' in self._sides:
+        if self._sides & _SIDE_BITS['E']:
             connected_dots.append((self._dots[1], self._dots[3]))
-        if 'S' in self._sides:
+        if self._sides & _SIDE_BITS['S']:
             connected_dots.append((self._dots[2], self._dots[3]))
 
         return connected_dots
@@ -147,7 +193,7 @@ class Box:
 
     def check_completed(self) -> None:
         '''Checks if a box is completed'''
-        self._completed = (len(self._sides) == 4)
+        self._completed = (self._sides == _ALL_SIDES)
         
 
     def set_color(self, color: int) -> None:
@@ -177,7 +223,17 @@ class Box:
 
     def sides(self) -> [str]:
         '''Returns a list of the completed sides'''
+        return {side for side, bit in _SIDE_BITS.items() if self._sides & bit}
+
+
+    def side_mask(self) -> int:
+        '''Returns the completed sides as bits: 1 north, 2 south, 4 east, 8 west'''
         return self._sides
+
+
+    def side_count(self) -> int:
+        '''Returns how many sides of the box are drawn'''
+        return bin(self._sides).count('1')
     
 
     def color(self) -> int:
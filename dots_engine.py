@@ -0,0 +1,475 @@
+#Compact bitboard engine for Dots and Boxes
+
+#Edges are numbered with all horizontal edges first, then all vertical edges.
+#Horizontal edge (row, col) joins dots (row, col) and (row, col+1), and
+#vertical edge (row, col) joins dots (row, col) and (row+1, col).
+#Boxes are numbered row by row, box = row * cols + col.
+
+import array
+
+_OWNER_TO_COLOR = (0, 1, -1)
+
+#kinds of undrawn edges, by the most sides already drawn on a box they border
+CAPTURE = 0   #completes a box
+SAFE = 1      #leaves every box with at most two sides
+SACRIFICE = 2 #gives a third side to a box
+_DRAWN = 3
+
+_tables = {} #(rows, cols) -> (edge_boxes, box_edges), shared by every engine of that size
+
+
+class Engine:
+    '''Bitboard representation of a board, one bit per edge'''
+
+    def __init__(self, rows: int, cols: int) -> None:
+        self._rows = rows #in boxes
+        self._cols = cols
+        self._h_count = (rows + 1) * cols
+        self._v_count = rows * (cols + 1)
+
+        self._h = 0
+        self._v = 0
+        if (rows, cols) not in _tables:
+            _tables[rows, cols] = (
+                tuple(self._adjacent_boxes(edge) for edge in range(self.edge_count())),
+                tuple(self._surrounding_edges(box) for box in range(rows * cols)))
+        self._edge_boxes, self._box_edges = _tables[rows, cols]
+        self._sides = bytearray(rows * cols)
+        self._owners = bytearray(rows * cols) #0 none, 1 yellow, 2 orange
+        self._scores = [0, 0, 0] #indexed like the owners
+        self._completed_box_count = 0
+        self._turn = 0
+        self._journal = [] #(edge, turn before the move)
+
+        #undrawn edges by kind, each list in no particular order, with every edge's
+        #kind and place in its list so it can be moved in constant time
+        self._kinds = bytearray([SAFE]) * self.edge_count()
+        self._move_lists = (array.array('i'), array.array('i', range(self.edge_count())),
+                            array.array('i'))
+        self._move_places = array.array('i', range(self.edge_count()))
+
+
+    def copy(self) -> 'Engine':
+        '''Returns an independent copy of the engine, sharing only the immutable edge index'''
+
+        other = Engine.__new__(Engine)
+        other._rows = self._rows
+        other._cols = self._cols
+        other._h_count = self._h_count
+        other._v_count = self._v_count
+        other._h = self._h
+        other._v = self._v
+        other._edge_boxes = self._edge_boxes
+        other._box_edges = self._box_edges
+        other._sides = bytearray(self._sides)
+        other._owners = bytearray(self._owners)
+        other._scores = list(self._scores)
+        other._completed_box_count = self._completed_box_count
+        other._turn = self._turn
+        other._journal = list(self._journal)
+        other._kinds = bytearray(self._kinds)
+        other._move_lists = tuple(array.array('i', moves) for moves in self._move_lists)
+        other._move_places = array.array('i', self._move_places)
+        return other
+
+
+    def edge_between(self, row_1: int, col_1: int, row_2: int, col_2: int) -> int:
+        '''Returns the edge joining two dots, or -1 if they are not neighbours on the board'''
+
+        if row_1 > row_2 or col_1 > col_2:
+            row_1, col_1, row_2, col_2 = row_2, col_2, row_1, col_1
+
+        if row_1 < 0 or col_1 < 0 or row_2 > self._rows or col_2 > self._cols:
+            return -1
+        if row_1 == row_2 and col_2 == col_1 + 1:
+            return row_1 * self._cols + col_1
+        if col_1 == col_2 and row_2 == row_1 + 1:
+            return self._h_count + row_1 * (self._cols + 1) + col_1
+        return -1
+
+
+    def edge_dots(self, edge: int) -> (int):
+        '''Returns the two dot coordinates an edge joins, as (row_1, col_1, row_2, col_2)'''
+
+        if edge < self._h_count:
+            row, col = divmod(edge, self._cols)
+            return row, col, row, col + 1
+
+        row, col = divmod(edge - self._h_count, self._cols + 1)
+        return row, col, row + 1, col
+
+
+    def edge_boxes(self, edge: int) -> (int):
+        '''Returns the boxes (at most two) that an edge is a side of'''
+
+        return self._edge_boxes[edge]
+
+
+    def _adjacent_boxes(self, edge: int) -> (int):
+        '''Computes the boxes an edge is a side of, used to build the edge index'''
+
+        cols = self._cols
+        if edge < self._h_count:
+            row, col = divmod(edge, cols)
+            if row == 0:
+                return (col,)
+            if row == self._rows:
+                return ((row - 1) * cols + col,)
+            return ((row - 1) * cols + col, row * cols + col)
+
+        row, col = divmod(edge - self._h_count, cols + 1)
+        if col == 0:
+            return (row * cols,)
+        if col == cols:
+            return (row * cols + col - 1,)
+        return (row * cols + col - 1, row * cols + col)
+
+
+    def box_edges(self, box: int) -> (int):
+        '''Returns the four edges around a box, as (north, south, west, east)'''
+
+        return self._box_edges[box]
+
+
+    def _surrounding_edges(self, box: int) -> (int):
+        '''Computes the edges around a box, used to build the box index'''
+
+        row, col = divmod(box, self._cols)
+        west = self._h_count + row * (self._cols + 1) + col
+        return (row * self._cols + col, (row + 1) * self._cols + col, west, west + 1)
+
+
+    def has_edge(self, edge: int) -> bool:
+        '''Returns whether or not an edge has been drawn'''
+
+        if edge < self._h_count:
+            return (self._h >> edge) & 1 == 1
+        return (self._v >> (edge - self._h_count)) & 1 == 1
+
+
+    def play(self, edge: int) -> int:
+        '''Draws an undrawn edge for the current player and returns the number of boxes completed'''
+
+        if edge < self._h_count:
+            self._h |= 1 << edge
+        else:
+            self._v |= 1 << (edge - self._h_count)
+        self._journal.append((edge, self._turn))
+
+        completed = 0
+        sides = self._sides
+        boxes = self._edge_boxes[edge]
+        for box in boxes:
+            sides[box] += 1
+            if sides[box] == 4:
+                self._owners[box] = self._turn % 3
+                completed += 1
+
+        #take the edge out of its list, then move the edges of boxes that now have two
+        #or three sides: a third side makes the last edge a capture
+        kinds = self._kinds
+        places = self._move_places
+        moves = self._move_lists[kinds[edge]]
+        last = moves.pop()
+        if last != edge:
+            moves[places[edge]] = last
+            places[last] = places[edge]
+        kinds[edge] = _DRAWN
+        for box in boxes:
+            count = sides[box]
+            if count == 2 or count == 3:
+                for other in self._box_edges[box]:
+                    kind = kinds[other]
+                    if kind == _DRAWN or kind == CAPTURE:
+                        continue
+                    if count == 2:
+                        self._set_kind(other, self._classify(other))
+                    else:
+                        self._set_kind(other, CAPTURE)
+
+        if completed == 0:
+            self._turn = -self._turn
+        else:
+            self._scores[self._turn % 3] += completed
+            self._completed_box_count += completed
+        return completed
+
+
+    def undo(self) -> int:
+        '''Takes back the last move and returns its edge, or -1 if no moves have been made'''
+
+        if not self._journal:
+            return -1
+
+        edge, turn = self._journal.pop()
+        if edge < self._h_count:
+            self._h &= ~(1 << edge)
+        else:
+            self._v &= ~(1 << (edge - self._h_count))
+
+        completed = 0
+        sides = self._sides
+        for box in self._edge_boxes[edge]:
+            if sides[box] == 4:
+                self._owners[box] = 0
+                completed += 1
+            sides[box] -= 1
+
+        #only boxes dropping to one or two sides change the kinds of their other edges
+        for box in self._edge_boxes[edge]:
+            if sides[box] == 1 or sides[box] == 2:
+                self._reclassify_box(box)
+        self._set_kind(edge, self._classify(edge))
+
+        if completed:
+            self._scores[turn % 3] -= completed
+            self._completed_box_count -= completed
+        self._turn = turn
+        return edge
+
+
+    def _classify(self, edge: int) -> int:
+        '''Returns the kind of an undrawn edge'''
+
+        most = 0
+        for box in self._edge_boxes[edge]:
+            if self._sides[box] > most:
+                most = self._sides[box]
+        if most == 3:
+            return CAPTURE
+        if most == 2:
+            return SACRIFICE
+        return SAFE
+
+
+    def _set_kind(self, edge: int, kind: int) -> None:
+        '''Moves an edge to the list of its new kind, or out of every list once drawn'''
+
+        old = self._kinds[edge]
+        if old == kind:
+            return
+        if old != _DRAWN:
+            moves = self._move_lists[old]
+            last = moves.pop()
+            if last != edge:
+                place = self._move_places[edge]
+                moves[place] = last
+                self._move_places[last] = place
+        if kind != _DRAWN:
+            moves = self._move_lists[kind]
+            self._move_places[edge] = len(moves)
+            moves.append(edge)
+        self._kinds[edge] = kind
+
+
+    def _reclassify_box(self, box: int) -> None:
+        '''Updates the kinds of the undrawn edges around a box after its side count changed'''
+
+        for edge in self._box_edges[box]:
+            if self._kinds[edge] != _DRAWN:
+                self._set_kind(edge, self._classify(edge))
+
+
+    def legal_moves(self) -> [int]:
+        '''Returns every undrawn edge: captures, then safe moves, then sacrifices'''
+
+        captures, safe, sacrifices = self._move_lists
+        return (captures + safe + sacrifices).tolist()
+
+
+    def moves_of(self, kind: int) -> [int]:
+        '''Returns the undrawn edges of one kind (CAPTURE, SAFE or SACRIFICE), in no particular order'''
+
+        return self._move_lists[kind].tolist()
+
+
+    def move_array(self, kind: int) -> array.array:
+        '''Returns the undrawn edges of one kind as an array, in no particular order,
+        which unlike moves_of makes no int objects and so stays cheap on the largest boards'''
+
+        return self._move_lists[kind][:]
+
+
+    def count_moves(self, kind: int = None) -> int:
+        '''Returns how many undrawn edges there are of one kind, or of any kind'''
+
+        if kind is None:
+            return sum(len(moves) for moves in self._move_lists)
+        return len(self._move_lists[kind])
+
+
+    def edge_kind(self, edge: int) -> int:
+        '''Returns the kind of an undrawn edge, or -1 if it has been drawn'''
+
+        kind = self._kinds[edge]
+        return -1 if kind == _DRAWN else kind
+
+
+    def random_move(self, generator, kind: int = None) -> int:
+        '''Returns a uniformly random undrawn edge of one kind, or of any kind, or -1 if there is none'''
+
+        if kind is not None:
+            moves = self._move_lists[kind]
+            return moves[generator.randrange(len(moves))] if moves else -1
+
+        captures, safe, sacrifices = self._move_lists
+        total = len(captures) + len(safe) + len(sacrifices)
+        if total == 0:
+            return -1
+        index = generator.randrange(total)
+        for moves in self._move_lists:
+            if index < len(moves):
+                return moves[index]
+            index -= len(moves)
+
+
+    def last_move(self) -> int:
+        '''Returns the edge of the last move, or -1 if no moves have been made'''
+
+        if not self._journal:
+            return -1
+        return self._journal[-1][0]
+
+
+    def history(self) -> [int]:
+        '''Returns the edges played so far, in order'''
+
+        return [edge for edge, turn in self._journal]
+
+
+    def first_turn(self) -> int:
+        '''Returns the color of the player who made the first move'''
+
+        if not self._journal:
+            return self._turn
+        return self._journal[0][1]
+
+
+    def move_count(self) -> int:
+        '''Returns how many moves have been made'''
+
+        return len(self._journal)
+
+
+    def edge_count(self) -> int:
+        '''Returns the total number of edges on the board'''
+
+        return self._h_count + self._v_count
+
+
+    def box_sides(self, box: int) -> int:
+        '''Returns how many sides of a box have been drawn'''
+
+        return self._sides[box]
+
+
+    def box_owner(self, box: int) -> int:
+        '''Returns the color of the player who completed a box, or 0'''
+
+        return _OWNER_TO_COLOR[self._owners[box]]
+
+
+    def score(self) -> (int):
+        '''Returns the scores as (orange, yellow)'''
+
+        return self._scores[2], self._scores[1]
+
+
+    def completed_box_count(self) -> int:
+        '''Returns how many boxes have been completed'''
+
+        return self._completed_box_count
+
+
+    def is_game_over(self) -> bool:
+        '''Checks whether or not every box has been completed'''
+
+        return self._completed_box_count == self._rows * self._cols
+
+
+    def winner(self, rules: str) -> int:
+        '''Returns the color winning on the current score under the rules given, or 0 for a draw'''
+
+        orange, yellow = self._scores[2], self._scores[1]
+        if orange == yellow:
+            return 0
+        if (orange > yellow) == (rules != '<'):
+            return -1
+        return 1
+
+
+    def horizontal(self) -> int:
+        '''Returns the bitmask of drawn horizontal edges'''
+
+        return self._h
+
+
+    def vertical(self) -> int:
+        '''Returns the bitmask of drawn vertical edges'''
+
+        return self._v
+
+
+    def edge_mask(self) -> int:
+        '''Returns the bitmask of all drawn edges, indexed by edge number'''
+
+        return self._h | (self._v << self._h_count)
+
+
+    def set_position(self, mask: int, owners: [int], turn: int) -> None:
+        '''Replaces the position with the edges of a mask, the colors owning each box and
+        the turn, forgetting the moves played so far'''
+
+        if mask >> self.edge_count() or len(owners) != len(self._sides):
+            raise ValueError('Position does not fit a {}x{} board'.format(self._rows, self._cols))
+
+        self._h = mask & ((1 << self._h_count) - 1)
+        self._v = mask >> self._h_count
+        self._sides = bytearray(len(self._sides))
+        for edge in range(self.edge_count()):
+            if (mask >> edge) & 1:
+                for box in self._edge_boxes[edge]:
+                    self._sides[box] += 1
+
+        self._owners = bytearray(len(self._sides))
+        self._scores = [0, 0, 0]
+        for box, color in enumerate(owners):
+            #with no turn set boxes are completed by nobody, as play does
+            if (color != 0) != (self._sides[box] == 4) and (color != 0 or turn != 0):
+                raise ValueError('Box {} has an owner only if it is completed'.format(box))
+            self._owners[box] = color % 3
+            self._scores[color % 3] += 1
+        self._scores[0] = 0
+        self._completed_box_count = self._sides.count(4)
+        self._turn = turn
+        self._journal = []
+
+        self._kinds = bytearray([_DRAWN]) * self.edge_count()
+        self._move_lists = (array.array('i'), array.array('i'), array.array('i'))
+        for edge in range(self.edge_count()):
+            if not (mask >> edge) & 1:
+                self._set_kind(edge, self._classify(edge))
+
+
+    def set_turn(self, color: int) -> None:
+        '''Sets the turn'''
+
+        self._turn = color
+
+
+    def turn(self) -> int:
+        '''Returns the current player turn (as an integer)'''
+
+        return self._turn
+
+
+    def rows(self) -> int:
+        '''Returns the number of rows on the board, in boxes'''
+
+        return self._rows
+
+
+    def cols(self) -> int:
+        '''Returns the number of columns on the board, in boxes'''
+
+        return self._cols
@@ -0,0 +1,144 @@
+#Load generator for dots_server.py: plays many simultaneous games and reports move round-trip times
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import dots_client
+import dots_server
+
+try:
+    import resource
+except ImportError: #not available on Windows
+    resource = None
+
+
+async def _play_pair(host: str, port: int, name: str, rows: int, cols: int,
+                     rules: str, seed: int, delay: float, latencies: [float]) -> None:
+    '''Connects two random players to one game and plays it out'''
+
+    clients = []
+    for color in range(2):
+        client = await dots_client.GameClient.connect(host, port)
+        await client.join(rows, cols, rules, name)
+        clients.append(client)
+
+    generator = random.Random(seed)
+    await asyncio.gather(*(_play_random(client, generator, delay, latencies) for client in clients))
+    for client in clients:
+        await client.close()
+
+
+async def _play_random(client: dots_client.GameClient, generator: random.Random,
+                       delay: float, latencies: [float]) -> None:
+    '''Plays random moves after thinking for up to delay seconds,
+    timing each from sending it to getting its update back'''
+
+    sent = 0.0
+    started = False
+    while client.result() is None:
+        message = await client.receive()
+        kind = message['type']
+        if kind == 'state':
+            started = True
+        elif kind == 'update' and message['player'] == client.color():
+            latencies.append(time.perf_counter() - sent)
+        elif kind == 'error':
+            raise RuntimeError(message['message'])
+
+        if started and kind in ('state', 'update') and client.is_my_turn():
+            if delay > 0:
+                await asyncio.sleep(generator.uniform(0, delay))
+            engine = client.engine()
+            while True:
+                edge = generator.randrange(engine.edge_count())
+                if not engine.has_edge(edge):
+                    break
+            sent = time.perf_counter()
+            await client.move(edge)
+
+
+def _percentile(values: [float], fraction: float) -> float:
+    '''Returns a percentile of sorted values'''
+
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _raise_file_limit() -> None:
+    '''Allows as many open sockets as the system permits'''
+
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def run(games: int, rows: int, cols: int, rules: str, host: str, port: int,
+              serve: bool = False, seed: int = 0, delay: float = 0.0) -> dict:
+    '''Plays games simultaneously and returns round-trip statistics in seconds'''
+
+    server = None
+    if serve:
+        game_server = dots_server.GameServer()
+        server = await asyncio.start_server(game_server.handle, host, port, backlog = 4096)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_play_pair(host, port, 'load-{}-{}'.format(seed, game),
+                                      rows, cols, rules, seed + game, delay, latencies)
+                           for game in range(games)))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    latencies.sort()
+    return {'games': games, 'moves': len(latencies), 'seconds': elapsed,
+            'moves_per_second': len(latencies) / elapsed if elapsed > 0 else 0.0,
+            'p50': _percentile(latencies, 0.5), 'p90': _percentile(latencies, 0.9),
+            'p99': _percentile(latencies, 0.99), 'max': latencies[-1] if latencies else 0.0}
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs a load test from the command line'''
+
+    parser = argparse.ArgumentParser(description = 'Plays many simultaneous games against a server')
+    parser.add_argument('--games', type = int, nargs = '+', default = [1000])
+    parser.add_argument('--rows', type = int, default = 3)
+    parser.add_argument('--cols', type = int, default = 3)
+    parser.add_argument('--rules', choices = ['>', '<'], default = '>')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--serve', action = 'store_true',
+                        help = 'run the server in this process instead of connecting to one')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--delay', type = float, default = 0.0,
+                        help = 'longest time a player thinks before moving, in seconds; '
+                               'with 0 every game moves as fast as the server answers')
+    args = parser.parse_args(argv)
+
+    _raise_file_limit()
+    for games in args.games:
+        try:
+            stats = asyncio.run(run(games, args.rows, args.cols, args.rules,
+                                    args.host, args.port, args.serve, args.seed, args.delay))
+        except OSError as error:
+            print('{} games: {}. Each game needs two sockets on each side, '
+                  'so raise the open file limit or run the server separately.'.format(games, error),
+                  file = sys.stderr)
+            return
+        print('{games:>6} games  {moves:>8} moves  {moves_per_second:8.0f} moves/s  '
+              'round trip p50 {p50_ms:.2f} ms  p90 {p90_ms:.2f} ms  p99 {p99_ms:.2f} ms  '
+              'max {max_ms:.2f} ms'.format(p50_ms = stats['p50'] * 1000, p90_ms = stats['p90'] * 1000,
+                                           p99_ms = stats['p99'] * 1000, max_ms = stats['max'] * 1000,
+                                           **stats), flush = True)
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
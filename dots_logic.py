@@ -1,20 +1,35 @@
 #The main logical implementation of Dots and Boxes
 
+import struct
 import dots_components
+import dots_engine
+
+#snapshot: magic, version, rows, cols, turn, rules, then the edge mask and
+#two bits per box for its owner (0 none, 1 yellow, 2 orange), both little-endian
+_SNAPSHOT_HEADER = struct.Struct('<4sBHHbc')
+_SNAPSHOT_MAGIC = b'DBXB'
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_RULES = ('>', '<', '-') #'-' for no rules chosen
+_OWNER_CODES = {0: 0, 1: 1, -1: 2}
+_CODE_OWNERS = (0, 1, -1)
+_TURN_NAMES = {-1: 'orange', 1: 'yellow', 0: 'none'}
+_OWNER_LETTERS = {-1: 'O', 1: 'Y', 0: ' '}
+
+_edge_layouts = {} #(rows, cols) -> edge index, shared by every board of that size
 
 class Board:
 
     def __init__(self, rows: int, cols: int) -> None:
-        self._turn = 0
+        self._engine = dots_engine.Engine(rows, cols)
         self._dots = []
         self._boxes = []
+        self._edge_index = ()
+        self._redo_moves = []
         self._rows = rows #in boxes
         self._cols = cols
         self.create_board()
         self._win_rules = ''
 
-        self._completed_box_count = 0
-
 
     def create_board(self) -> None:
         '''Creates the basic board layout'''
@@ -36,35 +51,225 @@ class Board:
                 dots.append(self._dots[row+1][col+1])
                 self._boxes[row].append(dots_components.Box(dots))
 
+        self._create_edge_index()
+
+
+    def _create_edge_index(self) -> None:
+        '''Maps every edge to the coordinates of its two dots and of the boxes (with the side
+        it forms) it borders. Holds no objects, so boards of the same size share it.'''
+
+        key = (self._rows, self._cols)
+        if key not in _edge_layouts:
+            engine = self._engine
+            layout = []
+            for edge in range(engine.edge_count()):
+                row_1, col_1, row_2, col_2 = engine.edge_dots(edge)
+                horizontal = row_1 == row_2
+
+                boxes = []
+                for index in engine.edge_boxes(edge):
+                    row, col = divmod(index, self._cols)
+                    if horizontal:
+                        side = 'S' if row < row_1 else 'N'
+                    else:
+                        side = 'E' if col < col_1 else 'W'
+                    boxes.append((row, col, side))
+                layout.append((row_1, col_1, row_2, col_2, tuple(boxes)))
+            _edge_layouts[key] = tuple(layout)
+        self._edge_index = _edge_layouts[key]
+
+
+    def _edge_parts(self, edge: int) -> (dots_components.Dot, dots_components.Dot, [(dots_components.Box, str)]):
+        '''Returns an edge's two dots and the boxes (with the side it forms) it borders'''
+
+        row_1, col_1, row_2, col_2, boxes = self._edge_index[edge]
+        return (self._dots[row_1][col_1], self._dots[row_2][col_2],
+                [(self._boxes[row][col], side) for row, col, side in boxes])
+
 
     def make_move(self, row_1: int, col_1: int, row_2: int, col_2: int) -> None:
         '''Given the two coordinates, makes a move between them if valid'''
-        
-        same_turn = False
-        if self.is_valid_move(row_1, col_1, row_2, col_2):
-            count = 0
-            for row in self._boxes:
-                for box in row:
-                    if (box.contains_dot(row_1, col_1) and box.contains_dot(row_2, col_2)):
-                        dot_1 = box.return_dot(row_1, col_1)
-                        dot_2 = box.return_dot(row_2, col_2)
-
-                        if count == 0: #if move has been made, stay same turn
-                            if dots_components.is_connected(dot_1, dot_2):
-                                return
-                        
-                        dots_components.make_connection(dot_1, dot_2)
-                        count += 1
-                        
-                        box.update()
-
-                        if box.completed():
-                            box.set_color(self._turn)
-                            same_turn = True
-                            
-            if not(same_turn):
-                self._turn *= -1
-                        
+
+        engine = self._engine
+        edge = engine.edge_between(row_1, col_1, row_2, col_2)
+        if edge < 0 or engine.has_edge(edge):
+            return
+
+        self._redo_moves = []
+        self._play_edge(edge)
+
+
+    def _play_edge(self, edge: int) -> None:
+        '''Draws an undrawn edge and updates the dots and boxes it touches'''
+
+        turn = self._engine.turn()
+        dot_1, dot_2, boxes = self._edge_parts(edge)
+        dots_components.make_connection(dot_1, dot_2)
+        self._engine.play(edge)
+
+        for box, side in boxes:
+            box.add_side(side)
+            if box.completed():
+                box.set_color(turn)
+
+
+    def _set_position(self, mask: int, owners: [int], turn: int) -> None:
+        '''Draws the edges of a mask and colors the boxes on a new board, without a move history'''
+
+        self._engine.set_position(mask, owners, turn)
+        self._redo_moves = []
+        for edge in range(self._engine.edge_count()):
+            if (mask >> edge) & 1:
+                dot_1, dot_2, boxes = self._edge_parts(edge)
+                dots_components.make_connection(dot_1, dot_2)
+                for box, side in boxes:
+                    box.add_side(side)
+
+        for row in self._boxes:
+            for box in row:
+                if box.completed():
+                    box.set_color(owners[box.row() * self._cols + box.col()])
+
+
+    def to_bytes(self) -> bytes:
+        '''Returns a compact snapshot of the edges, box owners, turn and rules'''
+
+        engine = self._engine
+        owners = 0
+        for box in range(self._rows * self._cols):
+            owners |= _OWNER_CODES[engine.box_owner(box)] << (2 * box)
+
+        header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, self._rows, self._cols,
+                                       engine.turn(), (self._win_rules or '-').encode('ascii'))
+        return (header + engine.edge_mask().to_bytes((engine.edge_count() + 7) // 8, 'little')
+                + owners.to_bytes((self._rows * self._cols + 3) // 4, 'little'))
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Board':
+        '''Creates a board from a snapshot made by to_bytes. Moves before the snapshot cannot be undone.'''
+
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError('Snapshot is too short')
+        magic, version, rows, cols, turn, rules = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            raise ValueError('Not a board snapshot')
+        if turn not in _TURN_NAMES or rules.decode('latin-1') not in _SNAPSHOT_RULES:
+            raise ValueError('Snapshot has an unknown turn or rules')
+
+        board = cls(rows, cols)
+        edge_bytes = (board._engine.edge_count() + 7) // 8
+        owner_bytes = (rows * cols + 3) // 4
+        start = _SNAPSHOT_HEADER.size
+        if len(data) != start + edge_bytes + owner_bytes:
+            raise ValueError('Snapshot has the wrong length')
+
+        mask = int.from_bytes(data[start:start + edge_bytes], 'little')
+        codes = int.from_bytes(data[start + edge_bytes:], 'little')
+        owners = []
+        for box in range(rows * cols):
+            code = (codes >> (2 * box)) & 3
+            if code == 3:
+                raise ValueError('Snapshot has an unknown box owner')
+            owners.append(_CODE_OWNERS[code])
+
+        board._set_position(mask, owners, turn)
+        board.set_rules('' if rules == b'-' else rules.decode('ascii'))
+        return board
+
+
+    def to_text(self) -> str:
+        '''Returns a readable snapshot: a line with the size, turn and rules, then the board drawn
+        with + for dots, -- and | for edges, and O or Y inside boxes taken by Orange or Yellow'''
+
+        engine = self._engine
+        lines = ['dots {} {} {} {}'.format(self._rows, self._cols, _TURN_NAMES[engine.turn()],
+                                           self._win_rules or '-')]
+        for row in range(self._rows + 1):
+            line = '+'
+            for col in range(self._cols):
+                drawn = engine.has_edge(engine.edge_between(row, col, row, col + 1))
+                line += ('--' if drawn else '  ') + '+'
+            lines.append(line)
+
+            if row < self._rows:
+                line = ''
+                for col in range(self._cols + 1):
+                    drawn = engine.has_edge(engine.edge_between(row, col, row + 1, col))
+                    line += '|' if drawn else ' '
+                    if col < self._cols:
+                        line += _OWNER_LETTERS[engine.box_owner(row * self._cols + col)] * 2
+                lines.append(line.rstrip())
+        return '\n'.join(lines) + '\n'
+
+
+    @classmethod
+    def from_text(cls, text: str) -> 'Board':
+        '''Creates a board from a snapshot made by to_text'''
+
+        lines = text.splitlines()
+        fields = lines[0].split() if lines else []
+        if len(fields) != 5 or fields[0] != 'dots' or fields[3] not in _TURN_NAMES.values():
+            raise ValueError('Not a board snapshot')
+        if fields[4] not in _SNAPSHOT_RULES:
+            raise ValueError('Snapshot has unknown rules {!r}'.format(fields[4]))
+        rows, cols = int(fields[1]), int(fields[2])
+        if len(lines) < 2 * rows + 2:
+            raise ValueError('Snapshot is missing rows')
+
+        board = cls(rows, cols)
+        engine = board._engine
+        width = 3 * cols + 1
+        letters = {letter: color for color, letter in _OWNER_LETTERS.items()}
+        mask = 0
+        owners = [0] * (rows * cols)
+        for row in range(rows + 1):
+            line = lines[1 + 2 * row].ljust(width)
+            for col in range(cols):
+                if line[3 * col + 1] == '-':
+                    mask |= 1 << engine.edge_between(row, col, row, col + 1)
+
+            if row < rows:
+                line = lines[2 + 2 * row].ljust(width)
+                for col in range(cols + 1):
+                    if line[3 * col] == '|':
+                        mask |= 1 << engine.edge_between(row, col, row + 1, col)
+                    if col < cols:
+                        if line[3 * col + 1] not in letters:
+                            raise ValueError('Unknown box owner {!r}'.format(line[3 * col + 1]))
+                        owners[row * cols + col] = letters[line[3 * col + 1]]
+
+        turn = {name: color for color, name in _TURN_NAMES.items()}[fields[3]]
+        board._set_position(mask, owners, turn)
+        board.set_rules('' if fields[4] == '-' else fields[4])
+        return board
+
+
+    def undo(self) -> bool:
+        '''Takes back the last move, returning whether or not there was one'''
+
+        edge = self._engine.undo()
+        if edge < 0:
+            return False
+
+        dot_1, dot_2, boxes = self._edge_parts(edge)
+        dots_components.remove_connection(dot_1, dot_2)
+        for box, side in boxes:
+            box.remove_side(side)
+
+        self._redo_moves.append(edge)
+        return True
+
+
+    def redo(self) -> bool:
+        '''Replays the last move taken back, returning whether or not there was one'''
+
+        if not self._redo_moves:
+            return False
+
+        self._play_edge(self._redo_moves.pop())
+        return True
+
 
     def is_valid_move(self, row_1: int, col_1: int, row_2: int, col_2: int) -> None:
         '''Checks whether or not a move is valid'''
@@ -82,33 +287,49 @@ class Board:
         return row >= 0 and row <= self._rows and col >= 0 and col <= self._cols
     
 
+    def legal_moves(self) -> [(int)]:
+        '''Returns every move not made yet as (row_1, col_1, row_2, col_2):
+        captures first, then safe moves, then sacrifices'''
+
+        engine = self._engine
+        return [engine.edge_dots(edge) for edge in engine.legal_moves()]
+
+
+    def capturing_moves(self) -> [(int)]:
+        '''Returns the moves that complete a box'''
+
+        return self._moves_of(dots_engine.CAPTURE)
+
+
+    def safe_moves(self) -> [(int)]:
+        '''Returns the moves that give no box a third side'''
+
+        return self._moves_of(dots_engine.SAFE)
+
+
+    def sacrifice_moves(self) -> [(int)]:
+        '''Returns the moves that give a box a third side without completing any'''
+
+        return self._moves_of(dots_engine.SACRIFICE)
+
+
+    def _moves_of(self, kind: int) -> [(int)]:
+        '''Returns the moves of one kind, kept up to date by the engine as moves are made'''
+
+        engine = self._engine
+        return [engine.edge_dots(edge) for edge in sorted(engine.moves_of(kind))]
+
+
     def is_game_over(self) -> bool:
         '''Checks whether or not the game is over'''
         
-        total = self._rows * self._cols
-        count = 0
-        for row in self._boxes:
-            for box in row:
-                if box._color != 0:
-                    count += 1
-
-        return count == total
+        return self._engine.is_game_over()
     
 
     def get_score(self) -> (int):
         '''Returns the scores'''
         
-        score_1 = 0
-        score_2 = 0
-
-        for row in self._boxes:
-            for box in row:
-                if box._color == -1:
-                    score_1 += 1
-                if box._color == 1:
-                    score_2 += 1
-
-        return score_1, score_2
+        return self._engine.score()
     
 
     def find_winner(self) -> str:
@@ -135,7 +356,7 @@ class Board:
     def set_turn(self, color: int) -> None:
         '''Sets the turn'''
         
-        self._turn = color
+        self._engine.set_turn(color)
 
 
     def set_rules(self, rule: str) -> None:
@@ -144,6 +365,12 @@ class Board:
         self._win_rules = rule
 
 
+    def rules(self) -> str:
+        '''Returns the rules, '>' for most filled and '<' for least filled'''
+        
+        return self._win_rules
+
+
     def rows(self) -> int:
         '''Returns the number of rows on the board, in boxes'''
         
@@ -165,4 +392,10 @@ class Board:
     def turn(self) -> int:
         '''Returns the current player turn (as an integer)'''
         
-        return self._turn
+        return self._engine.turn()
+
+
+    def engine(self) -> dots_engine.Engine:
+        '''Returns the bitboard engine backing the board'''
+        
+        return self._engine
@@ -0,0 +1,308 @@
+#Monte Carlo tree search player for large boards
+
+#Playouts run on the bitboard engine with play and undo, so no board is ever
+#copied inside the search. Rewards come from Engine.winner, so the same
+#player handles both the most filled and least filled rules.
+
+import math
+import multiprocessing
+import random
+import time
+import dots_ai
+import dots_book
+import dots_chains
+import dots_engine
+import dots_logic
+
+
+class _Node:
+    '''A position in the search tree, reached by one move'''
+
+    __slots__ = ('move', 'player', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, move: int, player: int, untried: [int]) -> None:
+        self.move = move
+        self.player = player #color that made the move
+        self.children = {}
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+
+
+class _Tree:
+    '''UCT search tree grown on one engine with play and undo'''
+
+    def __init__(self, engine: dots_engine.Engine, rules: str,
+                 exploration: float, generator: random.Random) -> None:
+        self._engine = engine
+        self._rules = rules
+        self._exploration = exploration
+        self._random = generator
+        self._root = _Node(-1, 0, self._candidate_moves())
+        self._history = engine.history()
+        self._playouts = 0
+        self._margin = 0
+        self._depth = 0
+
+
+    def advance(self, engine: dots_engine.Engine) -> bool:
+        '''Moves the root down to the engine's position, returning False if it is not below the root'''
+
+        history = engine.history()
+        if history[:len(self._history)] != self._history:
+            return False
+
+        node = self._root
+        for edge in history[len(self._history):]:
+            node = node.children.get(edge)
+            if node is None:
+                return False
+
+        self._root = node
+        self._engine = engine
+        self._history = history
+        self._playouts = 0
+        self._margin = 0
+        self._depth = 0
+        return True
+
+
+    def search(self, deadline: float) -> None:
+        '''Runs playouts until the deadline'''
+
+        while time.perf_counter() < deadline:
+            self._iterate()
+
+
+    def _iterate(self) -> None:
+        '''Selects, expands, plays out and backs up one path through the tree'''
+
+        engine = self._engine
+        node = self._root
+        path = [node]
+        played = 0
+
+        while not node.untried and node.children:
+            node = self._select(node)
+            engine.play(node.move)
+            played += 1
+            path.append(node)
+
+        if node.untried:
+            untried = node.untried
+            index = self._random.randrange(len(untried))
+            untried[index], untried[-1] = untried[-1], untried[index]
+            move = untried.pop()
+
+            player = engine.turn()
+            engine.play(move)
+            played += 1
+            child = _Node(move, player, self._candidate_moves())
+            node.children[move] = child
+            node = child
+            path.append(node)
+
+        depth = played
+        played += self._playout()
+
+        winner = engine.winner(self._rules)
+        orange, yellow = engine.score()
+        for step in range(played):
+            engine.undo()
+
+        for visited in path:
+            visited.visits += 1
+            if winner == 0:
+                visited.wins += 0.5
+            elif winner == visited.player:
+                visited.wins += 1.0
+
+        self._playouts += 1
+        self._margin += (yellow - orange) * engine.turn() #orange is -1 and yellow 1
+        if depth > self._depth:
+            self._depth = depth
+
+
+    def _candidate_moves(self) -> [int]:
+        '''Returns the moves the tree will try from the engine's position
+
+        Under the most filled rules, boxes that can be taken are always taken while
+        safe moves remain elsewhere, since declining them only pays in the endgame.'''
+
+        engine = self._engine
+        if (self._rules != '<' and engine.count_moves(dots_engine.CAPTURE)
+                and engine.count_moves(dots_engine.SAFE)):
+            return engine.moves_of(dots_engine.CAPTURE)
+        return engine.legal_moves()
+
+
+    def _playout(self) -> int:
+        '''Plays the game out from the engine's position and returns the number of moves
+
+        Under the most filled rules the playout takes any box it can and otherwise
+        prefers edges that give nothing away, which is far more telling than
+        uniformly random play. Under the least filled rules it plays at random.'''
+
+        engine = self._engine
+        generator = self._random
+        greedy = self._rules != '<'
+        played = 0
+        while True:
+            edge = -1
+            if greedy:
+                edge = engine.random_move(generator, dots_engine.CAPTURE)
+                if edge < 0:
+                    edge = engine.random_move(generator, dots_engine.SAFE)
+            if edge < 0:
+                edge = engine.random_move(generator)
+                if edge < 0:
+                    return played
+            engine.play(edge)
+            played += 1
+
+
+    def _select(self, node: _Node) -> _Node:
+        '''Returns the child with the best upper confidence bound'''
+
+        log_visits = math.log(node.visits)
+        best = None
+        best_score = -1.0
+        for child in node.children.values():
+            score = (child.wins / child.visits
+                     + self._exploration * math.sqrt(log_visits / child.visits))
+            if score > best_score:
+                best_score = score
+                best = child
+        return best
+
+
+    def visits(self) -> {int: int}:
+        '''Returns how often each root move has been tried'''
+
+        return {edge: child.visits for edge, child in self._root.children.items()}
+
+
+    def playouts(self) -> int:
+        '''Returns how many playouts were run since the root was set'''
+
+        return self._playouts
+
+
+    def margin(self) -> int:
+        '''Returns the sum over playouts of final box margins for the player to move at the root'''
+
+        return self._margin
+
+
+    def depth(self) -> int:
+        '''Returns the deepest node expanded since the root was set'''
+
+        return self._depth
+
+
+
+def _search_worker(task: tuple) -> tuple:
+    '''Grows a fresh tree in a worker process, returning (visits, playouts, margin)'''
+
+    engine, rules, time_limit, exploration, seed = task
+    deadline = time.perf_counter() + time_limit
+    tree = _Tree(engine, rules, exploration, random.Random(seed))
+    tree.search(deadline)
+    return tree.visits(), tree.playouts(), tree.margin()
+
+
+
+class MCTSPlayer:
+    '''UCT player using random playouts, reusing its tree between moves and
+    optionally adding independent trees from worker processes (root parallelization)'''
+
+    def __init__(self, time_limit: float = 1.0, processes: int = 1,
+                 exploration: float = 1.4, seed: int = None,
+                 books: [dots_book.OpeningBook] = ()) -> None:
+        self._time_limit = time_limit
+        self._books = list(books)
+        self._processes = processes
+        self._exploration = exploration
+        self._random = random.Random(seed)
+        self._tree = None
+        self._rules = None
+        self._pool = None
+        self._info = dots_ai.SearchInfo(0, 0.0, 0, 0)
+
+
+    def choose_move(self, board: dots_logic.Board) -> (int):
+        '''Returns the move to make as (row_1, col_1, row_2, col_2)'''
+
+        engine = board.engine()
+        return engine.edge_dots(self.choose_edge(engine, board.rules()))
+
+
+    def choose_edge(self, engine: dots_engine.Engine, rules: str = '>') -> int:
+        '''Searches until the deadline and returns the most visited edge'''
+
+        start = time.perf_counter()
+        deadline = start + self._time_limit
+        engine = engine.copy()
+        moves = engine.legal_moves()
+        endgame = dots_chains.ChainAnalyzer(engine).endgame_move(rules)
+        if endgame >= 0:
+            moves = [endgame]
+        if len(moves) == 1:
+            self._info = dots_ai.SearchInfo(0, time.perf_counter() - start, 0, 0)
+            return moves[0]
+        book_edge, book_value = dots_book.book_move(self._books, engine, rules)
+        if book_edge >= 0:
+            self._info = dots_ai.SearchInfo(1, time.perf_counter() - start, 0, book_value)
+            return book_edge
+
+        if (self._tree is None or rules != self._rules
+                or not self._tree.advance(engine)):
+            self._tree = _Tree(engine, rules, self._exploration, self._random)
+            self._rules = rules
+
+        pending = None
+        if self._processes > 1:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self._processes - 1)
+            tasks = []
+            for worker in range(self._processes - 1):
+                tasks.append((engine, rules, self._time_limit * 0.9, self._exploration,
+                              self._random.getrandbits(32)))
+            pending = self._pool.map_async(_search_worker, tasks)
+
+        self._tree.search(deadline)
+        visits = self._tree.visits()
+        playouts = self._tree.playouts()
+        margin = self._tree.margin()
+
+        if pending is not None:
+            for worker_visits, worker_playouts, worker_margin in pending.get():
+                for edge, count in worker_visits.items():
+                    visits[edge] = visits.get(edge, 0) + count
+                playouts += worker_playouts
+                margin += worker_margin
+
+        if visits:
+            best = max(visits, key = visits.get)
+        else:
+            best = moves[0]
+
+        self._info = dots_ai.SearchInfo(playouts, time.perf_counter() - start,
+                                        self._tree.depth(),
+                                        round(margin / playouts) if playouts else 0)
+        return best
+
+
+    def last_search(self) -> dots_ai.SearchInfo:
+        '''Returns statistics about the most recent search, counting playouts as nodes'''
+
+        return self._info
+
+
+    def close(self) -> None:
+        '''Stops any worker processes'''
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
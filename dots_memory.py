@@ -0,0 +1,44 @@
+#Measures how much memory boards take, to size how many fit in one process
+
+import argparse
+import gc
+import sys
+import tracemalloc
+import dots_engine
+import dots_logic
+
+
+def measure(create, count: int = 10) -> int:
+    '''Returns the bytes held by each of count objects made by create, not counting
+    tables shared between objects of the same size, which the first one builds'''
+
+    kept = [create()]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept += [create() for index in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) // count
+
+
+def main(argv: [str] = None) -> None:
+    '''Prints the memory per board and per engine for each size given'''
+
+    parser = argparse.ArgumentParser(description = 'Measures memory per board size')
+    parser.add_argument('sizes', type = int, nargs = '*', default = [5, 10, 20, 50, 100])
+    parser.add_argument('--count', type = int, default = 10, help = 'boards built per size')
+    args = parser.parse_args(argv)
+
+    print('{:>9} {:>12} {:>12} {:>14}'.format('size', 'Board KiB', 'Engine KiB', 'Boards per GiB'))
+    for size in args.sizes:
+        board = measure(lambda: dots_logic.Board(size, size), args.count)
+        engine = measure(lambda: dots_engine.Engine(size, size), args.count)
+        print('{:>9} {:>12.1f} {:>12.1f} {:>14,}'.format('{}x{}'.format(size, size), board / 1024,
+                                                         engine / 1024, (1 << 30) // max(board, 1)))
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,10 +1,15 @@
 ## How to select the game options (# of rows, # of cols, who starts)
 import tkinter as tk
 
+_MIN_SIZE = 2
+_MAX_SIZE = 200 #largest number of rows or columns offered
+
 class OptionMenu:
     
-    def __init__(self) -> None:
-        self._window = tk.Tk()
+    def __init__(self, root: tk.Tk = None) -> None:
+        '''Shows the options and waits for an answer, in a window of its own or in a dialog over root'''
+
+        self._window = tk.Toplevel(root) if root is not None else tk.Tk()
         self._window.wm_title('Options Menu')
         self._window.resizable(width = False, height = False)
         
@@ -16,7 +21,10 @@ class OptionMenu:
         self._print_option_menus()
         self._create_button()
 
-        self._window.mainloop()
+        if root is not None:
+            root.wait_window(self._window)
+        else:
+            self._window.mainloop()
 
         
     def _create_labels(self) -> None:
@@ -34,6 +42,15 @@ class OptionMenu:
         self._label_4 = tk.Label(master = self._window,
                                  text = 'Who Wins',
                                  font = ('Verdana', 12))
+        self._label_5 = tk.Label(master = self._window,
+                                 text = 'Orange Player',
+                                 font = ('Verdana', 12))
+        self._label_6 = tk.Label(master = self._window,
+                                 text = 'Yellow Player',
+                                 font = ('Verdana', 12))
+        self._label_7 = tk.Label(master = self._window,
+                                 text = 'Computer Time (ms)',
+                                 font = ('Verdana', 12))
 
 
     def _print_labels(self) -> None:
@@ -47,23 +64,30 @@ class OptionMenu:
                            sticky = tk.N + tk.S + tk.E + tk.W)
         self._label_4.grid(row = 2, column = 1, padx = 20,
                            sticky = tk.N + tk.S + tk.E + tk.W)
+        self._label_5.grid(row = 4, column = 0, padx = 20,
+                           sticky = tk.N + tk.S + tk.E + tk.W)
+        self._label_6.grid(row = 4, column = 1, padx = 20,
+                           sticky = tk.N + tk.S + tk.E + tk.W)
+        self._label_7.grid(row = 4, column = 2, padx = 20,
+                           sticky = tk.N + tk.S + tk.E + tk.W)
         
 
     def _create_option_menus(self) -> None:
         '''Creates the option menu widgets'''
         
-        responses_1_2 = ['3', '4', '5', '6', '7', '8', '9', '10']
         self.response_1 = tk.StringVar()
         self.response_1.set('5')
-        self._option_1 = tk.OptionMenu(self._window,
-                                       self.response_1,
-                                       *responses_1_2)
+        self._option_1 = tk.Spinbox(self._window,
+                                    from_ = _MIN_SIZE, to = _MAX_SIZE,
+                                    textvariable = self.response_1,
+                                    width = 5)
 
         self.response_2 = tk.StringVar()
         self.response_2.set('5')
-        self._option_2 = tk.OptionMenu(self._window,
-                                       self.response_2,
-                                       *responses_1_2)
+        self._option_2 = tk.Spinbox(self._window,
+                                    from_ = _MIN_SIZE, to = _MAX_SIZE,
+                                    textvariable = self.response_2,
+                                    width = 5)
 
         responses_3 = ['Orange', 'Yellow']
         self.response_3 = tk.StringVar()
@@ -79,6 +103,26 @@ class OptionMenu:
                                        self.response_4,
                                        *responses_4)
 
+        responses_5_6 = ['Human', 'Computer']
+        self.response_5 = tk.StringVar()
+        self.response_5.set('Human')
+        self._option_5 = tk.OptionMenu(self._window,
+                                       self.response_5,
+                                       *responses_5_6)
+
+        self.response_6 = tk.StringVar()
+        self.response_6.set('Human')
+        self._option_6 = tk.OptionMenu(self._window,
+                                       self.response_6,
+                                       *responses_5_6)
+
+        responses_7 = ['100', '200', '500', '1000', '5000']
+        self.response_7 = tk.StringVar()
+        self.response_7.set('200')
+        self._option_7 = tk.OptionMenu(self._window,
+                                       self.response_7,
+                                       *responses_7)
+
 
     def _print_option_menus(self) -> None:
         '''Prints the option menu widgets to the window'''
@@ -91,6 +135,12 @@ class OptionMenu:
                             sticky = tk.N + tk.S + tk.E + tk.W)
         self._option_4.grid(row = 3, column = 1, padx = 20, pady = 5,
                             sticky = tk.N + tk.S + tk.E + tk.W)
+        self._option_5.grid(row = 5, column = 0, padx = 20, pady = 5,
+                            sticky = tk.N + tk.S + tk.E + tk.W)
+        self._option_6.grid(row = 5, column = 1, padx = 20, pady = 5,
+                            sticky = tk.N + tk.S + tk.E + tk.W)
+        self._option_7.grid(row = 5, column = 2, padx = 20, pady = 5,
+                            sticky = tk.N + tk.S + tk.E + tk.W)
         
 
     def _create_button(self) -> None:
@@ -116,11 +166,20 @@ class OptionMenu:
     def _on_button_clicked(self) -> None:
         '''Gets the responses from the option menu and destroys the window'''
         
+        rows = read_size(self.response_1.get())
+        cols = read_size(self.response_2.get())
+        if rows is None or cols is None:
+            self._window.bell()
+            return
+
         self._answers = []
-        self._answers.append(int(self.response_1.get()))
-        self._answers.append(int(self.response_2.get()))
+        self._answers.append(rows)
+        self._answers.append(cols)
         self._answers.append(convert_color(self.response_3.get()))
         self._answers.append(convert_winner_rule(self.response_4.get()))
+        self._answers.append(convert_player(self.response_5.get()))
+        self._answers.append(convert_player(self.response_6.get()))
+        self._answers.append(int(self.response_7.get()) / 1000)
 
         self._window.destroy()
         
@@ -129,6 +188,16 @@ class OptionMenu:
         return self._answers
         
 
+def read_size(text: str) -> int:
+    '''Returns a typed number of rows or columns, or None if it is not one'''
+
+    try:
+        size = int(text)
+    except ValueError:
+        return None
+    return size if _MIN_SIZE <= size <= _MAX_SIZE else None
+
+
 def convert_color(color: str) -> int:
     '''Translates into the abbreviation for the color'''
     
@@ -156,3 +225,9 @@ def convert_winner_rule(rule: str) -> str:
         return '>'
     if rule == 'Least Filled':
         return '<'
+
+
+def convert_player(player: str) -> bool:
+    '''Translates whether or not a player is controlled by the computer'''
+
+    return player == 'Computer'
@@ -0,0 +1,252 @@
+#Opt-in timing of the hot paths in the game logic and the GUI
+
+#Nothing is measured unless instrumentation is switched on, either by setting
+#DOTS_PROFILE to the JSON file to write (and optionally DOTS_PROFILE_CPROFILE to a
+#cProfile file) before starting the game, or by running a script through this module:
+#  python dots_profile.py --output profile.json --cprofile profile.prof dots_application_gui.py
+#Switching it on replaces the methods listed in HOT_PATHS with timed wrappers, so
+#when it is off the methods are untouched and cost nothing extra. Only modules already
+#loaded are timed, so headless tools never import the GUI and tkinter. Each method keeps
+#a running count, total, maximum and a fixed histogram, so memory does not grow with the
+#number of calls. On exit these and percentiles read from the histogram, to within a
+#tenth of a decade, are written as JSON.
+#The cProfile file can be read with pstats, snakeviz, or flameprof for a flame graph.
+
+import argparse
+import atexit
+import bisect
+import cProfile
+import functools
+import importlib
+import json
+import os
+import runpy
+import sys
+import time
+
+_ENVIRONMENT_VARIABLE = 'DOTS_PROFILE'
+_CPROFILE_VARIABLE = 'DOTS_PROFILE_CPROFILE'
+_BUCKET_LIMITS = [10 ** (exponent / 10) * 1e-6 for exponent in range(0, 71)] #1 us to 10 s, ten per decade
+
+#(module, class, method) of everything timed once instrumentation is on
+HOT_PATHS = [
+    ('dots_logic', 'Board', 'make_move'),
+    ('dots_logic', 'Board', 'get_score'),
+    ('dots_logic', 'Board', 'is_game_over'),
+    ('dots_logic', 'Board', 'undo'),
+    ('dots_components', 'Box', 'add_side'),
+    ('dots_application_gui', 'BoardGUI', '_draw_board'),
+    ('dots_application_gui', 'BoardGUI', '_draw_dots'),
+    ('dots_application_gui', 'BoardGUI', '_draw_outlines'),
+    ('dots_application_gui', 'BoardGUI', '_draw_position'),
+    ('dots_application_gui', 'BoardGUI', 'update_moves'),
+    ('dots_application_gui', 'BoardGUI', '_draw_connection'),
+    ('dots_application_gui', 'BoardGUI', '_draw_filled_box'),
+    ('dots_application_gui', 'BoardGUI', 'resize'),
+    ('dots_application_gui', 'DotsApplication', '_on_line_clicked'),
+    ('dots_application_gui', 'DotsApplication', '_on_computer_move'),
+]
+
+_timings = {} #'Class.method' -> [calls, total seconds, most seconds, calls in each histogram bucket]
+_originals = [] #(class, method name, original function) for everything wrapped
+_profiler = None
+_exit_registered = False
+
+
+
+def _timed(name: str, function):
+    '''Returns function wrapped to record how long each call takes under name'''
+
+    timing = _timings.setdefault(name, [0, 0.0, 0.0, [0] * (len(_BUCKET_LIMITS) + 1)])
+    counts = timing[3]
+    clock = time.perf_counter
+    bucket = bisect.bisect_left
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = clock() - start
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+            counts[bucket(_BUCKET_LIMITS, seconds)] += 1
+
+    wrapper._timed_name = name
+    return wrapper
+
+
+def enabled() -> bool:
+    '''Checks whether instrumentation is on'''
+
+    return bool(_originals)
+
+
+def _modules_named(name: str) -> list:
+    '''Returns the loaded copies of a module, including the script being run when it is
+    that module, without importing anything'''
+
+    modules = []
+    main_module = sys.modules.get('__main__')
+    main_file = getattr(main_module, '__file__', None) or ''
+    if os.path.splitext(os.path.basename(main_file))[0] == name:
+        modules.append(main_module)
+    if name in sys.modules:
+        modules.append(sys.modules[name])
+    return modules
+
+
+def enable(output: str = None, cprofile_output: str = None) -> None:
+    '''Starts timing the hot paths, writing a report to output and cProfile
+    statistics to cprofile_output on exit when they are given
+
+    Modules not loaded yet, such as the GUI in headless tools, are skipped. Calling this
+    again also times classes loaded since, such as a script run as __main__.'''
+
+    global _profiler, _exit_registered
+    for module_name, class_name, method_name in HOT_PATHS:
+        for module in _modules_named(module_name):
+            cls = getattr(module, class_name)
+            function = getattr(cls, method_name)
+            if getattr(function, '_timed_name', None) is None:
+                _originals.append((cls, method_name, function))
+                setattr(cls, method_name, _timed('{}.{}'.format(class_name, method_name), function))
+
+    if cprofile_output is not None and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if (output is not None or cprofile_output is not None) and not _exit_registered:
+        atexit.register(_write_on_exit, output, cprofile_output)
+        _exit_registered = True
+
+
+def disable() -> None:
+    '''Puts the original methods back and stops the cProfile profiler, keeping what was recorded'''
+
+    for cls, method_name, function in reversed(_originals):
+        setattr(cls, method_name, function)
+    _originals.clear()
+    if _profiler is not None:
+        _profiler.disable()
+
+
+def enable_from_environment() -> bool:
+    '''Switches instrumentation on if DOTS_PROFILE names a report file, returning whether it did'''
+
+    output = os.environ.get(_ENVIRONMENT_VARIABLE)
+    if not output:
+        return False
+    enable(output, os.environ.get(_CPROFILE_VARIABLE) or None)
+    return True
+
+
+def reset() -> None:
+    '''Forgets every time recorded so far'''
+
+    for timing in _timings.values():
+        timing[:3] = [0, 0.0, 0.0]
+        timing[3][:] = [0] * len(timing[3])
+
+
+def _percentile(counts: [int], calls: int, most: float, fraction: float) -> float:
+    '''Returns the upper limit of the histogram bucket holding a percentile of the calls'''
+
+    rank = min(calls - 1, int(fraction * calls))
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen > rank:
+            break
+    if index < len(_BUCKET_LIMITS):
+        return min(_BUCKET_LIMITS[index], most)
+    return most
+
+
+def summary() -> dict:
+    '''Returns the call count, total and percentile times in seconds, and a histogram
+    of each timed method that has been called, slowest total first'''
+
+    report = {}
+    for name, (calls, total, most, counts) in sorted(_timings.items(), key = lambda item: -item[1][1]):
+        if not calls:
+            continue
+        histogram = []
+        for index, count in enumerate(counts):
+            if count:
+                limit = _BUCKET_LIMITS[index] if index < len(_BUCKET_LIMITS) else None
+                histogram.append({'up_to_seconds': limit, 'calls': count})
+
+        report[name] = {'calls': calls, 'total': total, 'mean': total / calls,
+                        'p50': _percentile(counts, calls, most, 0.5),
+                        'p95': _percentile(counts, calls, most, 0.95),
+                        'p99': _percentile(counts, calls, most, 0.99), 'max': most,
+                        'histogram': histogram}
+    return report
+
+
+def write_report(path: str) -> None:
+    '''Writes the summary as JSON'''
+
+    with open(path, 'w') as file:
+        json.dump({'pid': os.getpid(), 'argv': sys.argv, 'timings': summary()}, file, indent = 2)
+
+
+def _write_on_exit(output: str, cprofile_output: str) -> None:
+    '''Saves the report and the cProfile statistics when the program ends'''
+
+    if output is not None:
+        write_report(output)
+    if cprofile_output is not None and _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(cprofile_output)
+
+
+def print_summary(report: dict) -> None:
+    '''Prints a summary as a table, in milliseconds'''
+
+    print('{:<34} {:>9} {:>10} {:>9} {:>9} {:>9} {:>9}'.format(
+        'method', 'calls', 'total ms', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'))
+    for name, timing in report.items():
+        print('{:<34} {:>9} {:>10.1f} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f}'.format(
+            name, timing['calls'], timing['total'] * 1000, timing['p50'] * 1000,
+            timing['p95'] * 1000, timing['p99'] * 1000, timing['max'] * 1000))
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs a script with instrumentation on, or prints a saved report'''
+
+    parser = argparse.ArgumentParser(description = 'Times the game and GUI hot paths while a script runs')
+    parser.add_argument('--output', default = 'dots_profile.json', help = 'JSON report to write on exit')
+    parser.add_argument('--cprofile', help = 'also write cProfile statistics to this file')
+    parser.add_argument('--show', metavar = 'REPORT', help = 'print a saved report instead of running')
+    parser.add_argument('script', nargs = '?', help = 'script to run, such as dots_application_gui.py')
+    parser.add_argument('arguments', nargs = argparse.REMAINDER, help = 'arguments for the script')
+    args = parser.parse_args(argv)
+
+    if args.show:
+        with open(args.show) as file:
+            print_summary(json.load(file)['timings'])
+        return
+    if args.script is None:
+        parser.error('give a script to run or --show a report')
+
+    #the logic is loaded so that it is timed whatever the script, and the script's own entry
+    #point calls enable_from_environment, which also times the classes it loads such as the GUI
+    importlib.import_module('dots_logic')
+    os.environ[_ENVIRONMENT_VARIABLE] = args.output
+    if args.cprofile:
+        os.environ[_CPROFILE_VARIABLE] = args.cprofile
+    enable(args.output, args.cprofile)
+    sys.argv = [args.script] + args.arguments
+    try:
+        runpy.run_path(args.script, run_name = '__main__')
+    finally:
+        print_summary(summary())
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
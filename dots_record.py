@@ -0,0 +1,326 @@
+#Compact binary records of finished games
+
+#A record file starts with a 5 byte header (b'DBXR' and a version) followed by
+#games back to back. Each game is stored as varints: rows, cols, a byte holding
+#the first turn (bit 0 set for Yellow) and the win rule (bit 1 set for '<'),
+#the number of moves, then one edge index per move in dots_engine numbering.
+#Closing a writer appends an index of where every game starts, followed by the
+#offset of that index and b'DBXI', so readers can jump straight to any game.
+#Files without the index (a writer that was never closed) can still be read in order.
+
+import io
+import os
+import struct
+import dots_engine
+import dots_logic
+
+_MAGIC = b'DBXR'
+_INDEX_MAGIC = b'DBXI'
+_VERSION = 1
+_HEADER_SIZE = 5
+_TRAILER = struct.Struct('<Q4s')
+_YELLOW_FIRST = 1
+_LEAST_FILLED = 2
+_CHUNK = 1 << 16
+
+
+def encode_varint(value: int) -> bytes:
+    '''Returns an unsigned integer as a little-endian base 128 varint'''
+
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+
+class GameRecord:
+    '''One finished or unfinished game: its board, first turn, rules and moves'''
+
+    def __init__(self, rows: int, cols: int, first: int, rules: str, moves: [int]) -> None:
+        self._rows = rows
+        self._cols = cols
+        self._first = first
+        self._rules = rules
+        self._moves = moves
+
+
+    def rows(self) -> int:
+        '''Returns the number of rows, in boxes'''
+        return self._rows
+
+
+    def cols(self) -> int:
+        '''Returns the number of columns, in boxes'''
+        return self._cols
+
+
+    def first(self) -> int:
+        '''Returns the color that moved first'''
+        return self._first
+
+
+    def rules(self) -> str:
+        '''Returns the win rule, '>' or '<' '''
+        return self._rules
+
+
+    def moves(self) -> [int]:
+        '''Returns the edges played, in order'''
+        return self._moves
+
+
+    def to_bytes(self) -> bytes:
+        '''Returns the record as stored in a file'''
+
+        flags = (_YELLOW_FIRST if self._first == 1 else 0) | (_LEAST_FILLED if self._rules == '<' else 0)
+        parts = [encode_varint(self._rows), encode_varint(self._cols), bytes([flags]),
+                 encode_varint(len(self._moves))]
+        parts.extend(encode_varint(edge) for edge in self._moves)
+        return b''.join(parts)
+
+
+    def replay_engine(self) -> dots_engine.Engine:
+        '''Plays the moves onto a new engine and returns it'''
+
+        engine = dots_engine.Engine(self._rows, self._cols)
+        engine.set_turn(self._first)
+        for edge in self._moves:
+            engine.play(edge)
+        return engine
+
+
+    def replay_board(self) -> dots_logic.Board:
+        '''Plays the moves onto a new board and returns it'''
+
+        board = dots_logic.Board(self._rows, self._cols)
+        board.set_turn(self._first)
+        board.set_rules(self._rules)
+        engine = board.engine()
+        for edge in self._moves:
+            board.make_move(*engine.edge_dots(edge))
+        return board
+
+
+def from_engine(engine: dots_engine.Engine, rules: str) -> GameRecord:
+    '''Returns a record of the moves played on an engine'''
+
+    return GameRecord(engine.rows(), engine.cols(), engine.first_turn(), rules, engine.history())
+
+
+
+class _Stream:
+    '''Reads varints from a file through a buffer, a chunk at a time'''
+
+    def __init__(self, file: io.BufferedIOBase, end: int = None) -> None:
+        self._file = file
+        self._end = end #file offset to stop reading at, or None for the end of the file
+        self._buffer = b''
+        self._position = 0
+        self._offset = file.tell() #file offset of the start of the buffer
+
+
+    def tell(self) -> int:
+        '''Returns the file offset of the next byte to read'''
+
+        return self._offset + self._position
+
+
+    def at_end(self) -> bool:
+        '''Checks whether everything up to the end has been read'''
+
+        return self._position == len(self._buffer) and not self._fill()
+
+
+    def _fill(self) -> bool:
+        '''Reads the next chunk after the buffered bytes, returning False at the end'''
+
+        self._offset += self._position
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+        size = _CHUNK
+        if self._end is not None:
+            size = min(size, self._end - self._offset - len(self._buffer))
+        chunk = b''
+        if size > 0:
+            self._file.seek(self._offset + len(self._buffer)) #the file may be shared with other streams
+            chunk = self._file.read(size)
+        self._buffer += chunk
+        return len(chunk) > 0
+
+
+    def read_byte(self) -> int:
+        '''Returns the next byte'''
+
+        if self._position == len(self._buffer) and not self._fill():
+            raise EOFError('record ends early')
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+
+    def read_varint(self) -> int:
+        '''Returns the next varint'''
+
+        value = 0
+        shift = 0
+        while True:
+            byte = self.read_byte()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+
+    def read_record(self) -> GameRecord:
+        '''Returns the next game'''
+
+        rows = self.read_varint()
+        cols = self.read_varint()
+        flags = self.read_byte()
+        count = self.read_varint()
+        moves = [self.read_varint() for move in range(count)]
+        return GameRecord(rows, cols, 1 if flags & _YELLOW_FIRST else -1,
+                          '<' if flags & _LEAST_FILLED else '>', moves)
+
+
+
+class RecordWriter:
+    '''Appends games to a new record file one at a time, writing the index on close'''
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'wb')
+        self._file.write(_MAGIC + bytes([_VERSION]))
+        self._offsets = []
+        self._position = _HEADER_SIZE
+
+
+    def write(self, record: GameRecord) -> None:
+        '''Adds one game'''
+
+        data = record.to_bytes()
+        self._offsets.append(self._position)
+        self._file.write(data)
+        self._position += len(data)
+
+
+    def write_engine(self, engine: dots_engine.Engine, rules: str) -> None:
+        '''Adds the game played on an engine'''
+
+        self.write(from_engine(engine, rules))
+
+
+    def count(self) -> int:
+        '''Returns how many games have been written'''
+
+        return len(self._offsets)
+
+
+    def close(self) -> None:
+        '''Writes the index footer and closes the file'''
+
+        if self._file.closed:
+            return
+        index = [encode_varint(len(self._offsets))]
+        previous = 0
+        for offset in self._offsets:
+            index.append(encode_varint(offset - previous))
+            previous = offset
+        self._file.write(b''.join(index))
+        self._file.write(_TRAILER.pack(self._position, _INDEX_MAGIC))
+        self._file.close()
+
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+
+class RecordReader:
+    '''Reads games from a record file, in order or by number through its index'''
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        if self._file.read(_HEADER_SIZE) != _MAGIC + bytes([_VERSION]):
+            raise ValueError('{} is not a game record file'.format(path))
+
+        #the games end where the index starts, or at the end of a file without one
+        self._offsets = None
+        self._index_end = None
+        self._end = self._file.seek(0, os.SEEK_END)
+        if self._end >= _HEADER_SIZE + _TRAILER.size:
+            self._file.seek(self._end - _TRAILER.size)
+            index_offset, magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+            if magic == _INDEX_MAGIC and _HEADER_SIZE <= index_offset <= self._end - _TRAILER.size:
+                self._index_end = self._end - _TRAILER.size
+                self._end = index_offset
+
+
+    def _load_index(self) -> [int]:
+        '''Reads the index footer, or scans the games if the file has none'''
+
+        if self._offsets is None:
+            offsets = []
+            if self._index_end is not None:
+                self._file.seek(self._end)
+                stream = _Stream(self._file, self._index_end)
+                offset = 0
+                for game in range(stream.read_varint()):
+                    offset += stream.read_varint()
+                    offsets.append(offset)
+            else:
+                self._file.seek(_HEADER_SIZE)
+                stream = _Stream(self._file, self._end)
+                while not stream.at_end():
+                    offsets.append(stream.tell())
+                    stream.read_record()
+            self._offsets = offsets
+        return self._offsets
+
+
+    def __iter__(self):
+        '''Yields every game in order without loading the whole file'''
+
+        self._file.seek(_HEADER_SIZE)
+        stream = _Stream(self._file, self._end)
+        while not stream.at_end():
+            yield stream.read_record()
+
+
+    def __len__(self) -> int:
+        return len(self._load_index())
+
+
+    def __getitem__(self, number: int) -> GameRecord:
+        '''Returns one game, reading only that game from the file'''
+
+        offsets = self._load_index()
+        self._file.seek(offsets[number])
+        return _Stream(self._file, self._end).read_record()
+
+
+    def close(self) -> None:
+        '''Closes the file'''
+
+        self._file.close()
+
+
+    def __enter__(self) -> 'RecordReader':
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_records(path: str):
+    '''Yields every game in a record file, in order'''
+
+    with RecordReader(path) as reader:
+        yield from reader
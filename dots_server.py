@@ -0,0 +1,264 @@
+#Headless game server hosting many games over TCP. Never imports tkinter.
+
+#Clients and the server exchange one JSON object per line. A client sends
+#  {"type": "join", "rows": 5, "cols": 5, "rules": ">", "game": "optional name"}
+#  {"type": "move", "edge": 12}   or   {"type": "move", "dots": [0, 0, 0, 1]}
+#  {"type": "state"}
+#and the server answers with
+#  {"type": "joined", "game": ..., "color": -1 or 1, "rows": ..., "cols": ..., "rules": ...}
+#  {"type": "state", "game": ..., "turn": ..., "edges": [...], "boxes": [[box, color], ...], "score": [orange, yellow]}
+#  {"type": "update", "game": ..., "edge": ..., "player": ..., "turn": ..., "boxes": [[box, color], ...], "score": [...]}
+#  {"type": "game_over", "game": ..., "winner": -1, 1 or 0, "score": [...]}
+#  {"type": "error", "message": ...}
+#Players joining without a game name are paired with the next player asking
+#for the same board. The first player of a game is Orange and moves first.
+#After each move both players only get the edge and the boxes it completed.
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import dots_logic
+
+_MAX_SIZE = 50 #largest number of rows or columns a client may ask for
+_MAX_LINE = 1 << 16
+_DRAIN_TIMEOUT = 10.0 #seconds a player may leave broadcasts unread before being disconnected
+
+
+def encode(message: dict) -> bytes:
+    '''Returns a message as one line of the protocol'''
+
+    return json.dumps(message, separators = (',', ':')).encode('utf-8') + b'\n'
+
+
+async def _drain(writer: asyncio.StreamWriter) -> None:
+    '''Waits for a writer's buffer to empty, closing the connection if it takes too long'''
+
+    try:
+        await asyncio.wait_for(writer.drain(), _DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        writer.close() #its handler sees the connection end and leaves the game
+    except ConnectionError:
+        pass #its handler cleans up
+
+
+
+class _Game:
+    '''One board and the connections playing on it'''
+
+    def __init__(self, name: str, rows: int, cols: int, rules: str) -> None:
+        self.name = name
+        self.board = dots_logic.Board(rows, cols)
+        self.board.set_turn(-1)
+        self.board.set_rules(rules)
+        self.players = {} #color -> stream writer
+
+
+    def state(self) -> dict:
+        '''Returns the full position as a state message'''
+
+        engine = self.board.engine()
+        boxes = []
+        for box in range(engine.rows() * engine.cols()):
+            if engine.box_owner(box) != 0:
+                boxes.append([box, engine.box_owner(box)])
+        return {'type': 'state', 'game': self.name, 'turn': engine.turn(),
+                'edges': engine.history(), 'boxes': boxes, 'score': list(engine.score())}
+
+
+    async def broadcast(self, message: dict) -> None:
+        '''Sends a message to every player in the game, disconnecting players who
+        leave it unread so their buffers cannot grow without bound'''
+
+        line = encode(message)
+        writers = [writer for writer in self.players.values() if not writer.is_closing()]
+        for writer in writers:
+            writer.write(line)
+        await asyncio.gather(*(_drain(writer) for writer in writers))
+
+
+
+class GameServer:
+    '''Hosts any number of games on one event loop'''
+
+    def __init__(self) -> None:
+        self._games = {}
+        self._waiting = {} #(rows, cols, rules) -> game missing its second player
+        self._names = itertools.count(1)
+        self._moves = 0
+
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''Serves one connection until it closes'''
+
+        game = None
+        color = 0
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError: #readline's error for a line longer than the stream limit
+                    writer.write(encode({'type': 'error', 'message': 'line too long'}))
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    kind = message['type']
+                    if kind == 'join':
+                        if game is not None:
+                            raise ValueError('already in a game')
+                        game, color = await self._join(message, writer)
+                    elif game is None:
+                        raise ValueError('join a game first')
+                    elif kind == 'move':
+                        await self._move(game, color, message)
+                    elif kind == 'state':
+                        writer.write(encode(game.state()))
+                    else:
+                        raise ValueError('unknown message type {!r}'.format(kind))
+                except (ValueError, KeyError, TypeError) as error:
+                    writer.write(encode({'type': 'error', 'message': str(error)}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if game is not None:
+                await self._leave(game, color)
+            writer.close()
+
+
+    async def _join(self, message: dict, writer: asyncio.StreamWriter) -> (_Game, int):
+        '''Adds a connection to a named or waiting game, starting it once both players are in'''
+
+        rows = int(message.get('rows', 5))
+        cols = int(message.get('cols', 5))
+        rules = message.get('rules', '>')
+        if not (1 <= rows <= _MAX_SIZE and 1 <= cols <= _MAX_SIZE) or rules not in ('>', '<'):
+            raise ValueError('unsupported board')
+
+        name = message.get('game')
+        if name is not None:
+            name = str(name)
+            game = self._games.get(name)
+            if game is None:
+                game = _Game(name, rows, cols, rules)
+                self._games[name] = game
+        else:
+            key = (rows, cols, rules)
+            game = self._waiting.pop(key, None)
+            if game is None:
+                game = _Game('game-{}'.format(next(self._names)), rows, cols, rules)
+                self._games[game.name] = game
+                self._waiting[key] = game
+
+        if len(game.players) == 2:
+            raise ValueError('game {} is full'.format(game.name))
+        color = -1 if -1 not in game.players else 1
+        game.players[color] = writer
+
+        board = game.board
+        writer.write(encode({'type': 'joined', 'game': game.name, 'color': color,
+                             'rows': board.rows(), 'cols': board.cols(),
+                             'rules': board.rules()}))
+        if len(game.players) == 2:
+            await game.broadcast(game.state())
+        return game, color
+
+
+    async def _move(self, game: _Game, color: int, message: dict) -> None:
+        '''Plays a move for a player and sends the change to both players'''
+
+        board = game.board
+        engine = board.engine()
+        if len(game.players) < 2:
+            raise ValueError('waiting for an opponent')
+        if board.is_game_over():
+            raise ValueError('game is over')
+        if board.turn() != color:
+            raise ValueError('not your turn')
+
+        if 'dots' in message:
+            edge = engine.edge_between(*(int(value) for value in message['dots']))
+        else:
+            edge = int(message['edge'])
+        if not 0 <= edge < engine.edge_count() or engine.has_edge(edge):
+            raise ValueError('invalid move')
+
+        board.make_move(*engine.edge_dots(edge))
+        self._moves += 1
+        boxes = []
+        for box in engine.edge_boxes(edge):
+            if engine.box_owner(box) != 0:
+                boxes.append([box, engine.box_owner(box)])
+        await game.broadcast({'type': 'update', 'game': game.name, 'edge': edge, 'player': color,
+                              'turn': engine.turn(), 'boxes': boxes, 'score': list(engine.score())})
+
+        if board.is_game_over():
+            await game.broadcast({'type': 'game_over', 'game': game.name,
+                                  'winner': engine.winner(board.rules()),
+                                  'score': list(engine.score())})
+            self._forget(game)
+
+
+    async def _leave(self, game: _Game, color: int) -> None:
+        '''Removes a closed connection, ending its game for the other player'''
+
+        game.players.pop(color, None)
+        if not game.board.is_game_over() and game.players:
+            await game.broadcast({'type': 'game_over', 'game': game.name, 'winner': -color,
+                                  'score': list(game.board.get_score())})
+        self._forget(game)
+
+
+    def _forget(self, game: _Game) -> None:
+        '''Stops tracking a finished or abandoned game'''
+
+        if self._games.get(game.name) is game:
+            del self._games[game.name]
+        for key, waiting in list(self._waiting.items()):
+            if waiting is game:
+                del self._waiting[key]
+
+
+    def game_count(self) -> int:
+        '''Returns how many games are open'''
+
+        return len(self._games)
+
+
+    def move_count(self) -> int:
+        '''Returns how many moves have been played since the server started'''
+
+        return self._moves
+
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        '''Accepts connections until cancelled'''
+
+        server = await asyncio.start_server(self.handle, host, port, limit = _MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs the server from the command line'''
+
+    parser = argparse.ArgumentParser(description = 'Hosts Dots and Boxes games over TCP')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    args = parser.parse_args(argv)
+
+    print('serving on {}:{}'.format(args.host, args.port), flush = True)
+    try:
+        asyncio.run(GameServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+#Headless batch self-play for comparing strategies. Never imports tkinter.
+
+import argparse
+import multiprocessing
+import sys
+import time
+import dots_ai
+import dots_book
+import dots_engine
+import dots_mcts
+import dots_record
+
+
+STRATEGIES = {
+    'random': lambda seed, time_limit: dots_ai.RandomPlayer(seed),
+    'greedy': lambda seed, time_limit: dots_ai.GreedyPlayer(seed),
+    'alphabeta': lambda seed, time_limit: dots_ai.AlphaBetaPlayer(time_limit, seed = seed,
+                                                                  books = dots_book.load_books()),
+    'mcts': lambda seed, time_limit: dots_mcts.MCTSPlayer(time_limit, seed = seed,
+                                                          books = dots_book.load_books()),
+}
+
+#raised whenever a strategy's play changes, so tournaments replay its cached games
+VERSIONS = {
+    'random': 1,
+    'greedy': 1,
+    'alphabeta': 1,
+    'mcts': 1,
+}
+
+
+def create_player(name: str, seed: int, time_limit: float = 0.05):
+    '''Creates a registered strategy by name'''
+
+    if name not in STRATEGIES:
+        raise ValueError('Unknown strategy {!r}, expected one of {}'.format(
+            name, ', '.join(sorted(STRATEGIES))))
+    return STRATEGIES[name](seed, time_limit)
+
+
+def play_game(rows: int, cols: int, rules: str, orange, yellow, first: int = -1,
+              history: [int] = None) -> (int):
+    '''Plays one game between two players and returns (orange, yellow, winner, moves),
+    adding the edges played to history if one is given'''
+
+    engine = dots_engine.Engine(rows, cols)
+    engine.set_turn(first)
+    players = {-1: orange, 1: yellow}
+    while not engine.is_game_over():
+        engine.play(players[engine.turn()].choose_edge(engine, rules))
+
+    if history is not None:
+        history.extend(engine.history())
+    orange_score, yellow_score = engine.score()
+    return orange_score, yellow_score, engine.winner(rules), engine.move_count()
+
+
+def _play_chunk(task: tuple) -> [(int)]:
+    '''Plays a chunk of games in a worker, returning (result, margin, moves, record) for
+    the first strategy, where record is the game as a GameRecord or None'''
+
+    rows, cols, rules, names, time_limit, seed, games, record = task
+    results = []
+    for game in games:
+        first = -1 if game % 2 == 0 else 1
+        player_1 = create_player(names[0], seed + 2 * game, time_limit)
+        player_2 = create_player(names[1], seed + 2 * game + 1, time_limit)
+        history = [] if record else None
+        orange_score, yellow_score, winner, moves = play_game(rows, cols, rules,
+                                                              player_1, player_2, first, history)
+        game_record = None
+        if record:
+            game_record = dots_record.GameRecord(rows, cols, first, rules, history)
+        results.append((-winner, orange_score - yellow_score, moves, game_record))
+    return results
+
+
+
+class Summary:
+    '''Running totals of finished games, from the first strategy's point of view'''
+
+    def __init__(self) -> None:
+        self._games = 0
+        self._wins = 0
+        self._losses = 0
+        self._draws = 0
+        self._margin = 0
+        self._moves = 0
+
+
+    def add(self, result: int, margin: int, moves: int) -> None:
+        '''Records one finished game'''
+
+        self._games += 1
+        if result > 0:
+            self._wins += 1
+        elif result < 0:
+            self._losses += 1
+        else:
+            self._draws += 1
+        self._margin += margin
+        self._moves += moves
+
+
+    def games(self) -> int:
+        '''Returns how many games have been recorded'''
+        return self._games
+
+
+    def win_rate(self) -> float:
+        '''Returns the fraction of games won by the first strategy'''
+        return self._wins / self._games if self._games else 0.0
+
+
+    def loss_rate(self) -> float:
+        '''Returns the fraction of games won by the second strategy'''
+        return self._losses / self._games if self._games else 0.0
+
+
+    def draw_rate(self) -> float:
+        '''Returns the fraction of drawn games'''
+        return self._draws / self._games if self._games else 0.0
+
+
+    def average_margin(self) -> float:
+        '''Returns the average boxes taken by the first strategy minus the second'''
+        return self._margin / self._games if self._games else 0.0
+
+
+    def average_length(self) -> float:
+        '''Returns the average number of moves in a game'''
+        return self._moves / self._games if self._games else 0.0
+
+
+    def __str__(self) -> str:
+        return '{:>8} games  win {:6.1%}  loss {:6.1%}  draw {:6.1%}  margin {:+6.2f}  length {:6.1f}'.format(
+            self._games, self.win_rate(), self.loss_rate(), self.draw_rate(),
+            self.average_margin(), self.average_length())
+
+
+
+def simulate(games: int, rows: int, cols: int, rules: str, names: (str),
+             processes: int = None, chunk_size: int = 50, seed: int = 0,
+             time_limit: float = 0.05, writer: dots_record.RecordWriter = None):
+    '''Plays games across a process pool, yielding the running Summary after each chunk
+    and saving every game to the writer if one is given'''
+
+    for name in names:
+        create_player(name, seed, time_limit)
+
+    tasks = []
+    for start in range(0, games, chunk_size):
+        tasks.append((rows, cols, rules, tuple(names), time_limit, seed,
+                      range(start, min(start + chunk_size, games)), writer is not None))
+
+    summary = Summary()
+    with multiprocessing.Pool(processes) as pool:
+        for results in pool.imap_unordered(_play_chunk, tasks):
+            for result, margin, moves, game_record in results:
+                summary.add(result, margin, moves)
+                if writer is not None:
+                    writer.write(game_record)
+            yield summary
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs a simulation from the command line, printing results as they arrive'''
+
+    parser = argparse.ArgumentParser(description = 'Plays two strategies against each other')
+    parser.add_argument('players', nargs = 2, choices = sorted(STRATEGIES))
+    parser.add_argument('--games', type = int, default = 1000)
+    parser.add_argument('--rows', type = int, default = 5)
+    parser.add_argument('--cols', type = int, default = 5)
+    parser.add_argument('--rules', choices = ['>', '<'], default = '>')
+    parser.add_argument('--processes', type = int, default = None)
+    parser.add_argument('--chunk-size', type = int, default = 50)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--time', type = float, default = 0.05,
+                        help = 'seconds per move for searching strategies')
+    parser.add_argument('--record', default = None,
+                        help = 'file to save every game to, in the dots_record format')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    print('{} vs {} on {}x{}, rules {}'.format(args.players[0], args.players[1],
+                                               args.rows, args.cols, args.rules))
+    writer = dots_record.RecordWriter(args.record) if args.record else None
+    try:
+        for summary in simulate(args.games, args.rows, args.cols, args.rules, args.players,
+                                args.processes, args.chunk_size, args.seed, args.time, writer):
+            print(summary, flush = True)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    print('{:.1f} games/s'.format(args.games / elapsed if elapsed > 0 else 0.0))
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
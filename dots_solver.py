@@ -0,0 +1,258 @@
+#Solved-position tables for small boards, built by retrograde analysis
+
+#A table holds one signed byte per subset of edges: the best box margin the
+#player to move can still reach, under one win rule. Positions are indexed by
+#Engine.edge_mask(). Filling edges only ever raises the mask, so values are
+#computed from the full board downwards. The mask is split into a high part
+#choosing a block and a low part inside it. Blocks whose high parts have the
+#same number of bits only depend on blocks with more bits, so each such layer
+#is spread over worker processes and recorded in a progress file, making the
+#build resumable. The table only takes its final name once every layer is done.
+#Lookups memory-map the file and read single bytes.
+
+import json
+import mmap
+import os
+import sys
+import time
+import dots_engine
+
+#argparse and multiprocessing are imported by the functions using them: the AI imports
+#this module, and they would double the startup time of every process that plays
+
+_MAGIC = b'DBXS'
+_VERSION = 1
+_HEADER_SIZE = 16
+_BLOCK_BITS = 20
+
+
+def _header(rows: int, cols: int, rules: str) -> bytes:
+    '''Returns the fixed size file header'''
+
+    header = _MAGIC + bytes([_VERSION, rows, cols]) + rules.encode('ascii')
+    return header.ljust(_HEADER_SIZE, b'\0')
+
+
+def _box_masks(rows: int, cols: int) -> [(int)]:
+    '''Returns, for each edge, the edge masks of the boxes it borders'''
+
+    engine = dots_engine.Engine(rows, cols)
+    masks = []
+    for edge in range(engine.edge_count()):
+        boxes = []
+        for box in engine.edge_boxes(edge):
+            mask = 0
+            for side in engine.box_edges(box):
+                mask |= 1 << side
+            boxes.append(mask)
+        masks.append(tuple(boxes))
+    return masks
+
+
+def default_path(rows: int, cols: int, rules: str) -> str:
+    '''Returns where a table is stored unless told otherwise'''
+
+    name = 'most' if rules == '>' else 'least'
+    return os.path.join('solved', '{}x{}_{}.dbx'.format(rows, cols, name))
+
+
+
+class SolvedTable:
+    '''Read-only, memory-mapped table of perfect play for one board size and rule'''
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        header = self._map[:_HEADER_SIZE]
+        if header[:4] != _MAGIC or header[4] != _VERSION:
+            raise ValueError('{} is not a solved-position table'.format(path))
+
+        self._rows = header[5]
+        self._cols = header[6]
+        self._rules = chr(header[7])
+        self._sign = -1 if self._rules == '<' else 1
+        self._box_masks = _box_masks(self._rows, self._cols)
+        if len(self._map) != _HEADER_SIZE + (1 << len(self._box_masks)):
+            raise ValueError('{} is incomplete'.format(path))
+
+
+    def value(self, mask: int) -> int:
+        '''Returns the best box margin the player to move can reach from a position'''
+
+        value = self._map[_HEADER_SIZE + mask]
+        return value - 256 if value > 127 else value
+
+
+    def move_values(self, mask: int) -> {int: int}:
+        '''Returns the margin each undrawn edge leads to for the player to move'''
+
+        values = {}
+        for edge, boxes in enumerate(self._box_masks):
+            bit = 1 << edge
+            if mask & bit:
+                continue
+            child = mask | bit
+            gained = 0
+            for box in boxes:
+                if child & box == box:
+                    gained += 1
+            if gained:
+                values[edge] = gained * self._sign + self.value(child)
+            else:
+                values[edge] = -self.value(child)
+        return values
+
+
+    def best_edge(self, engine: dots_engine.Engine) -> int:
+        '''Returns a perfect move for the engine's position'''
+
+        values = self.move_values(engine.edge_mask())
+        return max(values, key = values.get)
+
+
+    def matches(self, engine: dots_engine.Engine, rules: str) -> bool:
+        '''Checks whether the table covers an engine's board size under the rules given'''
+
+        return (engine.rows(), engine.cols(), rules) == (self._rows, self._cols, self._rules)
+
+
+    def close(self) -> None:
+        '''Releases the memory map'''
+
+        self._map.close()
+        self._file.close()
+
+
+
+def _solve_block(task: tuple) -> int:
+    '''Computes every position in one block, reading finished blocks from the file'''
+
+    path, rows, cols, rules, block, block_bits = task
+    box_masks = _box_masks(rows, cols)
+    edges = len(box_masks)
+    full = (1 << edges) - 1
+    sign = -1 if rules == '<' else 1
+    size = 1 << block_bits
+    base = block << block_bits
+
+    with open(path, 'r+b') as table_file:
+        table = mmap.mmap(table_file.fileno(), 0)
+        local = [0] * size
+        for low in range(size - 1, -1, -1):
+            mask = base | low
+            if mask == full:
+                continue
+
+            best = -128
+            free = full & ~mask
+            while free:
+                bit = free & -free
+                free ^= bit
+                child = mask | bit
+                gained = 0
+                for box in box_masks[bit.bit_length() - 1]:
+                    if child & box == box:
+                        gained += 1
+
+                if bit < size:
+                    value = local[low | bit]
+                else:
+                    value = table[_HEADER_SIZE + child]
+                    if value > 127:
+                        value -= 256
+
+                value = gained * sign + value if gained else -value
+                if value > best:
+                    best = value
+            local[low] = best
+
+        table[_HEADER_SIZE + base:_HEADER_SIZE + base + size] = bytes(value & 0xFF for value in local)
+        table.flush()
+        table.close()
+    return block
+
+
+def _check_header(path: str, rows: int, cols: int, rules: str) -> None:
+    '''Raises ValueError unless a table file is for the board size and rules given'''
+
+    with open(path, 'rb') as table_file:
+        if table_file.read(_HEADER_SIZE) != _header(rows, cols, rules):
+            raise ValueError('{} holds a different table'.format(path))
+
+
+def build(rows: int, cols: int, rules: str, path: str = None, processes: int = None,
+          block_bits: int = _BLOCK_BITS, report = print) -> str:
+    '''Builds or resumes building a table, returning its path'''
+
+    path = path or default_path(rows, cols, rules)
+    edges = dots_engine.Engine(rows, cols).edge_count()
+    block_bits = min(block_bits, edges)
+    high_bits = edges - block_bits
+
+    #a table only appears under its own name once every layer is done; until then it is
+    #built under a temporary name, and without its progress file that is started over
+    if os.path.exists(path):
+        _check_header(path, rows, cols, rules)
+        return path
+    partial_path = path + '.partial'
+    progress_path = path + '.progress'
+    if not (os.path.exists(partial_path) and os.path.exists(progress_path)):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(partial_path, 'wb') as table_file:
+            table_file.write(_header(rows, cols, rules))
+            table_file.truncate(_HEADER_SIZE + (1 << edges))
+        with open(progress_path, 'w') as progress_file:
+            json.dump({'block_bits': block_bits, 'next_layer': high_bits}, progress_file)
+
+    _check_header(partial_path, rows, cols, rules)
+    with open(progress_path) as progress_file:
+        progress = json.load(progress_file)
+    block_bits = progress['block_bits']
+    high_bits = edges - block_bits
+
+    import multiprocessing
+
+    with multiprocessing.Pool(processes) as pool:
+        for layer in range(progress['next_layer'], -1, -1):
+            start = time.perf_counter()
+            blocks = [block for block in range(1 << high_bits) if bin(block).count('1') == layer]
+            tasks = [(partial_path, rows, cols, rules, block, block_bits) for block in blocks]
+            for block in pool.imap_unordered(_solve_block, tasks):
+                pass
+
+            with open(progress_path, 'w') as progress_file:
+                json.dump({'block_bits': block_bits, 'next_layer': layer - 1}, progress_file)
+            report('{}x{} {}: layer {} done, {} blocks in {:.1f}s'.format(
+                rows, cols, rules, layer, len(blocks), time.perf_counter() - start))
+
+    os.replace(partial_path, path)
+    os.remove(progress_path)
+    return path
+
+
+def main(argv: [str] = None) -> None:
+    '''Builds tables from the command line'''
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Solves every position of a small board')
+    parser.add_argument('rows', type = int)
+    parser.add_argument('cols', type = int)
+    parser.add_argument('--rules', choices = ['>', '<', 'both'], default = 'both')
+    parser.add_argument('--output', default = None,
+                        help = 'table path, only when solving a single rule')
+    parser.add_argument('--processes', type = int, default = None)
+    parser.add_argument('--block-bits', type = int, default = _BLOCK_BITS)
+    args = parser.parse_args(argv)
+
+    rules = ['>', '<'] if args.rules == 'both' else [args.rules]
+    for rule in rules:
+        output = args.output if len(rules) == 1 else None
+        path = build(args.rows, args.cols, rule, output, args.processes, args.block_bits)
+        print('wrote', path)
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
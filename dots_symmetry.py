@@ -0,0 +1,152 @@
+#Symmetry-aware hashing of board positions
+
+#A rectangular board looks the same after a half turn or a mirror in either
+#axis, and a square board also after quarter turns and diagonal mirrors.
+#SymmetryHasher keeps one Zobrist hash per symmetry, each updated with a single
+#XOR per move, and the smallest of them is the same for every equivalent position.
+
+import random
+import dots_engine
+
+
+def _dot_transforms(rows: int, cols: int) -> [object]:
+    '''Returns the functions mapping a dot to its image under each symmetry of the board'''
+
+    transforms = [
+        lambda row, col: (row, col),
+        lambda row, col: (row, cols - col),
+        lambda row, col: (rows - row, col),
+        lambda row, col: (rows - row, cols - col),
+    ]
+    if rows == cols:
+        transforms += [
+            lambda row, col: (col, row),
+            lambda row, col: (cols - col, rows - row),
+            lambda row, col: (col, rows - row),
+            lambda row, col: (cols - col, row),
+        ]
+    return transforms
+
+
+def edge_permutations(rows: int, cols: int) -> [[int]]:
+    '''Returns, for each symmetry of the board, the edge each edge is mapped to'''
+
+    engine = dots_engine.Engine(rows, cols)
+    permutations = []
+    for transform in _dot_transforms(rows, cols):
+        permutation = []
+        for edge in range(engine.edge_count()):
+            row_1, col_1, row_2, col_2 = engine.edge_dots(edge)
+            image_1 = transform(row_1, col_1)
+            image_2 = transform(row_2, col_2)
+            permutation.append(engine.edge_between(*image_1, *image_2))
+        permutations.append(permutation)
+    return permutations
+
+
+def _inverse(permutation: [int]) -> [int]:
+    '''Returns the inverse of a permutation'''
+
+    inverse = [0] * len(permutation)
+    for index, image in enumerate(permutation):
+        inverse[image] = index
+    return inverse
+
+
+def canonical_form(engine: dots_engine.Engine) -> (int, int):
+    '''Returns the smallest edge mask (horizontal edges in the low bits, vertical above)
+    over all symmetric images of the position, and the symmetry that gives it'''
+
+    edges = [edge for edge in range(engine.edge_count()) if engine.has_edge(edge)]
+    best = None
+    best_symmetry = 0
+    for symmetry, permutation in enumerate(edge_permutations(engine.rows(), engine.cols())):
+        mask = 0
+        for edge in edges:
+            mask |= 1 << permutation[edge]
+        if best is None or mask < best:
+            best = mask
+            best_symmetry = symmetry
+    return best, best_symmetry
+
+
+
+class SymmetryHasher:
+    '''Keeps a Zobrist hash of the edges under every symmetry of the board'''
+
+    def __init__(self, rows: int, cols: int, seed: int = 0, symmetric: bool = True) -> None:
+        '''Hashes under every symmetry, or only as the board stands when symmetric is False,
+        which skips building the symmetry tables'''
+
+        generator = random.Random(seed)
+        self._rows = rows
+        self._cols = cols
+        if symmetric:
+            self._permutations = edge_permutations(rows, cols)
+        else:
+            self._permutations = [list(range(dots_engine.Engine(rows, cols).edge_count()))]
+        self._inverses = [_inverse(permutation) for permutation in self._permutations]
+        self._keys = [generator.getrandbits(64) for edge in range(len(self._permutations[0]))]
+
+        #for each edge, its key under every symmetry, so an update is one XOR per symmetry
+        self._edge_keys = []
+        for edge in range(len(self._keys)):
+            self._edge_keys.append(tuple(self._keys[permutation[edge]]
+                                         for permutation in self._permutations))
+        self._hashes = [0] * len(self._permutations)
+
+
+    def reset(self, engine: dots_engine.Engine) -> None:
+        '''Recomputes every hash from the edges drawn on an engine'''
+
+        self._hashes = [0] * len(self._permutations)
+        for edge in range(engine.edge_count()):
+            if engine.has_edge(edge):
+                self.update(edge)
+
+
+    def update(self, edge: int) -> None:
+        '''Adds or removes an edge, to be called after every play and undo'''
+
+        hashes = self._hashes
+        keys = self._edge_keys[edge]
+        for symmetry in range(len(hashes)):
+            hashes[symmetry] ^= keys[symmetry]
+
+
+    def canonical_hash(self) -> int:
+        '''Returns the hash shared by all symmetric images of the position'''
+
+        return min(self._hashes)
+
+
+    def canonical(self) -> (int, int):
+        '''Returns the canonical hash and the symmetry that maps the position onto it'''
+
+        hashes = self._hashes
+        symmetry = hashes.index(min(hashes))
+        return hashes[symmetry], symmetry
+
+
+    def hash(self) -> int:
+        '''Returns the plain Zobrist hash of the position, without symmetry'''
+
+        return self._hashes[0]
+
+
+    def to_canonical(self, edge: int, symmetry: int) -> int:
+        '''Maps an edge into the orientation of the canonical position'''
+
+        return self._permutations[symmetry][edge]
+
+
+    def from_canonical(self, edge: int, symmetry: int) -> int:
+        '''Maps an edge from the orientation of the canonical position back to the board'''
+
+        return self._inverses[symmetry][edge]
+
+
+    def symmetry_count(self) -> int:
+        '''Returns the number of symmetries of the board, 4 for rectangles and 8 for squares'''
+
+        return len(self._permutations)
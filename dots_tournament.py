@@ -0,0 +1,453 @@
+#Round-robin tournaments between registered strategies
+
+#Every pair of strategies plays rounds, a round being two games on each board size
+#and rule with the same seeds and the first move swapped. Rounds are spread over a
+#process pool and after each one a sequential probability ratio test (SPRT) checks
+#whether one side is clearly stronger, stopping the pair early once it is.
+#Finished games are kept in an sqlite cache keyed by both strategies' versions, the
+#board, rules, time limit, seed and first turn, so a rerun only plays new games.
+
+#  python dots_tournament.py random greedy alphabeta --sizes 3x3 5x5 --rounds 50
+
+import itertools
+import math
+import os
+import queue
+import sqlite3
+import sys
+import time
+import dots_simulate
+
+_SCHEMA = '''CREATE TABLE IF NOT EXISTS games (
+    player TEXT, player_version INTEGER, opponent TEXT, opponent_version INTEGER,
+    rows INTEGER, cols INTEGER, rules TEXT, time_limit REAL, seed INTEGER, first INTEGER,
+    result INTEGER, margin INTEGER, moves INTEGER,
+    PRIMARY KEY (player, player_version, opponent, opponent_version,
+                 rows, cols, rules, time_limit, seed, first))'''
+_KEY_COLUMNS = ('player', 'player_version', 'opponent', 'opponent_version',
+                'rows', 'cols', 'rules', 'time_limit', 'seed', 'first')
+_SCORE_LIMIT = 0.001 #scores are kept this far from 0 and 1, where the Elo difference is infinite
+_Z = 1.96 #normal quantile of the 95% confidence intervals
+_RATING_ITERATIONS = 200
+
+
+
+def expected_score(elo: float) -> float:
+    '''Returns the average score per game of a player the given Elo above its opponent'''
+
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def elo_difference(score: float) -> float:
+    '''Returns the Elo difference giving an average score per game'''
+
+    score = min(max(score, _SCORE_LIMIT), 1.0 - _SCORE_LIMIT)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+
+class ResultCache:
+    '''Finished tournament games in an sqlite file'''
+
+    def __init__(self, path: str) -> None:
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._lookup = 'SELECT result, margin, moves FROM games WHERE {}'.format(
+            ' AND '.join('{} = ?'.format(column) for column in _KEY_COLUMNS))
+        self._store = 'INSERT OR REPLACE INTO games VALUES ({})'.format(
+            ', '.join('?' * (len(_KEY_COLUMNS) + 3)))
+
+
+    def lookup(self, key: tuple) -> (int):
+        '''Returns (result, margin, moves) of a cached game, or None'''
+
+        return self._connection.execute(self._lookup, key).fetchone()
+
+
+    def store(self, games: [(tuple, (int))]) -> None:
+        '''Saves finished games, given as (key, (result, margin, moves)) pairs'''
+
+        self._connection.executemany(self._store, [key + tuple(outcome) for key, outcome in games])
+        self._connection.commit()
+
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+
+    def close(self) -> None:
+        '''Closes the file'''
+
+        self._connection.close()
+
+
+
+class Match:
+    '''Running results of one pair of strategies, from the first strategy's point of view'''
+
+    def __init__(self, player: str, opponent: str, conditions: [(int, int, str)]) -> None:
+        self._names = (player, opponent)
+        self._summaries = {condition: dots_simulate.Summary() for condition in conditions}
+        self._wins = 0
+        self._draws = 0
+        self._losses = 0
+        self._llr = 0.0
+        self._decision = None
+
+
+    def names(self) -> (str, str):
+        '''Returns the two strategies'''
+        return self._names
+
+
+    def add(self, condition: (int, int, str), result: int, margin: int, moves: int) -> None:
+        '''Records one finished game'''
+
+        self._summaries[condition].add(result, margin, moves)
+        if result > 0:
+            self._wins += 1
+        elif result < 0:
+            self._losses += 1
+        else:
+            self._draws += 1
+
+
+    def summary(self, condition: (int, int, str)) -> dots_simulate.Summary:
+        '''Returns the totals on one board size and rule'''
+        return self._summaries[condition]
+
+
+    def games(self) -> int:
+        '''Returns how many games have been recorded'''
+        return self._wins + self._draws + self._losses
+
+
+    def points(self, name: str) -> float:
+        '''Returns the games won by a strategy, counting draws as half'''
+
+        if name == self._names[0]:
+            return self._wins + self._draws / 2
+        return self._losses + self._draws / 2
+
+
+    def score(self) -> float:
+        '''Returns the first strategy's average points per game'''
+        return self.points(self._names[0]) / self.games() if self.games() else 0.5
+
+
+    def elo(self) -> float:
+        '''Returns the first strategy's Elo advantage'''
+        return elo_difference(self.score())
+
+
+    def elo_interval(self) -> (float, float):
+        '''Returns the 95% confidence interval of the first strategy's Elo advantage'''
+
+        games = self.games()
+        if not games:
+            return -math.inf, math.inf
+        score = self.score()
+        variance = (self._wins * (1.0 - score) ** 2 + self._draws * (0.5 - score) ** 2
+                    + self._losses * score ** 2) / games
+        error = _Z * math.sqrt(variance / games)
+        return elo_difference(score - error), elo_difference(score + error)
+
+
+    def update_test(self, elo_bound: float, alpha: float, beta: float) -> None:
+        '''Runs the SPRT of the first strategy being elo_bound stronger against it being
+        elo_bound weaker, deciding the match once the log likelihood ratio leaves its bounds.
+        A decided match keeps its decision and the ratio it was made on'''
+
+        if self._decision is not None:
+            return
+        stronger = expected_score(elo_bound)
+        weaker = expected_score(-elo_bound)
+        win = math.log(stronger / weaker)
+        loss = math.log((1.0 - stronger) / (1.0 - weaker))
+        #a draw counts as half a win and half a loss
+        self._llr = self._wins * win + self._losses * loss + self._draws * (win + loss) / 2
+        if self._llr >= math.log((1.0 - beta) / alpha):
+            self._decision = self._names[0]
+        elif self._llr <= math.log(beta / (1.0 - alpha)):
+            self._decision = self._names[1]
+
+
+    def llr(self) -> float:
+        '''Returns the log likelihood ratio of the last test'''
+        return self._llr
+
+
+    def decision(self) -> str:
+        '''Returns the strategy found stronger, or None while the test is undecided'''
+        return self._decision
+
+
+    def __str__(self) -> str:
+        low, high = self.elo_interval()
+        if self._decision is None:
+            verdict = 'undecided'
+        else:
+            verdict = '{} stronger'.format(self._decision)
+        return '{} vs {}: {}-{}-{}  Elo {:+.0f} [{:+.0f}, {:+.0f}]  LLR {:+.2f}  {}'.format(
+            self._names[0], self._names[1], self._wins, self._draws, self._losses,
+            self.elo(), low, high, self._llr, verdict)
+
+
+
+def ratings(matches: [Match]) -> {str: float}:
+    '''Fits an Elo rating to every strategy from all its matches (Bradley-Terry, by
+    minorization-maximization), with one virtual draw per pair so that a strategy
+    that never won or never lost still gets a finite rating. Ratings average zero'''
+
+    names = sorted({name for match in matches for name in match.names()})
+    strength = {name: 1.0 for name in names}
+    for iteration in range(_RATING_ITERATIONS):
+        for name in names:
+            points = 0.0
+            denominator = 0.0
+            for match in matches:
+                if name not in match.names():
+                    continue
+                other = match.names()[1] if name == match.names()[0] else match.names()[0]
+                points += match.points(name) + 0.5
+                denominator += (match.games() + 1) / (strength[name] + strength[other])
+            if denominator:
+                strength[name] = points / denominator
+
+    elos = {name: 400.0 * math.log10(strength[name]) for name in names}
+    mean = sum(elos.values()) / len(elos) if elos else 0.0
+    return {name: elo - mean for name, elo in elos.items()}
+
+
+def _play_games(task: tuple) -> (int, int, [(tuple, (int))]):
+    '''Plays the games of one round in a worker, returning the match index, the seed and
+    (game, (result, margin, moves)) pairs, with game as (rows, cols, rules, first) and
+    the result for the first strategy'''
+
+    index, names, time_limit, seed, games = task
+    results = []
+    for rows, cols, rules, first in games:
+        player = dots_simulate.create_player(names[0], 2 * seed, time_limit)
+        opponent = dots_simulate.create_player(names[1], 2 * seed + 1, time_limit)
+        orange_score, yellow_score, winner, moves = dots_simulate.play_game(
+            rows, cols, rules, player, opponent, first)
+        results.append(((rows, cols, rules, first), (-winner, orange_score - yellow_score, moves)))
+    return index, seed, results
+
+
+
+class Tournament:
+    '''Round robin between strategies, each pair playing until its SPRT decides or
+    it has played the most rounds allowed'''
+
+    def __init__(self, names: [str], sizes: [(int, int)], rules: [str], rounds: int = 50,
+                 time_limit: float = 0.05, seed: int = 0, cache: ResultCache = None,
+                 elo_bound: float = 30.0, alpha: float = 0.05, beta: float = 0.05) -> None:
+        for name in names:
+            dots_simulate.create_player(name, seed, time_limit)
+        self._conditions = [(rows, cols, rule) for rows, cols in sizes for rule in rules]
+        self._matches = [Match(player, opponent, self._conditions)
+                         for player, opponent in itertools.combinations(names, 2)]
+        self._rounds = rounds
+        self._next_round = [0] * len(self._matches) #next round to start, per match
+        self._next_result = [0] * len(self._matches) #next round to record, per match
+        self._results = [{} for match in self._matches] #round -> games known so far, per match
+        self._time_limit = time_limit
+        self._seed = seed
+        self._cache = cache
+        self._test = (elo_bound, alpha, beta)
+        self._played = 0
+        self._cached = 0
+
+
+    def matches(self) -> [Match]:
+        '''Returns every pair's results'''
+        return self._matches
+
+
+    def conditions(self) -> [(int, int, str)]:
+        '''Returns the (rows, cols, rules) every pair plays on'''
+        return self._conditions
+
+
+    def played(self) -> int:
+        '''Returns how many games were played rather than read from the cache, including
+        those finishing after their match was decided, which are cached but not counted'''
+        return self._played
+
+
+    def cached(self) -> int:
+        '''Returns how many games were read from the cache'''
+        return self._cached
+
+
+    def _key(self, match: Match, game: (int, int, str, int), seed: int) -> tuple:
+        '''Returns the cache key of one game'''
+
+        player, opponent = match.names()
+        rows, cols, rules, first = game
+        return (player, dots_simulate.VERSIONS.get(player, 0),
+                opponent, dots_simulate.VERSIONS.get(opponent, 0),
+                rows, cols, rules, self._time_limit, seed, first)
+
+
+    def _next_task(self, index: int) -> tuple:
+        '''Starts a match's next round, taking its cached games at once, and returns the
+        task playing the rest, or None when the match is over. A round found wholly in
+        the cache is finished here and the one after it is started instead'''
+
+        match = self._matches[index]
+        while match.decision() is None and self._next_round[index] < self._rounds:
+            number = self._next_round[index]
+            self._next_round[index] += 1
+            seed = self._seed + number
+            known = []
+            missing = []
+            for rows, cols, rules in self._conditions:
+                for first in (-1, 1):
+                    game = (rows, cols, rules, first)
+                    outcome = None
+                    if self._cache is not None:
+                        outcome = self._cache.lookup(self._key(match, game, seed))
+                    if outcome is None:
+                        missing.append(game)
+                    else:
+                        known.append((game, tuple(outcome)))
+                        self._cached += 1
+            self._results[index][number] = known
+            if missing:
+                return index, match.names(), self._time_limit, seed, missing
+            self._record_rounds(index)
+        return None
+
+
+    def _finish(self, index: int, seed: int, results: [(tuple, (int))]) -> None:
+        '''Takes a played round, saving it to the cache, and records it once every
+        earlier round of the match is recorded'''
+
+        match = self._matches[index]
+        self._played += len(results)
+        if self._cache is not None:
+            self._cache.store([(self._key(match, game, seed), outcome) for game, outcome in results])
+        if match.decision() is None:
+            self._results[index][seed - self._seed] += results
+            self._record_rounds(index)
+
+
+    def _record_rounds(self, index: int) -> None:
+        '''Adds a match's finished rounds to it in round order, running the test after each,
+        so that the games counted are the same however rounds finish or come from the
+        cache. Rounds after the one deciding the match are dropped'''
+
+        match = self._matches[index]
+        results = self._results[index]
+        games = 2 * len(self._conditions)
+        while (match.decision() is None and self._next_result[index] in results
+               and len(results[self._next_result[index]]) == games):
+            for (rows, cols, rules, first), outcome in sorted(results.pop(self._next_result[index])):
+                match.add((rows, cols, rules), *outcome)
+            self._next_result[index] += 1
+            match.update_test(*self._test)
+        if match.decision() is not None:
+            results.clear()
+
+
+    def run(self, processes: int = None, report = print) -> [Match]:
+        '''Plays every match across a process pool, keeping two rounds in flight per
+        process so that matches whose test is decided stop being scheduled'''
+
+        import multiprocessing
+
+        finished = queue.Queue()
+        in_flight = 2 * (processes or os.cpu_count() or 1)
+        pending = 0
+        with multiprocessing.Pool(processes) as pool:
+            while True:
+                scheduled = True
+                while pending < in_flight and scheduled:
+                    scheduled = False
+                    for index in range(len(self._matches)):
+                        if pending >= in_flight:
+                            break
+                        task = self._next_task(index)
+                        if task is None:
+                            continue
+                        pool.apply_async(_play_games, (task,), callback = finished.put,
+                                         error_callback = finished.put)
+                        pending += 1
+                        scheduled = True
+                if pending == 0:
+                    break
+
+                outcome = finished.get()
+                pending -= 1
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                index, seed, results = outcome
+                match = self._matches[index]
+                decision = match.decision()
+                self._finish(index, seed, results)
+                if decision is None and match.decision() is not None:
+                    report(match)
+        return self._matches
+
+
+
+def _size(text: str) -> (int, int):
+    '''Parses a board size written as ROWSxCOLS, or a single number for a square board'''
+
+    rows, separator, cols = text.lower().partition('x')
+    return int(rows), int(cols or rows)
+
+
+def main(argv: [str] = None) -> None:
+    '''Runs a tournament from the command line and prints the results'''
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Plays a round robin between strategies')
+    parser.add_argument('players', nargs = '+', choices = sorted(dots_simulate.STRATEGIES))
+    parser.add_argument('--sizes', type = _size, nargs = '+', default = [(3, 3), (5, 5)],
+                        help = 'board sizes such as 3x3 or 5x7')
+    parser.add_argument('--rules', choices = ['>', '<', 'both'], default = 'both')
+    parser.add_argument('--rounds', type = int, default = 50,
+                        help = 'most rounds per pair, each two games on every size and rule')
+    parser.add_argument('--time', type = float, default = 0.05,
+                        help = 'seconds per move for searching strategies')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--processes', type = int, default = None)
+    parser.add_argument('--cache', default = 'tournament.sqlite', help = 'sqlite file of finished games')
+    parser.add_argument('--elo', type = float, default = 30.0,
+                        help = 'Elo difference the early stopping test tells apart from its opposite')
+    parser.add_argument('--alpha', type = float, default = 0.05)
+    parser.add_argument('--beta', type = float, default = 0.05)
+    args = parser.parse_args(argv)
+    if len(set(args.players)) < 2:
+        parser.error('a tournament needs at least two different strategies')
+
+    start = time.perf_counter()
+    rules = ['>', '<'] if args.rules == 'both' else [args.rules]
+    cache = ResultCache(args.cache)
+    try:
+        tournament = Tournament(list(dict.fromkeys(args.players)), args.sizes, rules, args.rounds,
+                                args.time, args.seed, cache, args.elo, args.alpha, args.beta)
+        matches = tournament.run(args.processes)
+    finally:
+        cache.close()
+
+    print()
+    for match in matches:
+        print(match)
+        for rows, cols, rule in tournament.conditions():
+            print('  {}x{} {}  {}'.format(rows, cols, rule, match.summary((rows, cols, rule))))
+    print()
+    for name, elo in sorted(ratings(matches).items(), key = lambda item: -item[1]):
+        print('{:>12} {:+7.0f}'.format(name, elo))
+    print('{} games played, {} from the cache, in {:.1f}s'.format(
+        tournament.played(), tournament.cached(), time.perf_counter() - start))
+
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
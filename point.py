@@ -1,6 +1,8 @@
 import math
 
 class Point:
+    __slots__ = ('_frac_x', '_frac_y')
+
     def __init__(self, frac_x: float, frac_y: float):
         self._frac_x = frac_x
         self._frac_y = frac_y
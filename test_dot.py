@@ -0,0 +1,93 @@
+#Tests for the dot layout and hit-testing
+
+import random
+import pytest
+
+pytest.importorskip('tkinter')
+
+import dot
+import point
+
+
+def _placed_dots(rows: int, cols: int) -> [[dot.DotGUI]]:
+    '''Returns the dots of a board placed where the GUI puts them'''
+
+    dots = []
+    for row in range(rows + 1):
+        dots.append([])
+        for col in range(cols + 1):
+            dot_gui = dot.DotGUI(row, col)
+            dot_gui.place(dot.create_dot_points(row, col, rows, cols))
+            dots[row].append(dot_gui)
+    return dots
+
+
+def _edges(rows: int, cols: int) -> [(int)]:
+    '''Returns the dots (row_1, col_1, row_2, col_2) of every edge of a board'''
+
+    edges = []
+    for row in range(rows + 1):
+        for col in range(cols + 1):
+            if col < cols:
+                edges.append((row, col, row, col + 1))
+            if row < rows:
+                edges.append((row, col, row + 1, col))
+    return edges
+
+
+def test_find_edge_agrees_with_checking_every_edge():
+    generator = random.Random(17)
+    for rows, cols in ((1, 1), (3, 3), (2, 5), (8, 4)):
+        dots = _placed_dots(rows, cols)
+        edges = _edges(rows, cols)
+        for sample in range(3000):
+            spot = point.from_frac(generator.random(), generator.random())
+            containing = [edge for edge in edges
+                          if dot.contains_point(spot, dots[edge[0]][edge[1]], dots[edge[2]][edge[3]])]
+            found = dot.find_edge(spot, rows, cols)
+            if containing:
+                assert found in containing
+            else:
+                assert found is None
+
+
+def test_the_middle_of_every_edge_finds_that_edge():
+    for rows, cols in ((3, 3), (5, 2)):
+        dots = _placed_dots(rows, cols)
+        for row_1, col_1, row_2, col_2 in _edges(rows, cols):
+            x_1, y_1 = dots[row_1][col_1].center().frac()
+            x_2, y_2 = dots[row_2][col_2].center().frac()
+            middle = point.from_frac((x_1 + x_2) / 2, (y_1 + y_2) / 2)
+            assert dot.find_edge(middle, rows, cols) == (row_1, col_1, row_2, col_2)
+
+
+def test_viewport_pixels_and_points_round_trip():
+    generator = random.Random(19)
+    for view in (dot.Viewport(800, 600), dot.Viewport(640, 480, 4.0, 0.3, 0.55),
+                 dot.Viewport(500, 500, 40.0, 0.9, 0.0)):
+        for sample in range(200):
+            spot = point.from_frac(generator.random(), generator.random())
+            x, y = view.pixel(spot)
+            assert view.point_at(x, y).frac() == pytest.approx(spot.frac())
+            x, y = generator.uniform(0, 800), generator.uniform(0, 600)
+            assert view.pixel(view.point_at(x, y)) == pytest.approx((x, y))
+
+
+def test_visible_dots_cover_the_viewport_of_a_zoomed_board():
+    rows = cols = 200
+    view = dot.Viewport(800, 800, 4.0, 0.5, 0.25)
+    row_1, row_2, col_1, col_2 = view.visible_dots(rows, cols)
+    assert row_2 - row_1 <= 70 and col_2 - col_1 <= 70
+    for row in range(rows + 1):
+        for col in range(cols + 1):
+            top_left, bottom_right = dot.create_dot_points(row, col, rows, cols)
+            left, top = view.pixel(top_left)
+            right, bottom = view.pixel(bottom_right)
+            if right > 0 and bottom > 0 and left < 800 and top < 800:
+                assert row_1 <= row <= row_2 and col_1 <= col <= col_2
+
+
+def test_visible_dots_stay_on_the_board_when_only_the_margin_is_in_view():
+    for origin_x, origin_y in ((0.0, 0.0), (0.99, 0.99), (0.0, 0.99), (0.99, 0.5)):
+        row_1, row_2, col_1, col_2 = dot.Viewport(800, 800, 100.0, origin_x, origin_y).visible_dots(200, 200)
+        assert 0 <= row_1 <= row_2 <= 200 and 0 <= col_1 <= col_2 <= 200
@@ -0,0 +1,56 @@
+#Tests for the alpha-beta player
+
+import random
+import dots_ai
+import dots_engine
+
+
+def test_search_state_follows_the_game():
+    for rules in ('>', '<'):
+        generator = random.Random(3)
+        engine = dots_engine.Engine(4, 4)
+        player = dots_ai.AlphaBetaPlayer(100, max_depth = 2)
+        while not engine.is_game_over():
+            engine.play(player.choose_edge(engine, rules))
+            if generator.random() < 0.2 and engine.move_count() > 2:
+                engine.undo() #taking moves back makes the player rebuild its search state
+            elif not engine.is_game_over():
+                engine.play(engine.random_move(generator))
+
+            player._follow(engine, rules)
+            fresh = dots_ai.AlphaBetaPlayer(100, max_depth = 2)
+            fresh._follow(engine, rules)
+            assert player._engine.history() == engine.history()
+            assert player._hasher.canonical() == fresh._hasher.canonical()
+            if rules == '<':
+                assert player._analyzer is None
+            else:
+                assert (sorted((kind, sorted(boxes)) for kind, boxes in player._analyzer.components())
+                        == sorted((kind, sorted(boxes)) for kind, boxes in fresh._analyzer.components()))
+                assert player._analyzer.safe_count() == fresh._analyzer.safe_count()
+
+
+def test_large_board_search_keeps_to_its_time_limit():
+    generator = random.Random(5)
+    engine = dots_engine.Engine(100, 100)
+    for move in range(5000):
+        engine.play(engine.random_move(generator))
+    player = dots_ai.AlphaBetaPlayer(0.1)
+    player.choose_edge(engine, '>')
+    for move in range(3):
+        engine.play(engine.random_move(generator))
+        edge = player.choose_edge(engine, '>')
+        assert not engine.has_edge(edge)
+        assert player.last_search().seconds() < 0.15
+
+
+def test_moves_stay_within_the_time_limit():
+    for rules in ('>', '<'):
+        generator = random.Random(1)
+        engine = dots_engine.Engine(5, 5)
+        player = dots_ai.AlphaBetaPlayer(0.1)
+        while not engine.is_game_over():
+            engine.play(player.choose_edge(engine, rules))
+            assert player.last_search().seconds() <= 0.1
+            if not engine.is_game_over():
+                engine.play(engine.random_move(generator))
@@ -0,0 +1,238 @@
+#Tests for the board drawing, on the mocked canvas the benchmarks use
+
+import random
+import pytest
+
+pytest.importorskip('tkinter')
+
+import dots_bench
+import dots_logic
+
+
+def _items(canvas: dots_bench._MockCanvas) -> [tuple]:
+    '''Returns what is on a mocked canvas, ignoring item numbers and creation order'''
+
+    items = []
+    for coordinates, options in canvas._items.values():
+        items.append((tuple(round(value, 6) for value in coordinates), options.get('fill'),
+                      options.get('tags'), options.get('width')))
+    return sorted(items, key = repr)
+
+
+def _redrawn(board: dots_logic.Board, board_gui) -> [tuple]:
+    '''Returns what a board drawn from scratch shows, at the same size and view as another'''
+
+    fresh = dots_bench._headless_application(board)._boardGUI
+    fresh._canvas._width = board_gui._canvas.winfo_width()
+    fresh._canvas._height = board_gui._canvas.winfo_height()
+    fresh._zoom = board_gui._zoom
+    fresh._origin_x = board_gui._origin_x
+    fresh._origin_y = board_gui._origin_y
+    fresh._draw_board()
+    return _items(fresh._canvas)
+
+
+def test_incremental_updates_match_a_full_redraw_through_undo_and_redo():
+    generator = random.Random(16)
+    for rows, cols in ((3, 3), (4, 6)):
+        board = dots_logic.Board(rows, cols)
+        board.set_turn(-1)
+        board_gui = dots_bench._headless_application(board)._boardGUI
+        board_gui.resize()
+        engine = board.engine()
+        while not board.is_game_over():
+            choice = generator.random()
+            if choice < 0.2:
+                for step in range(generator.randint(1, 4)):
+                    board.undo()
+            elif choice < 0.3:
+                for step in range(generator.randint(1, 4)):
+                    board.redo()
+            else:
+                board.make_move(*engine.edge_dots(engine.random_move(generator)))
+            board_gui.update_moves()
+            assert _items(board_gui._canvas) == _redrawn(board, board_gui)
+        assert len(board_gui.frame_times()) > 0
+
+
+def test_updates_after_a_new_line_of_play_replace_the_taken_back_moves():
+    board = dots_logic.Board(2, 2)
+    board.set_turn(-1)
+    board_gui = dots_bench._headless_application(board)._boardGUI
+    board_gui.resize()
+    engine = board.engine()
+    for edge in (0, 1, 6, 2):
+        board.make_move(*engine.edge_dots(edge))
+    board_gui.update_moves()
+    board.undo()
+    board.undo()
+    board.make_move(*engine.edge_dots(11))
+    board_gui.update_moves()
+    assert sorted(board_gui._edge_items) == [0, 1, 11]
+    assert _items(board_gui._canvas) == _redrawn(board, board_gui)
+
+
+def test_the_preview_follows_undrawn_edges_only():
+    board = dots_logic.Board(3, 3)
+    board.set_turn(-1)
+    board_gui = dots_bench._headless_application(board)._boardGUI
+    board_gui.resize()
+    engine = board.engine()
+    board.make_move(*engine.edge_dots(0))
+    board_gui.update_moves()
+    items = len(board_gui._canvas._items)
+
+    board_gui.show_preview(5)
+    assert len(board_gui._canvas._items) == items + 1
+    coordinates, options = board_gui._canvas._items[board_gui._preview_item]
+    assert options['fill'] == options['outline'] == '#7F7F7F'
+    board_gui.show_preview(0) #already drawn, so the preview is hidden
+    assert board_gui._preview_item is None and len(board_gui._canvas._items) == items
+    board_gui.show_preview(5)
+    board_gui.show_preview(-1)
+    assert board_gui._preview_item is None and len(board_gui._canvas._items) == items
+
+
+class _IdleWindow:
+    '''Stands in for the root window, holding after_idle callbacks until they are run'''
+
+    def __init__(self) -> None:
+        self.callbacks = []
+
+
+    def after_idle(self, callback) -> str:
+        self.callbacks.append(callback)
+        return 'after#{}'.format(len(self.callbacks))
+
+
+    def run_idle(self) -> None:
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def test_a_burst_of_resize_events_costs_one_redraw():
+    board = dots_logic.Board(4, 4)
+    board.set_turn(-1)
+    for edge in random.Random(18).sample(range(board.engine().edge_count()), 20):
+        if not board.engine().has_edge(edge):
+            board.make_move(*board.engine().edge_dots(edge))
+    application = dots_bench._headless_application(board)
+    window = _IdleWindow()
+    application._root_window = window
+    board_gui = application._boardGUI
+    board_gui.resize()
+    frames = len(board_gui.frame_times())
+
+    canvas = board_gui._canvas
+    for width, height in ((700, 650), (640, 600), (600, 500)):
+        canvas._width, canvas._height = width, height
+        application._on_canvas_resized(None)
+    assert len(window.callbacks) == 1
+    window.run_idle()
+    assert len(board_gui.frame_times()) == frames + 1
+    assert _items(canvas) == _redrawn(board, board_gui)
+
+    application._on_canvas_resized(None)
+    assert len(window.callbacks) == 1
+    window.run_idle()
+    assert len(board_gui.frame_times()) == frames + 1 #same size, so nothing to redraw
+
+
+def _middle_pixel(board_gui, edge: int) -> (int, int):
+    '''Returns the canvas pixel in the middle of an edge'''
+
+    row_1, col_1, row_2, col_2 = board_gui._board.engine().edge_dots(edge)
+    x_1, y_1 = board_gui._viewport.pixel(board_gui._dots[row_1][col_1].center())
+    x_2, y_2 = board_gui._viewport.pixel(board_gui._dots[row_2][col_2].center())
+    return (x_1 + x_2) / 2, (y_1 + y_2) / 2
+
+
+def test_clicks_on_a_zoomed_and_panned_200x200_board_find_their_edges():
+    board = dots_logic.Board(200, 200)
+    board.set_turn(-1)
+    board_gui = dots_bench._headless_application(board)._boardGUI
+    board_gui.resize()
+    assert board_gui.zoom() == 4.0 #at most _MAX_VISIBLE_CELLS boxes across
+    assert len(board_gui._canvas._items) < 20000
+
+    generator = random.Random(20)
+    engine = board.engine()
+    board_gui.pan(-4000, -4000)
+    for view in range(20):
+        board_gui.zoom_at(generator.choice([1.25, 0.8]), generator.randint(0, 800), generator.randint(0, 800))
+        board_gui.pan(generator.randint(-300, 300), generator.randint(-300, 300))
+        row_1, row_2, col_1, col_2 = board_gui._visible
+        if row_2 == row_1 or col_2 == col_1: #only the margin around the board is in view
+            continue
+        for sample in range(50):
+            row = generator.randint(row_1, row_2 - 1)
+            col = generator.randint(col_1, col_2 - 1)
+            for edge in (engine.edge_between(row, col, row, col + 1),
+                         engine.edge_between(row, col, row + 1, col)):
+                x, y = _middle_pixel(board_gui, edge)
+                if 0 <= x < 800 and 0 <= y < 800:
+                    assert board_gui.edge_at(x, y) == edge
+
+
+def test_zooming_keeps_the_spot_under_the_cursor_and_panning_back_returns():
+    board = dots_logic.Board(200, 200)
+    board.set_turn(-1)
+    board_gui = dots_bench._headless_application(board)._boardGUI
+    board_gui.resize()
+    board_gui.pan(-2000, -1500)
+
+    spot = board_gui._viewport.point_at(300, 500).frac()
+    board_gui.zoom_at(1.25, 300, 500)
+    assert board_gui.zoom() == 5.0
+    assert board_gui._viewport.point_at(300, 500).frac() == pytest.approx(spot)
+    assert _items(board_gui._canvas) == _redrawn(board, board_gui)
+
+    origin = (board_gui._origin_x, board_gui._origin_y)
+    board_gui.pan(120, -80)
+    assert (board_gui._origin_x, board_gui._origin_y) != origin
+    board_gui.pan(-120, 80)
+    assert (board_gui._origin_x, board_gui._origin_y) == pytest.approx(origin)
+
+    board_gui.pan(10 ** 6, 10 ** 6) #stops at the top left corner of the board
+    assert (board_gui._origin_x, board_gui._origin_y) == (0.0, 0.0)
+    board_gui.zoom_at(1 / 1000, 400, 400) #never shows more than _MAX_VISIBLE_CELLS boxes across
+    assert board_gui.zoom() == 4.0
+
+    board_gui.zoom_at(1000, 0, 0) #closest zoom, on the margin above and left of the board
+    assert board_gui.zoom() == 100.0
+    board_gui.pan(-10 ** 6, -10 ** 6) #and below and right of it
+    assert _items(board_gui._canvas) == _redrawn(board, board_gui)
+
+
+def test_a_burst_of_drags_costs_one_redraw():
+    board = dots_logic.Board(200, 200)
+    board.set_turn(-1)
+    application = dots_bench._headless_application(board)
+    window = _IdleWindow()
+    application._root_window = window
+    application._pan_pending = None
+    application._pan_by = [0, 0]
+    board_gui = application._boardGUI
+    board_gui.resize()
+    board_gui.pan(-4000, -4000)
+    origin = (board_gui._origin_x, board_gui._origin_y)
+    frames = len(board_gui.frame_times())
+
+    application._on_drag_started(_Event(100, 100))
+    for x in range(110, 200, 10):
+        application._on_dragged(_Event(x, 100 + x // 2))
+    assert len(window.callbacks) == 1
+    window.run_idle()
+    assert len(board_gui.frame_times()) == frames + 1
+    assert board_gui._origin_x == pytest.approx(origin[0] - 90 / (4.0 * 800))
+    assert board_gui._origin_y == pytest.approx(origin[1] - 95 / (4.0 * 800))
+
+
+
+class _Event:
+    '''The parts of a tk.Event the drag handlers read'''
+
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
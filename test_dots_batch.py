@@ -0,0 +1,58 @@
+#Differential tests of the vectorized batch engine against dots_logic.Board
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import dots_batch
+import dots_logic
+
+
+def _compare(batch: dots_batch.BatchEngine, boards: [dots_logic.Board]) -> None:
+    '''Checks every board of a batch against the Board playing the same moves'''
+
+    captures = batch.capture_moves()
+    for index, board in enumerate(boards):
+        engine = board.engine()
+        assert tuple(batch.scores()[index]) == board.get_score()
+        assert batch.turns()[index] == board.turn()
+        assert batch.is_game_over()[index] == board.is_game_over()
+        assert batch.move_counts()[index] == engine.move_count()
+        assert batch.bitmasks(index) == (engine.horizontal(), engine.vertical())
+        for box in (box for row in board.boxes() for box in row):
+            number = box.row() * board.cols() + box.col()
+            assert batch.owners()[index, number] == box.color()
+            assert batch.sides()[index, number] == box.side_count()
+        capturing = {engine.edge_between(*move) for move in board.capturing_moves()}
+        assert set(np.nonzero(captures[index])[0]) == capturing
+
+
+@pytest.mark.parametrize('rows, cols, first', [(3, 3, -1), (2, 5, 1), (4, 3, 1)])
+def test_random_batches_match_board_move_by_move(rows, cols, first):
+    generator = np.random.default_rng(rows * 10 + cols)
+    count = 12
+    batch = dots_batch.BatchEngine(count, rows, cols, first)
+    boards = []
+    for index in range(count):
+        board = dots_logic.Board(rows, cols)
+        board.set_turn(first)
+        boards.append(board)
+
+    while not batch.is_game_over().all():
+        moves = batch.random_moves(generator)
+        #leave some boards out of some steps, as callers may
+        moves[generator.random(count) < 0.2] = -1
+        scores = [board.get_score() for board in boards]
+        completed = batch.step(moves)
+        for index, edge in enumerate(moves):
+            if edge >= 0:
+                boards[index].make_move(*boards[index].engine().edge_dots(int(edge)))
+            assert completed[index] == sum(boards[index].get_score()) - sum(scores[index])
+        _compare(batch, boards)
+
+
+def test_drawn_edges_are_refused():
+    batch = dots_batch.BatchEngine(2, 2, 2)
+    batch.step(np.array([0, 3]))
+    with pytest.raises(ValueError):
+        batch.step(np.array([1, 3]))
@@ -0,0 +1,100 @@
+#Tests for building opening books and looking positions up in them
+
+import pytest
+import dots_book
+import dots_engine
+import dots_symmetry
+
+
+@pytest.fixture(scope = 'module')
+def book(tmp_path_factory):
+    '''Builds a small 2x3 book once'''
+
+    path = str(tmp_path_factory.mktemp('book') / '2x3_most.dbo')
+    dots_book.build(2, 3, '>', 2, path, time_limit = 0.01, max_depth = 3, processes = 1,
+                    report = lambda message: None)
+    book = dots_book.OpeningBook(path)
+    yield book
+    book.close()
+
+
+def _engine(edges: [int]) -> dots_engine.Engine:
+    '''Returns a 2x3 engine with the edges played'''
+
+    engine = dots_engine.Engine(2, 3)
+    engine.set_turn(-1)
+    for edge in edges:
+        engine.play(edge)
+    return engine
+
+
+class _KeyHasher:
+    '''Stands in for a book's hasher, giving whatever key it is set to'''
+
+    def __init__(self, key: int) -> None:
+        self._key = key
+
+
+    def reset(self, engine: dots_engine.Engine) -> None:
+        pass
+
+
+    def canonical(self) -> (int, int):
+        return self._key, 0
+
+
+    def from_canonical(self, edge: int, symmetry: int) -> int:
+        return edge
+
+
+def test_every_position_is_found_in_every_orientation(book):
+    positions = dots_book._positions(2, 3, 2)
+    assert len(book) == len(positions)
+    assert list(book._keys) == sorted(positions)
+    permutations = dots_symmetry.edge_permutations(2, 3)
+    hasher = dots_symmetry.SymmetryHasher(2, 3)
+    for key, edges in positions.items():
+        edge, value = book.lookup(_engine(edges))
+        assert edge >= 0 and edge not in edges
+        hasher.reset(_engine(edges + [edge]))
+        reply = hasher.canonical_hash()
+        for permutation in permutations:
+            #on a symmetric position the book may give another edge with the same outcome
+            image = [permutation[played] for played in edges]
+            image_edge, image_value = book.lookup(_engine(image))
+            hasher.reset(_engine(image + [image_edge]))
+            assert image_value == value and hasher.canonical_hash() == reply
+
+
+def test_the_binary_search_finds_the_first_and_last_keys_and_misses_the_rest(book):
+    keys = list(book._keys)
+    hasher = book._hasher
+    try:
+        for index in (0, len(keys) - 1, len(keys) // 2):
+            book._hasher = _KeyHasher(keys[index])
+            assert book.lookup(None) == (book._edges[index], book._values[index])
+        gaps = [key + 1 for key, next_key in zip(keys, keys[1:]) if next_key > key + 1]
+        for missing in [keys[0] - 1, keys[-1] + 1] + gaps[:3]:
+            book._hasher = _KeyHasher(missing)
+            assert book.lookup(None) == (-1, 0)
+    finally:
+        book._hasher = hasher
+
+
+def test_book_moves_need_a_covered_position_and_the_same_rules(book):
+    engine = _engine([0])
+    edge, value = dots_book.book_move([book], engine, '>')
+    assert (edge, value) == book.lookup(engine)
+    assert dots_book.book_move([book], engine, '<') == (-1, 0)
+    assert dots_book.book_move([book], _engine([0, 5, 9]), '>') == (-1, 0) #past the moves covered
+    assert dots_book.book_move([book], dots_engine.Engine(3, 3), '>') == (-1, 0)
+
+
+def test_truncated_books_are_refused(book, tmp_path):
+    with open(book._file.name, 'rb') as book_file:
+        data = book_file.read()
+    for size in (10, len(data) - 2):
+        path = tmp_path / 'truncated.dbo'
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            dots_book.OpeningBook(str(path))
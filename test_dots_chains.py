@@ -0,0 +1,41 @@
+#Tests for the chain and loop analyzer
+
+import random
+import dots_chains
+import dots_engine
+
+
+def test_capture_keeps_the_region_worth_declining_for_last():
+    #three chains opened at once on 3x3; edges 14 and 18 are worth 5 to the player
+    #to move and edge 22 only 3, whatever order the position was reached in
+    mask = 3911063
+    edges = [edge for edge in range(24) if (mask >> edge) & 1]
+    generator = random.Random(0)
+    for order in range(50):
+        generator.shuffle(edges)
+        engine = dots_engine.Engine(3, 3)
+        analyzer = dots_chains.ChainAnalyzer(engine)
+        for edge in edges:
+            engine.play(edge)
+            analyzer.update(edge)
+        assert len(analyzer.capturable()) == 3
+        assert analyzer.endgame_move('>') in (14, 18)
+
+
+def test_incremental_analysis_matches_a_fresh_one():
+    generator = random.Random(2)
+    for game in range(20):
+        engine = dots_engine.Engine(4, 4)
+        analyzer = dots_chains.ChainAnalyzer(engine)
+        while not engine.is_game_over():
+            edge = engine.random_move(generator)
+            engine.play(edge)
+            analyzer.update(edge)
+            if generator.random() < 0.1:
+                analyzer.update(engine.undo())
+            fresh = dots_chains.ChainAnalyzer(engine)
+            assert (sorted((kind, sorted(boxes)) for kind, boxes in analyzer.components())
+                    == sorted((kind, sorted(boxes)) for kind, boxes in fresh.components()))
+            assert analyzer.safe_count() == fresh.safe_count()
+            assert analyzer.capturable() == fresh.capturable()
+            assert analyzer.endgame_value() == fresh.endgame_value()
@@ -0,0 +1,54 @@
+#Tests for the command line entry point and the modules each command imports
+
+import os
+import subprocess
+import sys
+import pytest
+
+_HEAVY = ['tkinter', 'numpy', 'dots_application_gui', 'dots_batch']
+_STRATEGIES = ['dots_ai', 'dots_mcts', 'dots_solver', 'dots_tournament', 'multiprocessing']
+
+#runs dots_cli.main with the arguments given, then prints which of the modules named were loaded
+_SCRIPT = '''
+import sys
+import dots_cli
+modules = sys.argv[1].split(',')
+if len(sys.argv) > 2:
+    try:
+        dots_cli.main(sys.argv[2:])
+    except SystemExit:
+        pass
+print('loaded:', *(module for module in modules if module in sys.modules), file = sys.stderr)
+'''
+
+
+def _loaded(modules: [str], arguments: [str]) -> [str]:
+    '''Returns which of the modules are loaded after running a command in a fresh interpreter'''
+
+    result = subprocess.run([sys.executable, '-c', _SCRIPT, ','.join(modules)] + arguments,
+                            cwd = os.path.dirname(os.path.abspath(__file__)),
+                            capture_output = True, text = True, timeout = 120)
+    assert result.returncode == 0, result.stderr
+    lines = [line for line in result.stderr.splitlines() if line.startswith('loaded:')]
+    return lines[-1].split()[1:]
+
+
+def test_importing_the_command_line_loads_no_strategy():
+    assert _loaded(_HEAVY + _STRATEGIES, []) == []
+
+
+@pytest.mark.parametrize('arguments', [
+    ['simulate', 'random', 'greedy', '--games', '4', '--rows', '2', '--cols', '2', '--processes', '1'],
+    ['play', '--orange', 'random', '--yellow', 'greedy', '--rows', '2', '--cols', '2'],
+    ['solve', '--help'],
+    ['bench', '--help'],
+    ['book', '--help'],
+    ['tournament', '--help'],
+])
+def test_headless_commands_never_load_tkinter_or_numpy(arguments):
+    assert _loaded(_HEAVY, arguments) == []
+
+
+def test_only_the_commands_that_need_them_load_the_strategies():
+    assert _loaded(_STRATEGIES, ['book', '--help']) == []
+    assert 'dots_tournament' not in _loaded(_STRATEGIES, ['simulate', '--help'])
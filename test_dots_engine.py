@@ -0,0 +1,115 @@
+#Tests for the bitboard engine
+
+import random
+import dots_engine
+
+
+def _state(engine: dots_engine.Engine) -> tuple:
+    '''Returns everything a move changes, with the move lists in a fixed order'''
+
+    boxes = range(engine.rows() * engine.cols())
+    return (engine.edge_mask(), engine.turn(), engine.score(), engine.completed_box_count(),
+            engine.is_game_over(), engine.history(),
+            [engine.box_sides(box) for box in boxes], [engine.box_owner(box) for box in boxes],
+            [engine.edge_kind(edge) for edge in range(engine.edge_count())],
+            [sorted(engine.moves_of(kind)) for kind in (dots_engine.CAPTURE, dots_engine.SAFE,
+                                                        dots_engine.SACRIFICE)])
+
+
+def test_undo_restores_every_earlier_position():
+    generator = random.Random(4)
+    for game in range(100):
+        engine = dots_engine.Engine(generator.randint(1, 5), generator.randint(1, 5))
+        engine.set_turn(generator.choice([-1, 1]))
+        states = [_state(engine)]
+        moves = list(range(engine.edge_count()))
+        generator.shuffle(moves)
+        for edge in moves:
+            engine.play(edge)
+            states.append(_state(engine))
+
+        for edge, state in zip(reversed(moves), reversed(states[:-1])):
+            assert engine.undo() == edge
+            assert _state(engine) == state
+        assert engine.undo() == -1
+
+
+def test_replaying_after_undo_matches_a_fresh_game():
+    generator = random.Random(5)
+    engine = dots_engine.Engine(4, 4)
+    engine.set_turn(-1)
+    moves = list(range(engine.edge_count()))
+    generator.shuffle(moves)
+    for edge in moves[:30]:
+        engine.play(edge)
+    for move in range(12):
+        engine.undo()
+    for edge in moves[18:]:
+        engine.play(edge)
+
+    fresh = dots_engine.Engine(4, 4)
+    fresh.set_turn(-1)
+    for edge in moves:
+        fresh.play(edge)
+    assert _state(engine) == _state(fresh)
+
+
+def _kinds_by_brute_force(engine: dots_engine.Engine) -> [[int]]:
+    '''Returns the undrawn edges that complete a box, that leave every box with at most two
+    sides, and that give a box its third side, worked out from the side counts alone'''
+
+    kinds = [[], [], []]
+    for edge in range(engine.edge_count()):
+        if engine.has_edge(edge):
+            continue
+        most = max(engine.box_sides(box) for box in engine.edge_boxes(edge))
+        if most == 3:
+            kinds[dots_engine.CAPTURE].append(edge)
+        elif most == 2:
+            kinds[dots_engine.SACRIFICE].append(edge)
+        else:
+            kinds[dots_engine.SAFE].append(edge)
+    return kinds
+
+
+def _kinds_of(engine: dots_engine.Engine) -> [[int]]:
+    '''Returns the engine's own move lists, sorted'''
+
+    return [sorted(engine.moves_of(kind)) for kind in (dots_engine.CAPTURE, dots_engine.SAFE,
+                                                      dots_engine.SACRIFICE)]
+
+
+def test_move_lists_match_the_side_counts_after_every_play_and_undo():
+    generator = random.Random(14)
+    for game in range(60):
+        engine = dots_engine.Engine(generator.randint(1, 6), generator.randint(1, 6))
+        engine.set_turn(-1)
+        assert _kinds_of(engine) == _kinds_by_brute_force(engine)
+        while not engine.is_game_over():
+            if engine.move_count() and generator.random() < 0.3:
+                engine.undo()
+            else:
+                engine.play(engine.random_move(generator))
+            kinds = _kinds_by_brute_force(engine)
+            assert _kinds_of(engine) == kinds
+            assert sorted(engine.legal_moves()) == sorted(sum(kinds, []))
+            for kind, edges in enumerate(kinds):
+                assert engine.count_moves(kind) == len(edges)
+                for edge in edges:
+                    assert engine.edge_kind(edge) == kind
+
+
+def test_move_lists_are_rebuilt_by_set_position():
+    generator = random.Random(15)
+    for position in range(50):
+        engine = dots_engine.Engine(generator.randint(1, 6), generator.randint(1, 6))
+        engine.set_turn(1)
+        for move in range(generator.randint(0, engine.edge_count())):
+            engine.play(engine.random_move(generator))
+        owners = [engine.box_owner(box) for box in range(engine.rows() * engine.cols())]
+        copy = dots_engine.Engine(engine.rows(), engine.cols())
+        copy.set_position(engine.edge_mask(), owners, engine.turn())
+        assert _kinds_of(copy) == _kinds_by_brute_force(engine)
+        for edge in range(engine.edge_count()):
+            if engine.has_edge(edge):
+                assert copy.edge_kind(edge) == -1
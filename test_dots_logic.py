@@ -0,0 +1,94 @@
+#Tests for the board logic
+
+import random
+import pytest
+import dots_logic
+
+
+def _state(board: dots_logic.Board) -> tuple:
+    '''Returns the engine position together with what the dots and boxes show'''
+
+    engine = board.engine()
+    return (board.rows(), board.cols(), board.turn(), board.rules(), engine.edge_mask(),
+            [engine.box_owner(box) for box in range(board.rows() * board.cols())],
+            board.get_score(), board.is_game_over(),
+            [[(box.completed(), box.color(), box.side_count()) for box in row] for row in board.boxes()],
+            [[sorted(dot.connections()) for dot in row] for row in board._dots])
+
+
+def _play_randomly(board: dots_logic.Board, generator: random.Random, moves: int) -> [tuple]:
+    '''Plays random undrawn edges, returning the state before the first move and after each one'''
+
+    engine = board.engine()
+    states = [_state(board)]
+    for move in range(moves):
+        edge = generator.choice([edge for edge in range(engine.edge_count()) if not engine.has_edge(edge)])
+        board.make_move(*engine.edge_dots(edge))
+        states.append(_state(board))
+    return states
+
+
+def test_undo_and_redo_walk_back_and_forth_through_a_game():
+    generator = random.Random(6)
+    for game in range(50):
+        board = dots_logic.Board(generator.randint(1, 4), generator.randint(1, 4))
+        board.set_turn(generator.choice([-1, 1]))
+        states = _play_randomly(board, generator, board.engine().edge_count())
+
+        for state in reversed(states[:-1]):
+            assert board.undo()
+            assert _state(board) == state
+        assert not board.undo()
+        for state in states[1:]:
+            assert board.redo()
+            assert _state(board) == state
+        assert not board.redo()
+
+
+def test_snapshots_round_trip():
+    generator = random.Random(7)
+    for game in range(100):
+        board = dots_logic.Board(generator.randint(1, 7), generator.randint(1, 7))
+        board.set_turn(generator.choice([-1, 1]))
+        board.set_rules(generator.choice(['>', '<', '']))
+        _play_randomly(board, generator, generator.randint(0, board.engine().edge_count()))
+
+        from_bytes = dots_logic.Board.from_bytes(board.to_bytes())
+        from_text = dots_logic.Board.from_text(board.to_text())
+        assert _state(from_bytes) == _state(from_text) == _state(board)
+        assert not from_bytes.undo()
+
+
+def test_corrupt_snapshots_are_refused():
+    data = dots_logic.Board(2, 3).to_bytes()
+    for corrupt in (data[:5], b'XXXX' + data[4:], data + b'\0'):
+        with pytest.raises(ValueError):
+            dots_logic.Board.from_bytes(corrupt)
+    with pytest.raises(ValueError):
+        dots_logic.Board.from_text('not a board\n')
+
+
+def test_boards_finished_without_a_turn_round_trip():
+    for rows, cols in ((1, 1), (2, 3)):
+        board = dots_logic.Board(rows, cols)
+        _play_randomly(board, random.Random(13), board.engine().edge_count())
+        assert board.turn() == 0 and board.is_game_over()
+        assert _state(dots_logic.Board.from_bytes(board.to_bytes())) == _state(board)
+        assert _state(dots_logic.Board.from_text(board.to_text())) == _state(board)
+
+
+def test_snapshots_with_an_unknown_turn_or_rules_are_refused():
+    board = dots_logic.Board(2, 2)
+    board.set_turn(1)
+    board.set_rules('>')
+    data = board.to_bytes()
+    for offset, value in ((9, 7), (9, 0xFE), (10, ord('x')), (10, 0)):
+        corrupt = bytearray(data)
+        corrupt[offset] = value
+        with pytest.raises(ValueError):
+            dots_logic.Board.from_bytes(bytes(corrupt))
+
+    text = board.to_text()
+    for header in ('dots 2 2 yellow x', 'dots 2 2 purple >'):
+        with pytest.raises(ValueError):
+            dots_logic.Board.from_text(text.replace('dots 2 2 yellow >', header))
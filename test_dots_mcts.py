@@ -0,0 +1,22 @@
+#Tests for the Monte Carlo tree search player
+
+import random
+import dots_engine
+import dots_mcts
+
+
+def _finished(turn: int) -> dots_engine.Engine:
+    '''Returns a finished 3x3 game Yellow won 8-1, with the given player to move'''
+
+    engine = dots_engine.Engine(3, 3)
+    engine.set_position((1 << engine.edge_count()) - 1, [-1] + [1] * 8, turn)
+    return engine
+
+
+def test_margin_is_for_the_player_to_move():
+    for turn, margin in ((1, 7), (-1, -7)):
+        tree = dots_mcts._Tree(_finished(turn), '>', 1.4, random.Random(0))
+        tree._iterate()
+        tree._iterate()
+        assert tree.playouts() == 2
+        assert tree.margin() == 2 * margin
@@ -0,0 +1,71 @@
+#Tests for the hot path instrumentation
+
+import importlib
+import random
+import subprocess
+import sys
+import dots_logic
+import dots_profile
+
+
+def test_hot_paths_name_existing_methods():
+    for module_name, class_name, method_name in dots_profile.HOT_PATHS:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError: #the GUI without tkinter
+            continue
+        assert callable(getattr(getattr(module, class_name), method_name))
+
+
+def test_logic_hot_paths_record_every_call():
+    dots_profile.reset()
+    dots_profile.enable()
+    try:
+        generator = random.Random(0)
+        board = dots_logic.Board(3, 3)
+        while not board.is_game_over():
+            board.make_move(*generator.choice(board.legal_moves()))
+            board.get_score()
+        board.undo()
+    finally:
+        dots_profile.disable()
+
+    report = dots_profile.summary()
+    for module_name, class_name, method_name in dots_profile.HOT_PATHS:
+        if module_name != 'dots_application_gui':
+            assert report['{}.{}'.format(class_name, method_name)]['calls'] > 0
+    assert report['Board.make_move']['calls'] == 24
+    assert report['Box.add_side']['calls'] == 36
+    assert not dots_profile.enabled()
+
+
+def test_enabling_does_not_import_modules_that_are_not_loaded():
+    script = ('import sys, dots_profile, dots_logic\n'
+              'dots_profile.enable()\n'
+              'print("dots_application_gui" in sys.modules, "tkinter" in sys.modules,'
+              ' dots_profile.enabled())\n')
+    output = subprocess.run([sys.executable, '-c', script], capture_output = True, text = True,
+                            check = True).stdout
+    assert output.split() == ['False', 'False', 'True']
+
+
+def test_timings_keep_a_fixed_size_summary(monkeypatch):
+    durations = [0.001] * 90 + [0.1] * 10
+    ticks = []
+    for seconds in durations:
+        ticks += [0.0, seconds]
+    ticks.reverse()
+    monkeypatch.setattr(dots_profile.time, 'perf_counter', ticks.pop)
+    wrapped = dots_profile._timed('Test.call', lambda: None)
+    for seconds in durations:
+        wrapped()
+    monkeypatch.undo()
+
+    timing = dots_profile.summary()['Test.call']
+    del dots_profile._timings['Test.call']
+    assert timing['calls'] == 100
+    assert abs(timing['total'] - 1.09) < 1e-9
+    assert timing['max'] == 0.1
+    assert 0.001 <= timing['p50'] < 0.0013
+    assert timing['p95'] == timing['p99'] == 0.1
+    assert sum(bucket['calls'] for bucket in timing['histogram']) == 100
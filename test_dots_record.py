@@ -0,0 +1,65 @@
+#Tests for the binary game records
+
+import random
+import dots_engine
+import dots_record
+
+
+def _games(count: int) -> [dots_record.GameRecord]:
+    '''Returns random games, finished and unfinished, some with edges past one varint byte'''
+
+    generator = random.Random(8)
+    games = []
+    for game in range(count):
+        engine = dots_engine.Engine(generator.randint(1, 12), generator.randint(1, 12))
+        engine.set_turn(generator.choice([-1, 1]))
+        moves = list(range(engine.edge_count()))
+        generator.shuffle(moves)
+        for edge in moves[:generator.randint(0, len(moves))]:
+            engine.play(edge)
+        games.append(dots_record.from_engine(engine, generator.choice(['>', '<'])))
+    return games
+
+
+def _fields(record: dots_record.GameRecord) -> tuple:
+    '''Returns everything a record stores'''
+
+    return record.rows(), record.cols(), record.first(), record.rules(), list(record.moves())
+
+
+def test_records_round_trip_in_order_and_by_number(tmp_path):
+    games = _games(60)
+    path = str(tmp_path / 'games.dbxr')
+    with dots_record.RecordWriter(path) as writer:
+        for record in games:
+            writer.write(record)
+        assert writer.count() == len(games)
+
+    expected = [_fields(record) for record in games]
+    assert [_fields(record) for record in dots_record.read_records(path)] == expected
+    with dots_record.RecordReader(path) as reader:
+        assert len(reader) == len(games)
+        for number in random.Random(9).sample(range(len(games)), 20):
+            assert _fields(reader[number]) == expected[number]
+
+
+def test_files_without_an_index_are_still_read(tmp_path):
+    games = _games(10)
+    path = tmp_path / 'unclosed.dbxr'
+    path.write_bytes(dots_record._MAGIC + bytes([dots_record._VERSION])
+                     + b''.join(record.to_bytes() for record in games))
+
+    with dots_record.RecordReader(str(path)) as reader:
+        assert [_fields(record) for record in reader] == [_fields(record) for record in games]
+        assert len(reader) == len(games)
+        assert _fields(reader[7]) == _fields(games[7])
+
+
+def test_replays_reach_the_recorded_position():
+    for record in _games(20):
+        engine = record.replay_engine()
+        board = record.replay_board()
+        assert engine.history() == list(record.moves())
+        assert board.engine().edge_mask() == engine.edge_mask()
+        assert board.get_score() == engine.score()
+        assert board.rules() == record.rules()
@@ -0,0 +1,126 @@
+#Tests for the game server's protocol and error handling
+
+import asyncio
+import json
+import dots_server
+
+
+async def _exchange(lines: [bytes]) -> [dict]:
+    '''Sends lines to a fresh server on a free port and returns every reply until it closes'''
+
+    server = await asyncio.start_server(dots_server.GameServer().handle, '127.0.0.1', 0,
+                                        limit = dots_server._MAX_LINE)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for line in lines:
+        writer.write(line)
+    await writer.drain()
+    writer.write_eof()
+    replies = []
+    while True:
+        line = await asyncio.wait_for(reader.readline(), 5)
+        if not line:
+            break
+        replies.append(json.loads(line))
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return replies
+
+
+def test_oversized_line_gets_an_error_and_closes_the_connection():
+    oversized = b'{"type": "state", "pad": "' + b'x' * dots_server._MAX_LINE + b'"}\n'
+    replies = asyncio.run(_exchange([oversized]))
+    assert replies == [{'type': 'error', 'message': 'line too long'}]
+
+
+def test_bad_messages_get_errors_and_keep_the_connection():
+    replies = asyncio.run(_exchange([b'not json\n', dots_server.encode({'type': 'move', 'edge': 0}),
+                                     dots_server.encode({'type': 'join', 'rows': 500}),
+                                     dots_server.encode({'type': 'join', 'rows': 2, 'cols': 2}),
+                                     dots_server.encode({'type': 'move', 'edge': 0})]))
+    assert [reply['type'] for reply in replies] == ['error', 'error', 'error', 'joined', 'error']
+    assert replies[1]['message'] == 'join a game first'
+    assert replies[2]['message'] == 'unsupported board'
+    assert replies[4]['message'] == 'waiting for an opponent'
+
+
+
+class _StalledWriter:
+    '''Stands in for the writer of a player who never reads what it is sent'''
+
+    def __init__(self) -> None:
+        self.lines = []
+        self.closed = False
+
+
+    def write(self, line: bytes) -> None:
+        self.lines.append(line)
+
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+
+    def close(self) -> None:
+        self.closed = True
+
+
+    async def drain(self) -> None:
+        await asyncio.Event().wait()
+
+
+class _ReadingWriter(_StalledWriter):
+    '''Stands in for the writer of a player who keeps up'''
+
+    async def drain(self) -> None:
+        pass
+
+
+def test_broadcast_disconnects_a_player_who_stops_reading(monkeypatch):
+    monkeypatch.setattr(dots_server, '_DRAIN_TIMEOUT', 0.05)
+    game = dots_server._Game('stalled', 2, 2, '>')
+    reading = _ReadingWriter()
+    stalled = _StalledWriter()
+    game.players = {-1: reading, 1: stalled}
+
+    asyncio.run(asyncio.wait_for(game.broadcast(game.state()), 5))
+    assert stalled.closed and not reading.closed
+    assert len(reading.lines) == len(stalled.lines) == 1
+
+    asyncio.run(game.broadcast(game.state()))
+    assert len(reading.lines) == 2 and len(stalled.lines) == 1
+
+
+def test_a_full_game_is_played_between_two_connections():
+    async def play() -> [dict]:
+        server = await asyncio.start_server(dots_server.GameServer().handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        connections = [await asyncio.open_connection('127.0.0.1', port) for player in range(2)]
+        for reader, writer in connections:
+            writer.write(dots_server.encode({'type': 'join', 'rows': 1, 'cols': 1, 'game': 'full'}))
+            await writer.drain()
+        for reader, writer in connections:
+            assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == 'joined'
+            assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == 'state'
+
+        messages = []
+        turn = -1
+        for edge in range(4):
+            writer = connections[0 if turn == -1 else 1][1]
+            writer.write(dots_server.encode({'type': 'move', 'edge': edge}))
+            await writer.drain()
+            for reader, writer in connections:
+                update = json.loads(await asyncio.wait_for(reader.readline(), 5))
+                assert update['type'] == 'update' and update['edge'] == edge
+            turn = update['turn']
+        for reader, writer in connections:
+            messages.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+            writer.close()
+        server.close()
+        await server.wait_closed()
+        return messages
+
+    messages = asyncio.run(play())
+    assert [message['type'] for message in messages] == ['game_over', 'game_over']
+    assert messages[0]['score'] == [0, 1] and messages[0]['winner'] == 1
@@ -0,0 +1,28 @@
+#Tests for the batch self-play simulator
+
+import dots_simulate
+
+
+def test_summary_counts_every_result():
+    summary = dots_simulate.Summary()
+    for game in range(12):
+        #5 wins and 7 losses, whose rates once left a draw rate of -0.0%
+        summary.add(1 if game < 5 else -1, 2 if game < 5 else -2, 24)
+    assert summary.games() == 12
+    assert summary.win_rate() == 5 / 12
+    assert summary.loss_rate() == 7 / 12
+    assert summary.draw_rate() == 0.0
+    assert 'draw   0.0%' in str(summary)
+    assert summary.average_margin() == -4 / 12
+
+    summary.add(0, 0, 24)
+    assert summary.draw_rate() == 1 / 13
+
+
+def test_play_game_finishes_with_every_box_taken():
+    player = dots_simulate.create_player('greedy', 0)
+    opponent = dots_simulate.create_player('random', 1)
+    orange, yellow, winner, moves = dots_simulate.play_game(3, 4, '>', player, opponent, 1)
+    assert orange + yellow == 12
+    assert moves == 31
+    assert winner == (-1 if orange > yellow else 1 if yellow > orange else 0)
@@ -0,0 +1,81 @@
+#Tests for the solved-position tables
+
+import os
+import pytest
+import dots_engine
+import dots_solver
+
+
+def _brute_force(engine: dots_engine.Engine, sign: int, values: {int: int}) -> int:
+    '''Returns the best margin for the player to move by trying every move on the engine,
+    counting boxes against the player who takes them when sign is -1'''
+
+    mask = engine.edge_mask()
+    if mask in values:
+        return values[mask]
+    best = 0 if engine.is_game_over() else None
+    for edge in engine.legal_moves():
+        turn = engine.turn()
+        completed = engine.play(edge)
+        value = _brute_force(engine, sign, values)
+        value = completed * sign + value if engine.turn() == turn else -value
+        engine.undo()
+        if best is None or value > best:
+            best = value
+    values[mask] = best
+    return best
+
+
+@pytest.fixture(scope = 'module', params = ['>', '<'])
+def table(request, tmp_path_factory):
+    '''Builds the 2x2 table for each win rule once'''
+
+    path = str(tmp_path_factory.mktemp('solved') / '2x2.dbx')
+    dots_solver.build(2, 2, request.param, path, processes = 1, report = lambda message: None)
+    table = dots_solver.SolvedTable(path)
+    yield request.param, table
+    table.close()
+
+
+def test_every_2x2_position_matches_brute_force(table):
+    rules, table = table
+    engine = dots_engine.Engine(2, 2)
+    engine.set_turn(-1)
+    values = {}
+    _brute_force(engine, -1 if rules == '<' else 1, values)
+    assert len(values) == 1 << engine.edge_count()
+    for mask, value in values.items():
+        assert table.value(mask) == value, mask
+
+
+def test_perfect_play_reaches_the_solved_margin(table):
+    rules, table = table
+    engine = dots_engine.Engine(2, 2)
+    engine.set_turn(-1)
+    assert table.matches(engine, rules)
+    expected = table.value(0)
+    while not engine.is_game_over():
+        engine.play(table.best_edge(engine))
+    orange, yellow = engine.score()
+    assert (orange - yellow) * (-1 if rules == '<' else 1) == expected
+
+
+def test_a_build_stopped_without_its_progress_file_starts_over(tmp_path):
+    path = str(tmp_path / '2x2.dbx')
+    finished = str(tmp_path / 'finished.dbx')
+    dots_solver.build(2, 2, '>', finished, processes = 1, block_bits = 8, report = lambda message: None)
+
+    def stop(message):
+        os.remove(path + '.progress')
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        dots_solver.build(2, 2, '>', path, processes = 1, block_bits = 8, report = stop)
+    assert not os.path.exists(path)
+
+    layers = []
+    dots_solver.build(2, 2, '>', path, processes = 1, block_bits = 8, report = layers.append)
+    assert len(layers) == 5
+    with open(path, 'rb') as table_file, open(finished, 'rb') as finished_file:
+        assert table_file.read() == finished_file.read()
+    assert sorted(os.listdir(tmp_path)) == ['2x2.dbx', 'finished.dbx']
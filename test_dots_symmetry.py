@@ -0,0 +1,90 @@
+#Tests for the symmetry-aware hashing
+
+import random
+import dots_engine
+import dots_symmetry
+
+
+def _random_position(rows: int, cols: int, generator: random.Random) -> dots_engine.Engine:
+    '''Returns an engine with a random set of edges drawn'''
+
+    engine = dots_engine.Engine(rows, cols)
+    engine.set_turn(-1)
+    for edge in generator.sample(range(engine.edge_count()), generator.randint(0, engine.edge_count())):
+        engine.play(edge)
+    return engine
+
+
+def _image(engine: dots_engine.Engine, permutation: [int]) -> dots_engine.Engine:
+    '''Returns a new engine with the edges of a position mapped by a permutation'''
+
+    image = dots_engine.Engine(engine.rows(), engine.cols())
+    image.set_turn(-1)
+    for edge in engine.history():
+        image.play(permutation[edge])
+    return image
+
+
+def test_permutations_are_the_board_symmetries():
+    for rows, cols, count in ((2, 3, 4), (3, 2, 4), (3, 3, 8), (1, 1, 8)):
+        permutations = dots_symmetry.edge_permutations(rows, cols)
+        edges = list(range(dots_engine.Engine(rows, cols).edge_count()))
+        assert len(permutations) == count
+        assert permutations[0] == edges
+        for permutation in permutations:
+            assert sorted(permutation) == edges
+        assert len({tuple(permutation) for permutation in permutations}) == count
+
+
+def test_symmetric_images_share_the_canonical_hash():
+    generator = random.Random(10)
+    for rows, cols in ((2, 3), (3, 3), (4, 4), (3, 5)):
+        permutations = dots_symmetry.edge_permutations(rows, cols)
+        hasher = dots_symmetry.SymmetryHasher(rows, cols)
+        for position in range(30):
+            engine = _random_position(rows, cols, generator)
+            hasher.reset(engine)
+            expected = hasher.canonical_hash()
+            mask, symmetry = dots_symmetry.canonical_form(engine)
+            for permutation in permutations:
+                image = _image(engine, permutation)
+                hasher.reset(image)
+                assert hasher.canonical_hash() == expected
+                assert dots_symmetry.canonical_form(image)[0] == mask
+            assert _image(engine, permutations[symmetry]).edge_mask() == mask
+
+
+def test_canonical_orientation_maps_moves_both_ways():
+    generator = random.Random(11)
+    for rows, cols in ((2, 3), (3, 3)):
+        hasher = dots_symmetry.SymmetryHasher(rows, cols)
+        plain = dots_symmetry.SymmetryHasher(rows, cols, symmetric = False)
+        for position in range(30):
+            engine = _random_position(rows, cols, generator)
+            hasher.reset(engine)
+            canonical_hash, symmetry = hasher.canonical()
+            image = _image(engine, [hasher.to_canonical(edge, symmetry) for edge in range(engine.edge_count())])
+            plain.reset(image)
+            assert plain.hash() == canonical_hash
+            for edge in range(engine.edge_count()):
+                assert hasher.from_canonical(hasher.to_canonical(edge, symmetry), symmetry) == edge
+
+
+def test_updates_match_a_reset_after_play_and_undo():
+    generator = random.Random(12)
+    engine = dots_engine.Engine(4, 4)
+    engine.set_turn(-1)
+    hasher = dots_symmetry.SymmetryHasher(4, 4)
+    fresh = dots_symmetry.SymmetryHasher(4, 4)
+    moves = list(range(engine.edge_count()))
+    generator.shuffle(moves)
+    for edge in moves:
+        engine.play(edge)
+        hasher.update(edge)
+        fresh.reset(engine)
+        assert hasher.canonical() == fresh.canonical()
+    while engine.move_count():
+        hasher.update(engine.undo())
+        fresh.reset(engine)
+        assert hasher.canonical() == fresh.canonical()
+    assert hasher.hash() == 0
@@ -0,0 +1,67 @@
+#Tests for the tournament runner's statistics and its cache
+
+import os
+import tempfile
+import dots_tournament
+
+_CONDITIONS = [(2, 2, '>')]
+
+
+def test_elo_and_expected_score_are_inverses():
+    for elo in (-300.0, -30.0, 0.0, 55.0, 400.0):
+        assert abs(dots_tournament.elo_difference(dots_tournament.expected_score(elo)) - elo) < 1e-9
+    assert dots_tournament.expected_score(0.0) == 0.5
+
+
+def test_sprt_stops_at_its_bounds_and_keeps_its_decision():
+    #each win adds log(s(30) / s(-30)) = 0.1726 and the upper bound is log(19) = 2.944
+    match = dots_tournament.Match('a', 'b', _CONDITIONS)
+    for game in range(17):
+        match.add(_CONDITIONS[0], 1, 1, 12)
+        match.update_test(30.0, 0.05, 0.05)
+    assert match.decision() is None
+    match.add(_CONDITIONS[0], 1, 1, 12)
+    match.update_test(30.0, 0.05, 0.05)
+    assert match.decision() == 'a'
+    llr = match.llr()
+
+    for game in range(100):
+        match.add(_CONDITIONS[0], -1, -1, 12)
+        match.update_test(30.0, 0.05, 0.05)
+    assert match.decision() == 'a'
+    assert match.llr() == llr
+
+
+def test_sprt_losses_decide_for_the_second_strategy_and_draws_never_decide():
+    losing = dots_tournament.Match('a', 'b', _CONDITIONS)
+    drawing = dots_tournament.Match('a', 'b', _CONDITIONS)
+    for game in range(200):
+        losing.add(_CONDITIONS[0], -1, -1, 12)
+        losing.update_test(30.0, 0.05, 0.05)
+        drawing.add(_CONDITIONS[0], 0, 0, 12)
+        drawing.update_test(30.0, 0.05, 0.05)
+    assert losing.decision() == 'b'
+    assert drawing.decision() is None
+    assert abs(drawing.llr()) < 1e-9
+
+
+def test_cached_rerun_counts_the_same_games():
+    def totals(tournament):
+        return [(str(match), match.games()) for match in tournament.matches()]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'games.sqlite')
+        runs = []
+        for run in range(2):
+            cache = dots_tournament.ResultCache(path)
+            tournament = dots_tournament.Tournament(['random', 'greedy'], [(3, 3)], ['>'], 40,
+                                                    cache = cache)
+            tournament.run(2, report = lambda match: None)
+            cache.close()
+            runs.append(tournament)
+
+    assert runs[0].played() > 0
+    assert runs[1].played() == 0
+    assert runs[0].matches()[0].decision() == 'greedy'
+    assert totals(runs[0]) == totals(runs[1])
+    assert dots_tournament.ratings(runs[0].matches()) == dots_tournament.ratings(runs[1].matches())